@@ -0,0 +1,233 @@
+# backend/ai/batch_mentor.py
+#
+# End-of-term mentor advisories for the whole cohort.
+#
+#   python -m backend.ai.batch_mentor --out advisories.jsonl --workers 8
+#
+# Students are streamed from the database in chunks, their analytics
+# snapshots and marks are loaded with one query each per chunk, RAG context
+# is retrieved once for the (shared) advisory question, and LLM calls run on
+# a bounded worker pool. Every finished student is appended to the output JSONL right away,
+# so re-running the same command resumes where it stopped; failures go to
+# <out>.errors.jsonl and are retried on the next run.
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from backend.crud import (
+    backfill_student_analytics,
+    get_analytics_for_students,
+    get_marks_for_students,
+    iter_all_students,
+)
+from backend.ai.context_builder import (
+    format_attendance_context,
+    format_full_student_context,
+    format_marks_context,
+)
+from backend.ai.llm_client import get_chat_llm, get_chat_model_name
+from backend.ai.mentor import (
+    _academic_messages,
+    _general_messages,
+    _retrieve_rag_context,
+    detect_query_type,
+)
+
+DEFAULT_ADVISORY_QUERY = (
+    "Give me my end-of-term mentor advisory: summarize how I did in each subject, "
+    "point out my weakest areas, and give a concrete plan for next term."
+)
+DEFAULT_INTENT = "advisory"
+
+
+def _load_checkpoint(out_path: str) -> set:
+    """student_ids that already have an advisory in out_path."""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["student_id"])
+            except (ValueError, KeyError):
+                # a half-written last line from an interrupted run
+                continue
+    return done
+
+
+def _student_chunks(session: Session, chunk_size: int, skip: set, limit: Optional[int]):
+    chunk = []
+    taken = 0
+    for student in iter_all_students(session, batch_size=chunk_size):
+        if student.student_id in skip:
+            continue
+        if limit is not None and taken >= limit:
+            break
+        chunk.append(student)
+        taken += 1
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _advisory_messages(student, attendance, marks, intent: str, rag_context: str, query: str):
+    if intent == "general":
+        return _general_messages(format_attendance_context(student, attendance), query)
+    if intent == "attendance":
+        student_context = format_attendance_context(student, attendance)
+    elif intent in ("marks", "gpa"):
+        student_context = format_marks_context(student, marks)
+    else:
+        student_context = format_full_student_context(student, attendance, marks)
+    return _academic_messages(student_context, rag_context, query, intent)
+
+
+def _ask(llm, student_id: str, messages):
+    try:
+        response = llm.invoke(messages)
+        return student_id, response.content.strip(), None
+    except Exception as exc:  # keep going; the student is retried on the next run
+        return student_id, None, str(exc)
+
+
+def run_batch_advisories(
+    session: Session,
+    out_path: str,
+    query: str = DEFAULT_ADVISORY_QUERY,
+    intent: Optional[str] = DEFAULT_INTENT,
+    workers: int = 4,
+    chunk_size: int = 200,
+    limit: Optional[int] = None,
+    progress=print,
+) -> dict:
+    """
+    Generate an advisory for every student without one in out_path.
+
+    Returns {"generated", "failed", "skipped", "seconds", "students_per_minute"}.
+    """
+    intent = intent or detect_query_type(query)
+    done = _load_checkpoint(out_path)
+    errors_path = out_path + ".errors.jsonl"
+
+    # build missing snapshots up front and commit them, so the long LLM run
+    # below never holds a write transaction (and the SQLite write lock)
+    backfill_student_analytics(session)
+
+    # the question is the same for everyone, so retrieval happens once
+    rag_context = "" if intent == "general" else _retrieve_rag_context(query)
+    llm = get_chat_llm()
+    model_name = get_chat_model_name()
+
+    stats = {"generated": 0, "failed": 0, "skipped": len(done)}
+    start = time.perf_counter()
+
+    def report():
+        elapsed = time.perf_counter() - start
+        processed = stats["generated"] + stats["failed"]
+        rate = processed / elapsed * 60 if elapsed > 0 else 0.0
+        progress(
+            f"{stats['generated']} generated, {stats['failed']} failed, "
+            f"{stats['skipped']} already done · {rate:.1f} students/min"
+        )
+        return elapsed, rate
+
+    with open(out_path, "a", encoding="utf-8") as out, \
+            open(errors_path, "a", encoding="utf-8") as errors, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="advisory") as pool:
+
+        pending = set()
+
+        def collect(futures):
+            for future in futures:
+                student_id, answer, error = future.result()
+                if error is None:
+                    record = {
+                        "student_id": student_id,
+                        "intent": intent,
+                        "model": model_name,
+                        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        "answer": answer,
+                    }
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    stats["generated"] += 1
+                else:
+                    errors.write(json.dumps({"student_id": student_id, "error": error}) + "\n")
+                    errors.flush()
+                    stats["failed"] += 1
+                if (stats["generated"] + stats["failed"]) % 50 == 0:
+                    report()
+
+        for chunk in _student_chunks(session, chunk_size, done, limit):
+            ids = [s.student_id for s in chunk]
+            analytics = get_analytics_for_students(session, ids)
+            marks = get_marks_for_students(session, ids)
+
+            for student in chunk:
+                snapshot = analytics.get(student.student_id)
+                messages = _advisory_messages(
+                    student,
+                    snapshot.attendance_summary if snapshot is not None else None,
+                    marks[student.student_id],
+                    intent, rag_context, query,
+                )
+                # bound in-flight work so memory stays flat for big cohorts
+                while len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+                pending.add(pool.submit(_ask, llm, student.student_id, messages))
+
+        finished, _ = wait(pending)
+        collect(finished)
+
+    elapsed, rate = report()
+    stats["seconds"] = elapsed
+    stats["students_per_minute"] = rate
+    return stats
+
+
+def main():
+    from backend.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Generate mentor advisories for every student.")
+    parser.add_argument("--out", default="advisories.jsonl", help="output JSONL (also the resume checkpoint)")
+    parser.add_argument("--query", default=DEFAULT_ADVISORY_QUERY, help="advisory question sent for each student")
+    parser.add_argument("--intent", default=DEFAULT_INTENT,
+                        help="context to include: attendance, marks, general or advisory (full)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent LLM calls")
+    parser.add_argument("--chunk-size", type=int, default=200, help="students loaded per query")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many new students")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        print(f"🧠 Generating advisories into {args.out} ({args.workers} workers)...")
+        stats = run_batch_advisories(
+            session,
+            args.out,
+            query=args.query,
+            intent=args.intent,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            limit=args.limit,
+        )
+    finally:
+        session.close()
+
+    print(
+        f"✅ Done in {stats['seconds']:.1f}s: {stats['generated']} generated, "
+        f"{stats['failed']} failed, {stats['skipped']} skipped "
+        f"({stats['students_per_minute']:.1f} students/min)."
+    )
+
+
+if __name__ == "__main__":
+    main()
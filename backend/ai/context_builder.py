@@ -3,23 +3,18 @@
 from typing import List
 from sqlalchemy.orm import Session
 
-from backend.crud import (
-    get_student_by_student_id,
-    get_attendance_for_student,
-    get_marks_for_student,
-)
-from backend.ai.attendance_utils import compute_attendance_insights
+from backend.crud import StudentBundle, load_student_bundle
 
 
-def _format_attendance_lines(attendance_records) -> List[str]:
+def _format_attendance_lines(attendance_summary) -> List[str]:
+    """Lines from the precomputed StudentAnalytics.attendance_summary entries."""
     lines = []
-    for a in attendance_records:
-        pct, needed = compute_attendance_insights(a)
+    for a in attendance_summary:
         lines.append(
-            f"- {a.course_code} ({a.course_name}): "
-            f"{a.attended}/{a.total_classes} classes "
-            f"({pct:.1f}%), needs approx {needed} more continuous classes "
-            f"to reach {a.threshold}% attendance."
+            f"- {a['course_code']} ({a['course_name']}): "
+            f"{a['attended']}/{a['total_classes']} classes "
+            f"({a['pct']:.1f}%), needs approx {a['needed']} more continuous classes "
+            f"to reach {a['threshold']}% attendance."
         )
     return lines
 
@@ -39,16 +34,16 @@ def _format_marks_lines(marks_records) -> List[str]:
     return lines
 
 
-def build_attendance_context(session: Session, student_id: str) -> str:
-    """Context string focusing only on attendance."""
-    student = get_student_by_student_id(session, student_id)
-    attendance = get_attendance_for_student(session, student_id)
+def _student_header_lines(student) -> List[str]:
+    return [
+        f"Student: {student.name} (ID: {student.student_id})",
+        f"Branch: {student.branch}, Semester: {student.semester}, Section: {student.section}",
+    ]
 
-    lines = []
-    lines.append(f"Student: {student.name} (ID: {student.student_id})")
-    lines.append(
-        f"Branch: {student.branch}, Semester: {student.semester}, Section: {student.section}"
-    )
+
+def format_attendance_context(student, attendance) -> str:
+    """Attendance-only context from an already-loaded attendance summary."""
+    lines = _student_header_lines(student)
 
     lines.append("\nAttendance:")
     if not attendance:
@@ -59,16 +54,9 @@ def build_attendance_context(session: Session, student_id: str) -> str:
     return "\n".join(lines)
 
 
-def build_marks_context(session: Session, student_id: str) -> str:
-    """Context string focusing only on marks/performance."""
-    student = get_student_by_student_id(session, student_id)
-    marks = get_marks_for_student(session, student_id)
-
-    lines = []
-    lines.append(f"Student: {student.name} (ID: {student.student_id})")
-    lines.append(
-        f"Branch: {student.branch}, Semester: {student.semester}, Section: {student.section}"
-    )
+def format_marks_context(student, marks) -> str:
+    """Marks-only context from already-loaded rows."""
+    lines = _student_header_lines(student)
 
     lines.append("\nMarks:")
     if not marks:
@@ -79,17 +67,9 @@ def build_marks_context(session: Session, student_id: str) -> str:
     return "\n".join(lines)
 
 
-def build_full_student_context(session: Session, student_id: str) -> str:
-    """Attendance + marks, for general questions."""
-    student = get_student_by_student_id(session, student_id)
-    attendance = get_attendance_for_student(session, student_id)
-    marks = get_marks_for_student(session, student_id)
-
-    lines = []
-    lines.append(f"Student: {student.name} (ID: {student.student_id})")
-    lines.append(
-        f"Branch: {student.branch}, Semester: {student.semester}, Section: {student.section}"
-    )
+def format_full_student_context(student, attendance, marks) -> str:
+    """Attendance + marks context from an already-loaded summary and mark rows."""
+    lines = _student_header_lines(student)
 
     lines.append("\nAttendance:")
     if not attendance:
@@ -106,6 +86,30 @@ def build_full_student_context(session: Session, student_id: str) -> str:
     return "\n".join(lines)
 
 
+def build_context_from_bundle(bundle: StudentBundle, query_type: str) -> str:
+    """Context string for a mentor intent from an already-loaded bundle (no SQL)."""
+    if query_type == "attendance":
+        return format_attendance_context(bundle.student, bundle.attendance)
+    if query_type in ("marks", "gpa"):
+        return format_marks_context(bundle.student, bundle.marks)
+    return format_full_student_context(bundle.student, bundle.attendance, bundle.marks)
+
+
+def build_attendance_context(session: Session, student_id: str) -> str:
+    """Context string focusing only on attendance."""
+    return build_context_from_bundle(load_student_bundle(session, student_id), "attendance")
+
+
+def build_marks_context(session: Session, student_id: str) -> str:
+    """Context string focusing only on marks/performance."""
+    return build_context_from_bundle(load_student_bundle(session, student_id), "marks")
+
+
+def build_full_student_context(session: Session, student_id: str) -> str:
+    """Attendance + marks, for general questions."""
+    return build_context_from_bundle(load_student_bundle(session, student_id), "full")
+
+
 # Backwards compatibility, if other code still imports this name
 def build_student_context(session: Session, student_id: str) -> str:
     return build_full_student_context(session, student_id)
@@ -0,0 +1,104 @@
+# backend/ai/embedding_benchmark.py
+#
+# Local embedding throughput (chunks/sec) across batch sizes and thread
+# counts, for torch and the ONNX backends (EMBED_PROVIDER=local-onnx).
+#
+#   python -m backend.ai.embedding_benchmark
+#   python -m backend.ai.embedding_benchmark --chunks 2000 --batch-sizes 16 32 64 --threads 1 4 8
+#   python -m backend.ai.embedding_benchmark --backends torch onnx onnx-int8
+#
+# The corpus is the docs/ chunks the vector store indexes, repeated up to
+# --chunks. The model is loaded once (through the same process-wide cache
+# the app uses) and the embedding cache is bypassed, so every run encodes
+# every chunk. The first torch row is the previous behaviour for comparison:
+# default batch size, progress bar on and the result converted to lists.
+# ONNX sessions are created per thread count (exporting the model first if
+# needed); load times are printed separately from throughput.
+
+import argparse
+import time
+
+
+def _corpus(n: int):
+    from backend.ai.vector_store import load_split_documents
+
+    texts = [doc.page_content for doc in load_split_documents()]
+    if not texts:
+        raise SystemExit("❌ No docs/ chunks to embed.")
+    return (texts * (n // len(texts) + 1))[:n]
+
+
+def _chunks_per_sec(encode, texts) -> float:
+    start = time.perf_counter()
+    encode(texts)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def _torch_rows(args, texts):
+    import torch
+
+    from backend.ai import llm_client
+
+    start = time.perf_counter()
+    model = llm_client.get_local_sentence_transformer(args.model)
+    print(f"🧠 torch: loaded + warmed up in {time.perf_counter() - start:.1f}s")
+    # a second lookup is what every later embeddings object pays
+    start = time.perf_counter()
+    llm_client.get_local_sentence_transformer(args.model)
+    print(f"♻️ cached lookup: {(time.perf_counter() - start) * 1e6:.1f} µs")
+
+    default_threads = torch.get_num_threads()
+    rate = _chunks_per_sec(
+        lambda t: model.encode(t, show_progress_bar=True, convert_to_numpy=True).tolist(), texts
+    )
+    yield "torch (old)", default_threads, 32, rate
+
+    for threads in args.threads:
+        torch.set_num_threads(threads or default_threads)
+        for batch_size in args.batch_sizes:
+            embeddings = llm_client.LocalSentenceTransformerEmbeddings(args.model, batch_size=batch_size)
+            yield "torch", torch.get_num_threads(), batch_size, _chunks_per_sec(embeddings.embed_documents_array, texts)
+    torch.set_num_threads(default_threads)
+
+
+def _onnx_rows(args, texts, quantized: bool):
+    from backend.ai.onnx_embeddings import OnnxSentenceEmbeddings
+
+    label = "onnx-int8" if quantized else "onnx"
+    for threads in args.threads:
+        start = time.perf_counter()
+        OnnxSentenceEmbeddings(args.model, quantized=quantized, threads=threads)
+        print(f"🧠 {label} ({threads or 'default'} threads): loaded + warmed up in "
+              f"{time.perf_counter() - start:.1f}s")
+        for batch_size in args.batch_sizes:
+            embeddings = OnnxSentenceEmbeddings(args.model, batch_size=batch_size, quantized=quantized,
+                                                threads=threads)
+            yield label, threads or "default", batch_size, _chunks_per_sec(embeddings.embed_documents_array, texts)
+
+
+def main():
+    from backend.ai import llm_client
+
+    parser = argparse.ArgumentParser(description="Benchmark local embedding throughput (torch vs ONNX).")
+    parser.add_argument("--model", default=llm_client.LOCAL_EMBED_MODEL)
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 16, 32, 64, 128])
+    parser.add_argument("--threads", type=int, nargs="+", default=[0], help="intra-op threads (0 = default)")
+    parser.add_argument("--backends", nargs="+", default=["torch"], choices=["torch", "onnx", "onnx-int8"])
+    args = parser.parse_args()
+
+    texts = _corpus(args.chunks)
+    rows = []
+    for backend in args.backends:
+        if backend == "torch":
+            rows.extend(_torch_rows(args, texts))
+        else:
+            rows.extend(_onnx_rows(args, texts, quantized=backend == "onnx-int8"))
+
+    print(f"\n{'backend':>12} {'threads':>8} {'batch':>6} {'chunks/s':>10}")
+    for backend, threads, batch_size, rate in rows:
+        print(f"{backend:>12} {threads:>8} {batch_size:>6} {rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# backend/ai/embedding_cache.py
+#
+# Caching wrapper around any LangChain Embeddings object.
+# Vectors are stored as float32 blobs in a small SQLite file, with a bounded
+# in-memory LRU in front, so repeated text (doc chunks on every re-index,
+# the canned mentor prompts) is only embedded once.
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+EMBED_CACHE_PATH = os.getenv(
+    "EMBED_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "embeddings.sqlite3")
+)
+EMBED_CACHE_MEMORY_SIZE = int(os.getenv("EMBED_CACHE_MEMORY_SIZE", "4096"))
+
+
+def _to_blob(vector) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _from_blob(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+def embed_documents_array(embeddings: Embeddings, texts: List[str]) -> np.ndarray:
+    """
+    Document embeddings as one float32 matrix. Providers with an
+    `embed_documents_array` method hand theirs over without the List[List[float]]
+    round trip of the Embeddings interface.
+    """
+    embed = getattr(embeddings, "embed_documents_array", None)
+    if embed is not None:
+        return embed(texts)
+    return np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+
+
+class EmbeddingCache:
+    """
+    Process-wide vector cache: LRU dict in memory, SQLite on disk.
+
+    Keys are hex digests built by CachedEmbeddings; this class only stores
+    and counts.
+    """
+
+    def __init__(self, path: str = EMBED_CACHE_PATH, memory_size: int = EMBED_CACHE_MEMORY_SIZE):
+        self.path = path
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> dict:
+        """Return {key: vector} for every key found in memory or on disk."""
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+
+            # SQLite caps the number of bound parameters, so look up in batches
+            for i in range(0, len(missing), 500):
+                batch = missing[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    vector = _from_blob(blob)
+                    found[key] = vector
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+
+            self.misses += sum(1 for key in set(keys) if key not in found)
+        return found
+
+    def put_many(self, items: dict):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)",
+                [(key, len(vec), _to_blob(vec)) for key, vec in items.items()],
+            )
+            self._conn.commit()
+            for key, vec in items.items():
+                self._remember(key, np.asarray(vec, dtype=np.float32))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Shared cache instance, opened on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache()
+    return _cache
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that looks vectors up by (model id, kind, text hash)
+    before calling the wrapped provider.
+
+    Documents and queries are cached separately because some providers embed
+    them differently. embed_documents_array returns the vectors as one
+    float32 matrix (cache hits are stored that way already).
+    """
+
+    def __init__(self, inner: Embeddings, model_id: str, cache: Optional[EmbeddingCache] = None):
+        self.inner = inner
+        self.model_id = model_id
+        self.cache = cache or get_embedding_cache()
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(
+            f"{self.model_id}\0{kind}\0{text}".encode("utf-8")
+        ).hexdigest()
+
+    def _lookup(self, texts: List[str]) -> list:
+        keys = [self._key("doc", t) for t in texts]
+        found = self.cache.get_many(keys)
+
+        # embed each distinct missing text once
+        todo = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in todo:
+                todo[key] = text
+
+        if todo:
+            vectors = embed_documents_array(self.inner, list(todo.values()))
+            new_items = dict(zip(todo.keys(), vectors))
+            self.cache.put_many(new_items)
+            found.update(new_items)
+
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [v.tolist() for v in self._lookup(texts)]
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        vectors = self._lookup(texts)
+        return np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key("query", text)
+        found = self.cache.get_many([key])
+        if key in found:
+            return found[key].tolist()
+
+        vector = self.inner.embed_query(text)
+        self.cache.put_many({key: vector})
+        return list(vector)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
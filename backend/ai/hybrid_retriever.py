@@ -0,0 +1,204 @@
+# backend/ai/hybrid_retriever.py
+#
+# Hybrid retrieval for the mentor: BM25 over the docs/ chunks fused with the
+# vector store's results by reciprocal rank fusion (RRF).
+#
+# Course codes, topics and numbers ("DBMS", "deadlocks", "75%") often match
+# lexically better than semantically. The BM25 index is built in memory from
+# the same chunks the vector store holds (load_split_documents) and scoring
+# it takes well under a millisecond, so it runs first: when its top hit
+# contains every query term and clearly beats the runner-up, the lexical
+# results are returned without an embedding call. Otherwise the vector
+# search runs and both rankings are merged with RRF.
+#
+#   python -m backend.ai.hybrid_retriever "how many classes to reach 75%"
+
+import asyncio
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+
+from backend.ai.vector_store import get_vectorstore, load_split_documents, sync_generation
+
+logger = logging.getLogger(__name__)
+
+# candidates taken from each ranking before fusion
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+# standard RRF damping constant
+RRF_K = int(os.getenv("RRF_K", "60"))
+# lexical fast path: top1 / (top1 + top2) needed to skip the vector search;
+# set HYBRID_FAST_PATH=0 to always fuse
+HYBRID_FAST_PATH = os.getenv("HYBRID_FAST_PATH", "1").lower() not in ("0", "false", "no")
+LEXICAL_CONFIDENCE = float(os.getenv("LEXICAL_CONFIDENCE", "0.6"))
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or "
+    "should the their there this to what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word / number tokens; a trailing % is kept ("75%")."""
+    return [t for t in re.findall(r"[a-z0-9]+%?", text.lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of LangChain documents."""
+
+    def __init__(self, documents, k1: float = 1.5, b: float = 0.75):
+        self.documents = list(documents)
+        self.k1 = k1
+        self.b = b
+
+        postings = {}
+        lengths = np.zeros(len(self.documents), dtype=np.float32)
+        for i, doc in enumerate(self.documents):
+            counts = Counter(tokenize(doc.page_content))
+            lengths[i] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(i)
+                postings[term][1].append(tf)
+
+        n = len(self.documents)
+        avg_len = float(lengths.mean()) if n else 1.0
+        # per-document length normalization, precomputed once
+        self._norm = self.k1 * (1 - self.b + self.b * lengths / max(avg_len, 1e-9))
+        self._postings = {
+            term: (
+                np.asarray(ids, dtype=np.int32),
+                np.asarray(tfs, dtype=np.float32),
+                math.log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5)),
+            )
+            for term, (ids, tfs) in postings.items()
+        }
+
+    def search(self, query: str, k: int):
+        """
+        [(doc_index, score), ...] best first, plus whether the best hit
+        contains every query term.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        hits = np.zeros(len(self.documents), dtype=np.int32)
+        for term in terms:
+            entry = self._postings.get(term)
+            if entry is None:
+                continue
+            ids, tfs, idf = entry
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + self._norm[ids])
+            hits[ids] += 1
+
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched):
+            return [], False
+        top = matched[np.argsort(-scores[matched], kind="stable")[:k]]
+        return [(int(i), float(scores[i])) for i in top], bool(hits[top[0]] == len(terms))
+
+
+# One index per process, like the vector store handle, rebuilt whenever the
+# vector store is re-synced so both sides rank the same chunks.
+_bm25 = None
+_bm25_generation = None
+_bm25_lock = threading.Lock()
+
+
+def _bm25_current() -> bool:
+    return _bm25 is not None and _bm25_generation == sync_generation()
+
+
+def get_bm25_index(refresh: bool = False) -> BM25Index:
+    """Process-wide BM25 index over the docs/ chunks; refresh=True rebuilds it."""
+    global _bm25, _bm25_generation
+    if _bm25_current() and not refresh:
+        return _bm25
+    with _bm25_lock:
+        if not _bm25_current() or refresh:
+            generation = sync_generation()
+            _bm25 = BM25Index(load_split_documents())
+            _bm25_generation = generation
+        return _bm25
+
+
+def _doc_key(doc):
+    return doc.metadata.get("chunk_id") or doc.page_content
+
+
+def reciprocal_rank_fusion(rankings, k: int, rrf_k: int = RRF_K):
+    """Merge ranked document lists: score = sum of 1 / (rrf_k + rank)."""
+    scores, docs = {}, {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = _doc_key(doc)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [docs[key] for key in best]
+
+
+def _lexical(query: str, index: BM25Index = None):
+    """(BM25 candidate documents, whether they are confident enough to use alone)."""
+    index = index or get_bm25_index()
+    ranked, all_terms = index.search(query, HYBRID_CANDIDATES)
+    docs = [index.documents[i] for i, _score in ranked]
+    if not HYBRID_FAST_PATH or not ranked or not all_terms:
+        return docs, False
+    top = ranked[0][1]
+    second = ranked[1][1] if len(ranked) > 1 else 0.0
+    return docs, top / (top + second) >= LEXICAL_CONFIDENCE
+
+
+def hybrid_search(query: str, k: int = 4):
+    """Top-k chunks for `query` from BM25 + vector search (or BM25 alone when confident)."""
+    lexical, confident = _lexical(query)
+    if confident:
+        logger.debug("hybrid retrieval: lexical fast path for %r", query)
+        return lexical[:k]
+    dense = get_vectorstore().similarity_search(query, k=HYBRID_CANDIDATES)
+    return reciprocal_rank_fusion([lexical, dense], k)
+
+
+async def ahybrid_search(query: str, k: int = 4):
+    """Async hybrid_search; the vector search uses the store's async API."""
+    # building the index loads and splits every doc: keep that off the event loop
+    index = _bm25 if _bm25_current() else await asyncio.to_thread(get_bm25_index)
+    lexical, confident = _lexical(query, index)
+    if confident:
+        logger.debug("hybrid retrieval: lexical fast path for %r", query)
+        return lexical[:k]
+    # the first call may have to load/build the store, which is blocking
+    vectorstore = await asyncio.to_thread(get_vectorstore)
+    dense = await vectorstore.asimilarity_search(query, k=HYBRID_CANDIDATES)
+    return reciprocal_rank_fusion([lexical, dense], k)
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Show what hybrid retrieval returns for a query.")
+    parser.add_argument("query")
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--lexical", action="store_true", help="BM25 only (no embedding call)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.lexical:
+        docs, confident = _lexical(args.query)
+        docs = docs[:args.k]
+        print(f"🔎 BM25 ({'confident' if confident else 'not confident'})")
+    else:
+        docs = hybrid_search(args.query, args.k)
+    print(f"⏱ {(time.perf_counter() - start) * 1000:.1f} ms")
+    for doc in docs:
+        source = os.path.basename(doc.metadata.get("source", ""))
+        print(f"\n--- {source} ---\n{doc.page_content[:300]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 # backend/ai/llm_client.py
+import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 import os.path as osp
-from sentence_transformers import SentenceTransformer
-from langchain.embeddings.base import Embeddings
+from langchain_core.embeddings import Embeddings
 
+logger = logging.getLogger(__name__)
 
 BASE_DIR = osp.abspath(osp.join(osp.dirname(__file__), "..", ".."))
 load_dotenv(osp.join(BASE_DIR, ".env"))
@@ -16,28 +19,183 @@ EMBED_PROVIDER = os.getenv("EMBED_PROVIDER", "openai")
 OPENAI_EMBED_MODEL = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
 GEMINI_EMBED_MODEL = os.getenv("GEMINI_EMBED_MODEL", "models/embedding-001")
 OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+LOCAL_EMBED_MODEL = os.getenv("LOCAL_EMBED_MODEL", "sentence-transformers/all-mpnet-base-v2")
 
-def get_chat_llm():
+# local (sentence-transformers) encoding: batch size, torch intra-op threads
+# (0 = torch default) and whether vectors are L2-normalized
+LOCAL_EMBED_BATCH_SIZE = int(os.getenv("LOCAL_EMBED_BATCH_SIZE", "32"))
+LOCAL_EMBED_THREADS = int(os.getenv("LOCAL_EMBED_THREADS", "0"))
+LOCAL_EMBED_NORMALIZE = os.getenv("LOCAL_EMBED_NORMALIZE", "0").lower() not in ("0", "false", "no")
+
+# set EMBED_CACHE=0 to always call the provider
+EMBED_CACHE = os.getenv("EMBED_CACHE", "1").lower() not in ("0", "false", "no")
+
+# chat model names
+OLLAMA_LLM_MODEL = os.getenv("OLLAMA_LLM_MODEL", "mistral")
+GROQ_LLM_MODEL = os.getenv("GROQ_LLM_MODEL", "llama-3.1-8b-instant")
+GEMINI_LLM_MODEL = os.getenv("GEMINI_LLM_MODEL", "gemini-1.5-flash")
+OPENAI_CHAT_MODEL = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
+
+# per-provider request timeouts, in seconds
+LLM_TIMEOUTS = {
+    "ollama": float(os.getenv("OLLAMA_TIMEOUT", "120")),
+    "groq": float(os.getenv("GROQ_TIMEOUT", "30")),
+    "gemini": float(os.getenv("GEMINI_TIMEOUT", "60")),
+    "openai": float(os.getenv("OPENAI_TIMEOUT", "60")),
+}
+
+# keep-alive pool size for the HTTP clients shared by pooled chat models
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+
+# (provider, model) -> {"llm", "created_at", "warm", "last_error", "last_checked", "latency"}
+_chat_clients = {}
+_chat_clients_lock = threading.Lock()
+_http_clients = []
+
+
+def _chat_config():
+    """Resolve the configured chat provider (unknown ones fall back to Ollama) and model."""
     provider = LLM_PROVIDER.lower()
-    if provider == "ollama":
-        from langchain_community.chat_models import ChatOllama
-        return ChatOllama(model=os.getenv("OLLAMA_LLM_MODEL", "mistral"))
+    if provider == "groq":
+        return "groq", GROQ_LLM_MODEL
+    if provider == "gemini":
+        return "gemini", GEMINI_LLM_MODEL
+    if provider == "openai":
+        return "openai", OPENAI_CHAT_MODEL
+    return "ollama", OLLAMA_LLM_MODEL
+
+
+def get_chat_model_name() -> str:
+    """"provider:model" of the chat LLM returned by get_chat_llm()."""
+    provider, model = _chat_config()
+    return f"{provider}:{model}"
+
+
+def _pooled_http_clients(timeout: float):
+    """A sync + async httpx client pair with keep-alive connection pooling."""
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+        keepalive_expiry=60,
+    )
+    sync_client = httpx.Client(limits=limits, timeout=timeout)
+    async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+    _http_clients.extend([sync_client, async_client])
+    return sync_client, async_client
+
+
+def _build_chat_llm(provider: str, model: str):
+    timeout = LLM_TIMEOUTS[provider]
     if provider == "groq":
         from langchain_groq import ChatGroq
-        return ChatGroq(model_name=os.getenv("GROQ_LLM_MODEL", "llama-3.1-8b-instant"))
+        http_client, http_async_client = _pooled_http_clients(timeout)
+        return ChatGroq(
+            model_name=model,
+            timeout=timeout,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
     if provider == "gemini":
         from langchain_google_genai import ChatGoogleGenerativeAI
-        return ChatGoogleGenerativeAI(model=os.getenv("GEMINI_LLM_MODEL", "gemini-1.5-flash"))
+        return ChatGoogleGenerativeAI(model=model, timeout=timeout)
     if provider == "openai":
-        from langchain.chat_models import ChatOpenAI
-        return ChatOpenAI(model=os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini"), temperature=0.2)
-    # fallback
-    from langchain_community.chat_models import ChatOllama
-    return ChatOllama(model=os.getenv("OLLAMA_LLM_MODEL", "mistral"))
+        # the langchain-openai class takes separate sync and async httpx clients
+        from langchain_openai import ChatOpenAI
+        http_client, http_async_client = _pooled_http_clients(timeout)
+        return ChatOpenAI(
+            model=model,
+            temperature=0.2,
+            timeout=timeout,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
+    # Ollama: the client keeps one httpx connection pool per instance
+    from langchain_ollama import ChatOllama
+    return ChatOllama(model=model, client_kwargs={"timeout": timeout})
+
+
+def get_chat_llm():
+    """
+    Return the process-wide chat model for the configured provider.
+
+    Clients are created once per (provider, model) and reused, so requests
+    share keep-alive HTTP connections instead of paying for a new client
+    (and TLS handshake) on every mentor question.
+    """
+    key = _chat_config()
+    entry = _chat_clients.get(key)
+    if entry is None:
+        with _chat_clients_lock:
+            entry = _chat_clients.get(key)
+            if entry is None:
+                entry = {
+                    "llm": _build_chat_llm(*key),
+                    "created_at": time.time(),
+                    "warm": False,
+                    "last_error": None,
+                    "last_checked": None,
+                    "latency": None,
+                }
+                _chat_clients[key] = entry
+    return entry["llm"]
+
+
+def warm_chat_llm() -> dict:
+    """
+    Send a tiny request through the pooled client so the connection is open
+    before the first real question. Records the outcome as the client's
+    health state and returns it.
+    """
+    llm = get_chat_llm()
+    entry = _chat_clients[_chat_config()]
+
+    start = time.perf_counter()
+    try:
+        llm.invoke("ping")
+    except Exception as exc:  # provider down, bad key, timeout...
+        entry.update(warm=False, last_error=str(exc))
+    else:
+        entry.update(warm=True, last_error=None, latency=time.perf_counter() - start)
+    entry["last_checked"] = time.time()
+    return chat_client_status()[get_chat_model_name()]
+
+
+def chat_client_status() -> dict:
+    """Health/warm state of every pooled chat client, keyed by "provider:model"."""
+    with _chat_clients_lock:
+        return {
+            f"{provider}:{model}": {k: v for k, v in entry.items() if k != "llm"}
+            for (provider, model), entry in _chat_clients.items()
+        }
+
+
+def reset_chat_clients():
+    """Drop pooled chat models and close their HTTP connections."""
+    with _chat_clients_lock:
+        _chat_clients.clear()
+        for client in _http_clients:
+            # async clients only have aclose(); they are released with the loop
+            if hasattr(client, "close"):
+                client.close()
+        _http_clients.clear()
 
 
 def get_embedding_model():
-    """Return an embeddings object compatible with LangChain/Chroma."""
+    """
+    Return an embeddings object compatible with LangChain/Chroma.
+    Unless EMBED_CACHE=0, it is wrapped in a disk-backed cache.
+    """
+    embeddings = _build_embedding_model()
+    if not EMBED_CACHE:
+        return embeddings
+
+    from backend.ai.embedding_cache import CachedEmbeddings
+    return CachedEmbeddings(embeddings, get_embedding_model_id())
+
+
+def _build_embedding_model():
     provider = EMBED_PROVIDER.lower()
 
     if provider == "openai":
@@ -52,35 +210,111 @@ def get_embedding_model():
         # Google (Gemini) embeddings via LangChain Google wrapper
         from langchain_google_genai import GoogleGenerativeAIEmbeddings
         api_key = os.getenv("GOOGLE_API_KEY")
-        model=os.getenv("GEMINI_EMBED_MODEL")
+        model = GEMINI_EMBED_MODEL
         if not api_key:
             raise RuntimeError("GOOGLE_API_KEY not set in environment")
         return GoogleGenerativeAIEmbeddings(model=model)
 
     if provider == "local":
-        return LocalSentenceTransformerEmbeddings(
-            model_name="sentence-transformers/all-mpnet-base-v2"
+        return LocalSentenceTransformerEmbeddings(model_name=LOCAL_EMBED_MODEL)
+
+    if provider == "local-onnx":
+        # same model, exported to ONNX and run by onnxruntime (see onnx_embeddings.py)
+        from backend.ai.onnx_embeddings import OnnxSentenceEmbeddings
+        return OnnxSentenceEmbeddings(
+            LOCAL_EMBED_MODEL, batch_size=LOCAL_EMBED_BATCH_SIZE, normalize=LOCAL_EMBED_NORMALIZE
         )
 
     # fallback: Ollama (local)
     if provider == "ollama":
         from langchain_ollama import OllamaEmbeddings
-        return OllamaEmbeddings(model=os.getenv("OLLAMA_EMBED_MODEL"))
+        return OllamaEmbeddings(model=OLLAMA_EMBED_MODEL)
 
     # final fallback to OpenAI
     from langchain.embeddings import OpenAIEmbeddings
     return OpenAIEmbeddings(model=OPENAI_EMBED_MODEL)
 
+def get_embedding_model_id() -> str:
+    """
+    Stable "provider:model" identifier for the configured embeddings.
+    Used to tell whether a persisted vector store was built with the same model.
+    """
+    provider = EMBED_PROVIDER.lower()
+    if provider == "gemini":
+        return f"gemini:{GEMINI_EMBED_MODEL}"
+    if provider == "local":
+        # normalized vectors are different vectors: keep them apart in caches
+        return f"local:{LOCAL_EMBED_MODEL}" + (":normalized" if LOCAL_EMBED_NORMALIZE else "")
+    if provider == "local-onnx":
+        from backend.ai.onnx_embeddings import LOCAL_ONNX_QUANTIZE
+        return (f"local-onnx:{LOCAL_EMBED_MODEL}" + (":int8" if LOCAL_ONNX_QUANTIZE else "")
+                + (":normalized" if LOCAL_EMBED_NORMALIZE else ""))
+    if provider == "ollama":
+        return f"ollama:{OLLAMA_EMBED_MODEL}"
+    return f"openai:{OPENAI_EMBED_MODEL}"
+
+
+# model name -> loaded SentenceTransformer, shared by every embeddings object
+_local_models = {}
+_local_models_lock = threading.Lock()
+
+
+def get_local_sentence_transformer(model_name: str = LOCAL_EMBED_MODEL):
+    """
+    Process-wide SentenceTransformer for `model_name`, loaded and warmed up
+    on first use (one throwaway encode, so the first real request doesn't
+    pay for lazy initialization).
+    """
+    model = _local_models.get(model_name)
+    if model is not None:
+        return model
+    with _local_models_lock:
+        model = _local_models.get(model_name)
+        if model is None:
+            # torch + sentence-transformers are heavy; only load them when this provider is used
+            import torch
+            from sentence_transformers import SentenceTransformer
+
+            start = time.perf_counter()
+            if LOCAL_EMBED_THREADS > 0:
+                torch.set_num_threads(LOCAL_EMBED_THREADS)
+            model = SentenceTransformer(model_name)
+            model.encode(["warm-up"], show_progress_bar=False)
+            logger.info(
+                "loaded %s in %.1fs (%d torch threads)",
+                model_name, time.perf_counter() - start, torch.get_num_threads(),
+            )
+            _local_models[model_name] = model
+    return model
+
+
 class LocalSentenceTransformerEmbeddings(Embeddings):
-    def __init__(self, model_name="sentence-transformers/all-mpnet-base-v2"):
-        self.model = SentenceTransformer(model_name)
+    """
+    sentence-transformers embeddings on the shared model instance.
+    embed_documents_array returns the float32 matrix without list conversion.
+    """
 
-    def embed_documents(self, texts):
+    def __init__(self, model_name=LOCAL_EMBED_MODEL, batch_size=None, normalize=None):
+        self.model = get_local_sentence_transformer(model_name)
+        self.batch_size = batch_size or LOCAL_EMBED_BATCH_SIZE
+        self.normalize = LOCAL_EMBED_NORMALIZE if normalize is None else normalize
+
+    def embed_documents_array(self, texts):
         return self.model.encode(
-            texts,
-            show_progress_bar=True,
-            convert_to_numpy=True
-        ).tolist()
+            list(texts),
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize,
+        )
+
+    def embed_documents(self, texts):
+        return self.embed_documents_array(texts).tolist()
 
     def embed_query(self, text):
-        return self.model.encode(text, convert_to_numpy=True).tolist()
+        return self.model.encode(
+            text,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize,
+        ).tolist()
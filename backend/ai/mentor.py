@@ -1,16 +1,29 @@
 # backend/ai/mentor.py
 
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
 from sqlalchemy.orm import Session
 
-from backend.ai.context_builder import (
-    build_attendance_context,
-    build_marks_context,
-    build_full_student_context,
-)
+from backend.crud import StudentBundle, load_student_bundle
+from backend.ai.context_builder import build_context_from_bundle
 from backend.ai.vector_store import get_vectorstore
-from backend.ai.llm_client import get_chat_llm
+from backend.ai.hybrid_retriever import ahybrid_search, hybrid_search
+from backend.ai.llm_client import get_chat_llm, get_chat_model_name
+from backend.ai.mentor_cache import (
+    bundle_fingerprint,
+    get_mentor_cache,
+    make_cache_key,
+)
 from langchain_core.messages import SystemMessage, HumanMessage
 
+logger = logging.getLogger(__name__)
+
+
 def detect_query_type(user_query: str) -> str:
     """Very simple intent detection based on keywords."""
     q = user_query.lower()
@@ -63,16 +76,37 @@ def build_focus_instructions(query_type: str) -> str:
         )
 
 
-def genai_mentor_answer(session: Session, student_id: str, user_query: str) -> str:
-    # 1. Detect intent
-    query_type = detect_query_type(user_query)
+RAG_K = 4
+# "hybrid" (BM25 + vectors, see hybrid_retriever) or "dense" (vectors only)
+RAG_RETRIEVER = os.getenv("RAG_RETRIEVER", "hybrid").lower()
 
-    # 2. Handle GENERAL queries separately (KEY CHANGE)
-    if query_type == "general":
-        # Light academic summary only (2–3 lines worth of data)
-        academic_hint = build_attendance_context(session, student_id)
+# Small shared pool for retrieval, so it overlaps with the SQL context build.
+_mentor_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mentor-rag")
+
+
+def _retrieve_rag_context(user_query: str) -> str:
+    if RAG_RETRIEVER == "hybrid":
+        docs = hybrid_search(user_query, RAG_K)
+    else:
+        vectorstore = get_vectorstore()
+        retriever = vectorstore.as_retriever(search_kwargs={"k": RAG_K})
+        docs = retriever.invoke(user_query)
+    return "\n\n".join(d.page_content for d in docs)
 
-        system_prompt = f"""
+
+async def _aretrieve_rag_context(user_query: str) -> str:
+    if RAG_RETRIEVER == "hybrid":
+        docs = await ahybrid_search(user_query, RAG_K)
+    else:
+        # the first call may have to load/build the store, which is blocking
+        vectorstore = await asyncio.to_thread(get_vectorstore)
+        retriever = vectorstore.as_retriever(search_kwargs={"k": RAG_K})
+        docs = await retriever.ainvoke(user_query)
+    return "\n\n".join(d.page_content for d in docs)
+
+
+def _general_messages(academic_hint: str, user_query: str):
+    system_prompt = f"""
 You are a helpful and neutral AI assistant.
 
 Answer the user's question clearly and factually.
@@ -92,31 +126,13 @@ Rules:
 - Do NOT add signatures or placeholders.
 """
 
-        llm = get_chat_llm()
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_query),
-        ]
-        response = llm.invoke(messages)
-        return response.content.strip()
-
-    # -------------------------------
-    # Academic queries (existing logic)
-    # -------------------------------
-
-    if query_type == "attendance":
-        student_context = build_attendance_context(session, student_id)
-    elif query_type in ("marks", "gpa"):
-        student_context = build_marks_context(session, student_id)
-    else:
-        student_context = build_full_student_context(session, student_id)
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_query),
+    ]
 
-    # 3. RAG only for academic queries
-    vectorstore = get_vectorstore()
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 4})
-    docs = retriever.invoke(user_query)
-    rag_context = "\n\n".join(d.page_content for d in docs)
 
+def _academic_messages(student_context: str, rag_context: str, user_query: str, query_type: str):
     focus_instructions = build_focus_instructions(query_type)
 
     system_prompt = f"""
@@ -140,11 +156,176 @@ VERY IMPORTANT RULES:
 - Structure the answer clearly with bullet points and sections.
 """
 
-    llm = get_chat_llm()
-    messages = [
+    return [
         SystemMessage(content=system_prompt),
         HumanMessage(content=user_query),
     ]
 
-    response = llm.invoke(messages)
-    return response.content.strip()
+
+def build_mentor_messages(
+    session: Session,
+    student_id: str,
+    user_query: str,
+    bundle: Optional[StudentBundle] = None,
+):
+    """
+    Build the system + user messages for a mentor question.
+
+    With a `bundle` (already loaded by the page) no SQL runs. Otherwise the
+    bundle is loaded while RAG retrieval runs in a worker thread; the
+    session stays on the calling thread.
+    """
+    query_type = detect_query_type(user_query)
+
+    # General queries: light academic summary only, no RAG
+    if query_type == "general":
+        bundle = bundle or load_student_bundle(session, student_id)
+        return _general_messages(build_context_from_bundle(bundle, "attendance"), user_query)
+
+    rag_future = _mentor_pool.submit(_retrieve_rag_context, user_query)
+    bundle = bundle or load_student_bundle(session, student_id)
+    student_context = build_context_from_bundle(bundle, query_type)
+    rag_context = rag_future.result()
+
+    return _academic_messages(student_context, rag_context, user_query, query_type)
+
+
+async def abuild_mentor_messages(
+    session: Session,
+    student_id: str,
+    user_query: str,
+    bundle: Optional[StudentBundle] = None,
+):
+    """Async build_mentor_messages: bundle load and retrieval are awaited together."""
+    query_type = detect_query_type(user_query)
+
+    if query_type == "general":
+        if bundle is None:
+            bundle = await asyncio.to_thread(load_student_bundle, session, student_id)
+        return _general_messages(build_context_from_bundle(bundle, "attendance"), user_query)
+
+    if bundle is None:
+        # SQLAlchemy is sync: the session is used by exactly one worker thread here
+        bundle, rag_context = await asyncio.gather(
+            asyncio.to_thread(load_student_bundle, session, student_id),
+            _aretrieve_rag_context(user_query),
+        )
+    else:
+        rag_context = await _aretrieve_rag_context(user_query)
+    student_context = build_context_from_bundle(bundle, query_type)
+    return _academic_messages(student_context, rag_context, user_query, query_type)
+
+
+def _cache_lookup(session: Session, student_id: str, user_query: str, bundle: Optional[StudentBundle]):
+    """
+    Returns (cache, key, fingerprint, cached_answer, bundle); cache is None
+    when caching is off. The bundle is loaded for the fingerprint if the
+    caller did not pass one, and handed back so messages can reuse it.
+    """
+    cache = get_mentor_cache()
+    if cache is None:
+        return None, None, None, None, bundle
+    bundle = bundle or load_student_bundle(session, student_id)
+    fingerprint = bundle_fingerprint(bundle)
+    key = make_cache_key(
+        fingerprint, student_id, detect_query_type(user_query), user_query,
+        get_chat_model_name(),
+    )
+    return cache, key, fingerprint, cache.get(key), bundle
+
+
+def genai_mentor_answer(
+    session: Session,
+    student_id: str,
+    user_query: str,
+    bundle: Optional[StudentBundle] = None,
+) -> str:
+    cache, key, fingerprint, cached, bundle = _cache_lookup(session, student_id, user_query, bundle)
+    if cached is not None:
+        return cached
+
+    messages = build_mentor_messages(session, student_id, user_query, bundle)
+    response = get_chat_llm().invoke(messages)
+    answer = response.content.strip()
+
+    # an empty answer would be served as a blank reply for the whole TTL
+    if cache is not None and answer:
+        cache.put(key, student_id, fingerprint, answer)
+    return answer
+
+
+async def agenai_mentor_answer(
+    session: Session,
+    student_id: str,
+    user_query: str,
+    bundle: Optional[StudentBundle] = None,
+) -> str:
+    """
+    Async entry point: context, retrieval and the LLM call are awaited, so
+    one event loop can serve many mentor requests at once.
+    """
+    cache, key, fingerprint, cached, bundle = await asyncio.to_thread(
+        _cache_lookup, session, student_id, user_query, bundle
+    )
+    if cached is not None:
+        return cached
+
+    messages = await abuild_mentor_messages(session, student_id, user_query, bundle)
+    response = await get_chat_llm().ainvoke(messages)
+    answer = response.content.strip()
+
+    if cache is not None and answer:
+        cache.put(key, student_id, fingerprint, answer)
+    return answer
+
+
+def genai_mentor_stream(
+    session: Session,
+    student_id: str,
+    user_query: str,
+    timings: Optional[dict] = None,
+    bundle: Optional[StudentBundle] = None,
+) -> Iterator[str]:
+    """
+    Streaming variant of genai_mentor_answer: yields text chunks as the LLM
+    produces them. A cached answer is yielded as a single chunk.
+
+    If `timings` is given it is filled with "ttft" (seconds until the first
+    chunk, including context + RAG), "total" and "cached". Pass the page's
+    `bundle` to skip the student SQL entirely.
+    """
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
+
+    cache, key, fingerprint, cached, bundle = _cache_lookup(session, student_id, user_query, bundle)
+    timings["cached"] = cached is not None
+    if cached is not None:
+        timings["ttft"] = timings["total"] = time.perf_counter() - start
+        yield cached
+        return
+
+    messages = build_mentor_messages(session, student_id, user_query, bundle)
+
+    parts = []
+    first = True
+    for chunk in get_chat_llm().stream(messages):
+        text = chunk.content
+        if not text:
+            continue
+        if first:
+            text = text.lstrip()
+            if not text:
+                continue
+            timings["ttft"] = time.perf_counter() - start
+            logger.info("mentor time-to-first-token: %.2fs", timings["ttft"])
+            first = False
+        parts.append(text)
+        yield text
+
+    timings["total"] = time.perf_counter() - start
+    logger.info("mentor answer streamed in %.2fs", timings["total"])
+
+    # only complete, non-empty answers are cached (the generator may be abandoned early)
+    answer = "".join(parts).strip()
+    if cache is not None and answer:
+        cache.put(key, student_id, fingerprint, answer)
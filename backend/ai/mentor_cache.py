@@ -0,0 +1,213 @@
+# backend/ai/mentor_cache.py
+#
+# Response cache for the GenAI mentor.
+# The key combines the student, a fingerprint of their attendance / marks /
+# results rows, the detected intent, the normalized question and the chat
+# model, so an answer is only reused while the data behind it is unchanged.
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from backend.crud import StudentBundle, load_student_bundle
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# memory | sqlite | off
+MENTOR_CACHE_BACKEND = os.getenv("MENTOR_CACHE_BACKEND", "memory").lower()
+MENTOR_CACHE_TTL = float(os.getenv("MENTOR_CACHE_TTL", "3600"))
+MENTOR_CACHE_SIZE = int(os.getenv("MENTOR_CACHE_SIZE", "512"))
+MENTOR_CACHE_PATH = os.getenv(
+    "MENTOR_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "mentor_cache.sqlite3")
+)
+
+
+def normalize_query(user_query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    q = re.sub(r"\s+", " ", user_query.lower()).strip()
+    return q.rstrip(" ?!.")
+
+
+def bundle_fingerprint(bundle: StudentBundle) -> str:
+    """Hash of the attendance, marks and results held by a loaded bundle."""
+    h = hashlib.sha256()
+    parts = [
+        [
+            (a["course_code"], a["total_classes"], a["attended"], a["threshold"])
+            for a in bundle.attendance
+        ],
+        [
+            (m.id, m.course_code, m.exam_type, m.score, m.max_score, m.topic_tags)
+            for m in bundle.marks
+        ],
+        [(r.id, r.semester, r.sgpa, r.cgpa) for r in bundle.results],
+    ]
+    for rows in parts:
+        for row in rows:
+            h.update(repr(row).encode("utf-8"))
+        h.update(b"|")
+    return h.hexdigest()
+
+
+def student_data_fingerprint(session: Session, student_id: str) -> str:
+    """Hash of every attendance, mark and result row of the student."""
+    return bundle_fingerprint(load_student_bundle(session, student_id))
+
+
+def make_cache_key(fingerprint: str, student_id: str, intent: str, user_query: str, model_name: str) -> str:
+    payload = json.dumps(
+        [student_id, fingerprint, intent, normalize_query(user_query), model_name]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryMentorCache:
+    """In-process LRU with TTL. Per worker; lost on restart."""
+
+    def __init__(self, max_entries: int = MENTOR_CACHE_SIZE, ttl: float = MENTOR_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, student_id, fingerprint, answer)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[3]
+
+    def put(self, key: str, student_id: str, fingerprint: str, answer: str):
+        with self._lock:
+            # answers built from an older version of this student's data are dead
+            stale = [
+                k for k, (_exp, sid, fp, _a) in self._entries.items()
+                if sid == student_id and fp != fingerprint
+            ]
+            for k in stale:
+                del self._entries[k]
+
+            self._entries[key] = (time.time() + self.ttl, student_id, fingerprint, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_student(self, student_id: str):
+        with self._lock:
+            for k in [k for k, e in self._entries.items() if e[1] == student_id]:
+                del self._entries[k]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteMentorCache:
+    """LRU with TTL in a SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path: str = MENTOR_CACHE_PATH, max_entries: int = MENTOR_CACHE_SIZE,
+                 ttl: float = MENTOR_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mentor_cache ("
+            " key TEXT PRIMARY KEY,"
+            " student_id TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " answer TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_mentor_cache_student ON mentor_cache (student_id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_mentor_cache_last_access ON mentor_cache (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, expires_at FROM mentor_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM mentor_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE mentor_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, student_id: str, fingerprint: str, answer: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM mentor_cache WHERE student_id = ? AND fingerprint != ?",
+                (student_id, fingerprint),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mentor_cache"
+                " (key, student_id, fingerprint, answer, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, student_id, fingerprint, answer, now + self.ttl, now),
+            )
+            self._conn.execute("DELETE FROM mentor_cache WHERE expires_at < ?", (now,))
+            # evict least recently used rows beyond max_entries
+            self._conn.execute(
+                "DELETE FROM mentor_cache WHERE key IN ("
+                " SELECT key FROM mentor_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def invalidate_student(self, student_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM mentor_cache WHERE student_id = ?", (student_id,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM mentor_cache")
+            self._conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_mentor_cache():
+    """Configured cache backend (MENTOR_CACHE_BACKEND), or None when it is off."""
+    global _cache
+    if MENTOR_CACHE_BACKEND in ("off", "none", "0"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if MENTOR_CACHE_BACKEND == "sqlite":
+                    _cache = SQLiteMentorCache()
+                else:
+                    _cache = MemoryMentorCache()
+    return _cache
@@ -0,0 +1,285 @@
+# backend/ai/numpy_store.py
+#
+# In-process vector store: one contiguous float32 matrix of L2-normalized
+# embeddings, searched with a single matrix-vector product.
+#
+# The RAG corpus is a few hundred chunks, so brute force is exact and faster
+# than going through a database client. Chunk ids, texts and metadata live
+# in lists parallel to the matrix rows. On disk the matrix is a plain .npy
+# file, memory-mapped on load, so every worker process shares the same
+# page-cache copy; texts and metadata sit next to it in docs.json.
+#
+# Selected with VECTOR_BACKEND=numpy (see vector_store.get_vectorstore).
+# With a `quantization` ("float16" / "int8", optionally `reduced_dim`) the
+# full-precision matrix is only the source for rebuilds: searches run on a
+# compact quantized_index file, so workers never page the float32 copy in.
+
+import json
+import logging
+import os
+import uuid
+from typing import Iterable, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from backend.ai.embedding_cache import embed_documents_array
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.npy"
+DOCS_FILE = "docs.json"
+INDEX_FILE = "index.vidx"
+# recall@4 below this is logged as a warning when the quantized index is built
+MIN_INDEX_RECALL = 0.9
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """float32 copy of `matrix` with unit-length rows (zero rows stay zero)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    LangChain VectorStore over a NumPy matrix; scores are cosine similarities.
+    With `persist_directory` every add / delete is written back to disk.
+    """
+
+    def __init__(
+        self,
+        embedding_function: Embeddings,
+        persist_directory: Optional[str] = None,
+        quantization: Optional[str] = None,
+        reduced_dim: Optional[int] = None,
+    ):
+        self._embedding = embedding_function
+        self.persist_directory = persist_directory
+        self.quantization = quantization if quantization not in (None, "", "none", "float32") else None
+        self.reduced_dim = reduced_dim or None
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._index = None
+        if persist_directory:
+            self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._ids)
+
+    def full_vectors(self) -> np.ndarray:
+        """The full-precision (normalized float32) matrix."""
+        return self._vectors
+
+    # ----- persistence -----
+
+    def _paths(self):
+        return (
+            os.path.join(self.persist_directory, VECTORS_FILE),
+            os.path.join(self.persist_directory, DOCS_FILE),
+        )
+
+    def _index_path(self):
+        return os.path.join(self.persist_directory, INDEX_FILE)
+
+    def _open_index(self):
+        """Use the quantized index file if it matches the settings and rows, else rebuild it."""
+        from backend.ai.quantized_index import QuantizedIndex, ids_digest
+
+        self._index = None
+        if not self.quantization or not len(self._ids):
+            return
+        path = self._index_path()
+        full_dim = self._vectors.shape[1]
+        stored_dim = self.reduced_dim if self.reduced_dim and self.reduced_dim < full_dim else full_dim
+        try:
+            header = QuantizedIndex.read_header(path)
+        except (OSError, ValueError):
+            header = {}
+        current = (
+            header.get("dtype") == self.quantization
+            and header.get("stored_dim") == stored_dim
+            and header.get("ids_sha256") == ids_digest(self._ids)
+        )
+        if current:
+            try:
+                self._index = QuantizedIndex.load(path)
+                return
+            except (OSError, ValueError) as exc:
+                logger.warning("quantized index unreadable (%s); rebuilding it", exc)
+        try:
+            self._build_index()
+            self._index = QuantizedIndex.load(path)
+        except (OSError, ValueError) as exc:
+            # keep serving exact float32 results rather than failing to open
+            logger.warning("quantized index unusable (%s); searching the float32 matrix", exc)
+            self._index = None
+
+    def _build_index(self):
+        from backend.ai.quantized_index import QuantizedIndex, perturbed_queries, recall_at_k
+
+        vectors = np.asarray(self._vectors)
+        index = QuantizedIndex.build(vectors, self._ids, self.quantization, self.reduced_dim)
+        index.save(self._index_path())
+        recall = recall_at_k(vectors, index, perturbed_queries(vectors))
+        # loud when the settings cost noticeable retrieval quality
+        log = logger.warning if recall < MIN_INDEX_RECALL else logger.info
+        log(
+            "built %s index (%d-d, %d bytes/vector) for %d chunks: recall@4 %.3f vs float32",
+            self.quantization, index.stored_dim, index.bytes_per_vector, len(index), recall,
+        )
+
+    def _load(self):
+        vectors_path, docs_path = self._paths()
+        if not (os.path.exists(vectors_path) and os.path.exists(docs_path)):
+            return
+        with open(docs_path, encoding="utf-8") as f:
+            docs = json.load(f)
+        vectors = np.load(vectors_path, mmap_mode="r")
+        if vectors.shape[0] != len(docs["ids"]):
+            # interrupted save: start empty, the next sync rebuilds it
+            return
+        self._vectors = vectors
+        self._ids = docs["ids"]
+        self._texts = docs["texts"]
+        self._metadatas = docs["metadatas"]
+        self._open_index()
+
+    def persist(self):
+        if not self.persist_directory:
+            return
+        os.makedirs(self.persist_directory, exist_ok=True)
+        vectors_path, docs_path = self._paths()
+        # write both files under temporary names, then swap them in
+        with open(vectors_path + ".tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(self._vectors, dtype=np.float32))
+        with open(docs_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"ids": self._ids, "texts": self._texts, "metadatas": self._metadatas}, f)
+        os.replace(vectors_path + ".tmp", vectors_path)
+        os.replace(docs_path + ".tmp", docs_path)
+        # keep serving from the mapped file rather than the in-memory copy
+        self._vectors = np.load(vectors_path, mmap_mode="r")
+        self._open_index()
+
+    def delete_collection(self):
+        """Drop every vector (and the files on disk)."""
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._ids, self._texts, self._metadatas = [], [], []
+        self._index = None
+        if self.persist_directory:
+            for path in (*self._paths(), self._index_path()):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    # ----- writes -----
+
+    def add_vectors(self, vectors, texts: List[str], metadatas=None, ids=None,
+                    persist: bool = True) -> List[str]:
+        """
+        Add precomputed embeddings (normalized here). With persist=False the
+        files on disk are left alone until the caller runs persist() itself.
+        """
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+        ids = list(ids) if ids is not None else [uuid.uuid4().hex for _ in texts]
+        if not texts:
+            return []
+        vectors = normalize_rows(vectors)
+
+        # re-adding an id replaces it
+        replaced = set(ids) & set(self._ids)
+        if replaced:
+            self.delete(list(replaced), persist=False)
+
+        if len(self._ids):
+            self._vectors = np.concatenate([np.asarray(self._vectors), vectors])
+        else:
+            self._vectors = vectors
+        self._ids.extend(ids)
+        self._texts.extend(texts)
+        self._metadatas.extend(dict(m or {}) for m in metadatas)
+        if persist:
+            self.persist()
+        return ids
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, persist: bool = True, **kwargs) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = embed_documents_array(self._embedding, texts)
+        return self.add_vectors(vectors, texts, metadatas, ids, persist=persist)
+
+    def delete(self, ids: Optional[List[str]] = None, persist: bool = True, **kwargs) -> bool:
+        if not ids:
+            return False
+        drop = set(ids)
+        keep = [i for i, chunk_id in enumerate(self._ids) if chunk_id not in drop]
+        if len(keep) == len(self._ids):
+            return False
+        self._vectors = np.ascontiguousarray(np.asarray(self._vectors)[keep])
+        self._ids = [self._ids[i] for i in keep]
+        self._texts = [self._texts[i] for i in keep]
+        self._metadatas = [self._metadatas[i] for i in keep]
+        if persist:
+            self.persist()
+        return True
+
+    def get_by_ids(self, ids, /) -> List[Document]:
+        positions = {chunk_id: i for i, chunk_id in enumerate(self._ids)}
+        return [self._document(positions[i]) for i in ids if i in positions]
+
+    # ----- search -----
+
+    def _document(self, row: int) -> Document:
+        return Document(id=self._ids[row], page_content=self._texts[row], metadata=dict(self._metadatas[row]))
+
+    def _top_k(self, query_vector, k: int):
+        if not len(self._ids):
+            return [], np.zeros(0, dtype=np.float32)
+        if self._index is not None:
+            return self._index.search(query_vector, k)
+        scores = self._vectors @ normalize_rows(query_vector)[0]
+        k = min(k, len(scores))
+        # partial selection, then sort only the k winners
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top, scores[top]
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4, **kwargs):
+        rows, scores = self._top_k(embedding, k)
+        return [(self._document(int(r)), float(s)) for r, s in zip(rows, scores)]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        return [doc for doc, _score in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs):
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        return [doc for doc, _score in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # cosine similarity in [-1, 1] -> relevance in [0, 1]
+        return lambda score: (score + 1) / 2
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, persist_directory: Optional[str] = None, **kwargs):
+        store = cls(embedding, persist_directory=persist_directory)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
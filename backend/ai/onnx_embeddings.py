@@ -0,0 +1,274 @@
+# backend/ai/onnx_embeddings.py
+#
+# CPU embeddings through onnxruntime (EMBED_PROVIDER=local-onnx).
+#
+#   python -m backend.ai.onnx_embeddings --export            # export (and quantize) LOCAL_EMBED_MODEL
+#   python -m backend.ai.onnx_embeddings --export --force    # re-export
+#
+# The sentence-transformer's encoder is exported once to ONNX under
+# LOCAL_ONNX_DIR, next to its tokenizer and a small onnx.json describing the
+# pooling (mean / cls / max) and normalization of the original pipeline.
+# With LOCAL_ONNX_QUANTIZE=1 (the default) a dynamically int8-quantized copy
+# is written too and used for inference. Exporting needs torch +
+# sentence-transformers; afterwards only onnxruntime and the tokenizer
+# (transformers) are loaded, so serving processes never import torch.
+#
+# Pooling and normalization run in NumPy. Texts are sorted by length before
+# batching so each batch pads to similar lengths.
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+LOCAL_ONNX_DIR = os.getenv("LOCAL_ONNX_DIR", os.path.join(BASE_DIR, ".cache", "onnx"))
+# dynamic int8 quantization of the weights (set LOCAL_ONNX_QUANTIZE=0 for float32)
+LOCAL_ONNX_QUANTIZE = os.getenv("LOCAL_ONNX_QUANTIZE", "1").lower() not in ("0", "false", "no")
+# onnxruntime intra-op threads (0 = onnxruntime default: one per physical core)
+LOCAL_ONNX_THREADS = int(os.getenv("LOCAL_ONNX_THREADS", os.getenv("LOCAL_EMBED_THREADS", "0")))
+
+META_FILE = "onnx.json"
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+# bump when the export layout changes so old exports are redone
+EXPORT_FORMAT = 1
+_POOLING_MODES = ("mean", "cls", "max")
+
+
+def export_dir(model_name: str) -> str:
+    return os.path.join(LOCAL_ONNX_DIR, model_name.replace("/", "__"))
+
+
+def read_meta(directory: str) -> dict:
+    try:
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _export_is_current(directory: str, model_name: str, quantize: bool) -> bool:
+    meta = read_meta(directory)
+    return (
+        meta.get("format") == EXPORT_FORMAT
+        and meta.get("model") == model_name
+        and os.path.exists(os.path.join(directory, FP32_FILE))
+        and (not quantize or os.path.exists(os.path.join(directory, INT8_FILE)))
+    )
+
+
+def export_model(model_name: str, quantize: bool = LOCAL_ONNX_QUANTIZE, force: bool = False) -> str:
+    """
+    Export `model_name` to ONNX (plus an int8 copy if `quantize`) unless a
+    current export exists. Returns the export directory.
+    """
+    directory = export_dir(model_name)
+    if not force and _export_is_current(directory, model_name, quantize):
+        return directory
+
+    import inspect
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling, Transformer
+
+    start = time.perf_counter()
+    st = SentenceTransformer(model_name, device="cpu")
+    modules = list(st)
+    unsupported = [type(m).__name__ for m in modules if not isinstance(m, (Transformer, Pooling, Normalize))]
+    if unsupported:
+        raise ValueError(f"{model_name}: cannot export pipeline modules {unsupported} to ONNX")
+    pooling = next((m for m in modules if isinstance(m, Pooling)), None)
+    pooling_mode = pooling.get_pooling_mode_str() if pooling else "mean"
+    if pooling_mode not in _POOLING_MODES:
+        raise ValueError(f"{model_name}: unsupported pooling mode {pooling_mode!r}")
+
+    encoder = st[0].auto_model.eval()
+    tokenizer = st.tokenizer
+    sample = tokenizer(["export sample text", "a second, longer export sample text"],
+                       padding=True, return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+
+    class _Encoder(torch.nn.Module):
+        # positional inputs -> token embeddings (last hidden state)
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    os.makedirs(directory, exist_ok=True)
+    fp32_path = os.path.join(directory, FP32_FILE)
+    dynamic = {"batch": 0, "sequence": 1}
+    kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False  # the TorchScript exporter handles dynamic_axes
+    with torch.no_grad():
+        torch.onnx.export(
+            _Encoder(encoder),
+            tuple(sample[n] for n in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes={n: {v: k for k, v in dynamic.items()} for n in [*input_names, "token_embeddings"]},
+            opset_version=14,
+            do_constant_folding=True,
+            **kwargs,
+        )
+    tokenizer.save_pretrained(directory)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, os.path.join(directory, INT8_FILE), weight_type=QuantType.QInt8)
+
+    meta = {
+        "format": EXPORT_FORMAT,
+        "model": model_name,
+        "pooling": pooling_mode,
+        "normalize": any(isinstance(m, Normalize) for m in modules),
+        "max_seq_length": st.max_seq_length,
+        "dim": st.get_sentence_embedding_dimension(),
+        "inputs": input_names,
+    }
+    # written last: its presence marks a complete export
+    with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    logger.info("exported %s to ONNX in %.1fs (%s)", model_name, time.perf_counter() - start, directory)
+    return directory
+
+
+# (model file, threads) -> (onnxruntime session, tokenizer, meta), shared per process
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_onnx_session(model_name: str, quantized: bool = LOCAL_ONNX_QUANTIZE, threads: int = LOCAL_ONNX_THREADS):
+    """
+    Process-wide (session, tokenizer, meta) for `model_name`, exporting the
+    model first if needed and warming the session up with one encode.
+    """
+    directory = export_dir(model_name)
+    path = os.path.join(directory, INT8_FILE if quantized else FP32_FILE)
+    key = (path, threads)
+    entry = _sessions.get(key)
+    if entry is not None:
+        return entry
+    with _sessions_lock:
+        entry = _sessions.get(key)
+        if entry is None:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+
+            export_model(model_name, quantize=quantized)
+            start = time.perf_counter()
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if threads > 0:
+                options.intra_op_num_threads = threads
+            session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+            tokenizer = AutoTokenizer.from_pretrained(directory)
+            entry = (session, tokenizer, read_meta(directory))
+            _run(entry, ["warm-up"])
+            logger.info("loaded %s in %.1fs", path, time.perf_counter() - start)
+            _sessions[key] = entry
+    return entry
+
+
+def _pool(token_embeddings: np.ndarray, attention_mask: np.ndarray, mode: str) -> np.ndarray:
+    if mode == "cls":
+        return token_embeddings[:, 0]
+    mask = attention_mask[:, :, None].astype(np.float32)
+    if mode == "max":
+        return np.where(mask > 0, token_embeddings, -1e9).max(axis=1)
+    return (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def _run(entry, texts: List[str]) -> np.ndarray:
+    """Sentence embeddings for one batch, as the original pipeline would produce them."""
+    session, tokenizer, meta = entry
+    encoded = tokenizer(
+        texts, padding=True, truncation=True, max_length=meta["max_seq_length"], return_tensors="np"
+    )
+    feed = {name: encoded[name].astype(np.int64) for name in meta["inputs"]}
+    token_embeddings = session.run(None, feed)[0]
+    pooled = _pool(token_embeddings, feed["attention_mask"], meta["pooling"])
+    if meta["normalize"]:
+        pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return pooled.astype(np.float32, copy=False)
+
+
+class OnnxSentenceEmbeddings(Embeddings):
+    """
+    Same interface and vectors as LocalSentenceTransformerEmbeddings, computed
+    by onnxruntime. embed_documents_array returns the float32 matrix without
+    list conversion.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 32, normalize: bool = False,
+                 quantized: bool = LOCAL_ONNX_QUANTIZE, threads: int = LOCAL_ONNX_THREADS):
+        self.entry = get_onnx_session(model_name, quantized, threads)
+        self.batch_size = batch_size
+        # on top of whatever the exported pipeline already does
+        self.normalize = normalize
+
+    def embed_documents_array(self, texts) -> np.ndarray:
+        texts = list(texts)
+        dim = self.entry[2]["dim"]
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        # longest first, so each batch pads to similar lengths
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            out[rows] = _run(self.entry, [texts[i] for i in rows])
+        if self.normalize:
+            out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out
+
+    def embed_documents(self, texts) -> List[List[float]]:
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents_array([text])[0].tolist()
+
+
+def main():
+    import argparse
+
+    from backend.ai.llm_client import LOCAL_EMBED_MODEL
+
+    parser = argparse.ArgumentParser(description="Export a sentence-transformer to ONNX for EMBED_PROVIDER=local-onnx.")
+    parser.add_argument("--model", default=LOCAL_EMBED_MODEL)
+    parser.add_argument("--export", action="store_true", help="export (and quantize) the model")
+    parser.add_argument("--force", action="store_true", help="re-export even if a current export exists")
+    parser.add_argument("--no-quantize", action="store_true", help="skip the int8 copy")
+    args = parser.parse_args()
+
+    directory = export_dir(args.model)
+    if args.export:
+        export_model(args.model, quantize=not args.no_quantize, force=args.force)
+        print(f"✅ Exported {args.model} to {directory}")
+
+    meta = read_meta(directory)
+    if not meta:
+        print(f"⚠️ No ONNX export for {args.model} yet (run with --export).")
+        return
+    for name in (FP32_FILE, INT8_FILE):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            print(f"📦 {name}: {os.path.getsize(path) / 1e6:.1f} MB")
+    print(f"🧩 pooling={meta['pooling']} normalize={meta['normalize']} "
+          f"dim={meta['dim']} max_seq_length={meta['max_seq_length']}")
+
+
+if __name__ == "__main__":
+    main()
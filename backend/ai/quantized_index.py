@@ -0,0 +1,334 @@
+# backend/ai/quantized_index.py
+#
+# Compact, memory-mappable embedding index for the NumPy vector store.
+#
+#   python -m backend.ai.quantized_index                       # recall report for the persisted store
+#   python -m backend.ai.quantized_index --queries questions.txt
+#   python -m backend.ai.quantized_index --synthetic 100000    # synthetic corpus, all settings
+#
+# Document embeddings are stored as float16, or int8 with one float32 scale
+# per vector (v ~= codes * scale), optionally projected to fewer dimensions
+# with a PCA basis fitted on the corpus. Everything lives in one versioned
+# file:
+#
+#   b"SDVX" | format version (uint32) | header length (uint64) | JSON header
+#   | arrays, each 64-byte aligned
+#
+# The header records the settings, the array offsets and shapes, and the
+# chunk ids the index was built for; arrays are opened with np.memmap, so
+# opening costs a header parse and every worker shares the page cache.
+#
+# int8 is the usual choice: a quarter of the memory and, thanks to the
+# per-block conversion below, queries as fast as float32. float16 keeps
+# recall at ~1.0 but NumPy converts it to float32 slowly, so its queries
+# are several times slower on large corpora.
+#
+# Quantization must not silently cost answer quality: recall@4 against the
+# full-precision index is printed by the CLI, and NumpyVectorStore logs it
+# whenever it (re)builds its index.
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+from typing import List, Optional
+
+import numpy as np
+
+MAGIC = b"SDVX"
+FORMAT_VERSION = 1
+DTYPES = ("float32", "float16", "int8")
+_ALIGN = 64
+# rows converted to float32 at a time while scoring; small blocks stay in
+# cache, so int8 scoring is about as fast as a float32 matmul
+_BLOCK = 512
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def ids_digest(ids: List[str]) -> str:
+    return hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()
+
+
+def fit_projection(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """(d, dim) basis of the top principal directions of the (uncentered) vectors."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    gram = vectors.T.astype(np.float64) @ vectors
+    _eigvals, eigvecs = np.linalg.eigh(gram)
+    # eigh sorts ascending: take the last `dim` columns, largest first
+    return np.ascontiguousarray(eigvecs[:, ::-1][:, :dim], dtype=np.float32)
+
+
+class QuantizedIndex:
+    """
+    Quantized document embeddings with exact scoring over the stored codes.
+    Build with QuantizedIndex.build(), persist with save(), open with load().
+    """
+
+    def __init__(self, codes, scales=None, projection=None, dtype="float32", ids_sha256="", dim=None):
+        self.codes = codes
+        self.scales = scales
+        self.projection = projection
+        self.dtype = dtype
+        self.ids_sha256 = ids_sha256
+        self.dim = dim if dim is not None else (projection.shape[0] if projection is not None else codes.shape[1])
+
+    def __len__(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def stored_dim(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.codes.dtype.itemsize * self.stored_dim + (4 if self.scales is not None else 0)
+
+    @classmethod
+    def build(cls, vectors, ids: List[str], dtype: str = "int8", dim: Optional[int] = None):
+        """Quantize full-precision document vectors (normalized here)."""
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {', '.join(DTYPES)}")
+        vectors = _normalize(vectors)
+        full_dim = vectors.shape[1]
+
+        projection = None
+        if dim and dim < full_dim:
+            projection = fit_projection(vectors, dim)
+            vectors = _normalize(vectors @ projection)
+
+        scales = None
+        if dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+            codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        else:
+            codes = vectors.astype(dtype)
+        return cls(codes, scales, projection, dtype, ids_digest(ids), full_dim)
+
+    # ----- file format -----
+
+    def save(self, path: str):
+        arrays = {"codes": self.codes}
+        if self.scales is not None:
+            arrays["scales"] = self.scales
+        if self.projection is not None:
+            arrays["projection"] = self.projection
+
+        header = {
+            "format_version": FORMAT_VERSION,
+            "dtype": self.dtype,
+            "count": len(self),
+            "dim": self.dim,
+            "stored_dim": self.stored_dim,
+            "ids_sha256": self.ids_sha256,
+            "arrays": {},
+        }
+        # offsets depend on the header size, which depends on the offsets:
+        # reserve room generously and pad the header to it
+        reserve = 4096
+        offset = reserve
+        for name, array in arrays.items():
+            offset = -(-offset // _ALIGN) * _ALIGN
+            header["arrays"][name] = {"offset": offset, "shape": list(array.shape), "dtype": str(array.dtype)}
+            offset += array.nbytes
+        blob = json.dumps(header).encode("utf-8")
+        prefix = len(MAGIC) + 4 + 8
+        if prefix + len(blob) > reserve:
+            raise ValueError("index header too large")
+
+        # a unique temporary name: workers rebuilding at the same time each
+        # write their own file, and the last complete one wins
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path) + ".", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(MAGIC + struct.pack("<IQ", FORMAT_VERSION, len(blob)) + blob)
+                for name, array in arrays.items():
+                    f.write(b"\0" * (header["arrays"][name]["offset"] - f.tell()))
+                    f.write(np.ascontiguousarray(array).tobytes())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def read_header(path: str) -> dict:
+        with open(path, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a vector index file")
+            version, length = struct.unpack("<IQ", f.read(12))
+            if version != FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported index format version {version}")
+            return json.loads(f.read(length))
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Open an index file; the arrays are memory-mapped, not read.
+        Raises ValueError for a file that isn't a complete index.
+        """
+        header = cls.read_header(path)
+        size = os.path.getsize(path)
+        for name, spec in header["arrays"].items():
+            end = spec["offset"] + int(np.prod(spec["shape"])) * np.dtype(spec["dtype"]).itemsize
+            if end > size:
+                raise ValueError(f"{path} is truncated ({name} ends at byte {end}, file has {size})")
+        arrays = {
+            name: np.memmap(path, dtype=spec["dtype"], mode="r", offset=spec["offset"], shape=tuple(spec["shape"]))
+            for name, spec in header["arrays"].items()
+        }
+        return cls(
+            arrays["codes"], arrays.get("scales"), arrays.get("projection"),
+            header["dtype"], header["ids_sha256"], header["dim"],
+        )
+
+    # ----- search -----
+
+    def scores(self, query_vector) -> np.ndarray:
+        """Cosine scores of every stored vector against one query."""
+        q = _normalize(query_vector)[0]
+        if self.projection is not None:
+            q = _normalize(q @ self.projection)[0]
+        n = len(self)
+        out = np.empty(n, dtype=np.float32)
+        if self.codes.dtype == np.float32:
+            np.dot(self.codes, q, out=out)
+        else:
+            buffer = np.empty((min(_BLOCK, n), self.stored_dim), dtype=np.float32)
+            for start in range(0, n, _BLOCK):
+                codes = self.codes[start:start + _BLOCK]
+                block = buffer[:len(codes)]
+                np.copyto(block, codes, casting="unsafe")
+                np.dot(block, q, out=out[start:start + len(codes)])
+        if self.scales is not None:
+            out *= self.scales
+        return out
+
+    def search(self, query_vector, k: int):
+        """(row indices, scores) of the top k, best first."""
+        scores = self.scores(query_vector)
+        k = min(k, len(scores))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), scores[:0]
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top, scores[top]
+
+
+def recall_at_k(full_vectors, index: QuantizedIndex, queries, k: int = 4) -> float:
+    """Mean overlap of the index's top k with exact full-precision top k."""
+    full = _normalize(full_vectors)
+    queries = _normalize(queries)
+    exact_scores = queries @ full.T if len(full) * len(queries) <= 50_000_000 else None
+    hits = 0
+    for i, q in enumerate(queries):
+        scores = exact_scores[i] if exact_scores is not None else full @ q
+        kk = min(k, len(scores))
+        exact = set(np.argpartition(-scores, kk - 1)[:kk].tolist())
+        approx = set(index.search(q, kk)[0].tolist())
+        hits += len(exact & approx)
+    return hits / (len(queries) * min(k, len(full))) if len(queries) else 1.0
+
+
+def perturbed_queries(vectors, n: int = 200, noise: float = 0.5, seed: int = 3) -> np.ndarray:
+    """Query stand-ins: stored vectors plus Gaussian noise (no embedding calls)."""
+    vectors = _normalize(vectors)
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(vectors), size=min(n, len(vectors)), replace=False)
+    noisy = vectors[rows] + rng.standard_normal((len(rows), vectors.shape[1])).astype(np.float32) * (
+        noise / np.sqrt(vectors.shape[1])
+    )
+    return _normalize(noisy)
+
+
+# ---------- CLI ----------
+
+def _synthetic_corpus(n: int, dim: int, seed: int = 7) -> np.ndarray:
+    """Clustered vectors with most variance in a low-rank subspace, like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    rank = min(64, dim)
+    basis = rng.standard_normal((rank, dim)).astype(np.float32)
+    centers = rng.standard_normal((max(n // 50, 1), rank)).astype(np.float32)
+    latent = centers[rng.integers(0, len(centers), n)] + 0.5 * rng.standard_normal((n, rank)).astype(np.float32)
+    vectors = latent @ basis + 0.3 * rng.standard_normal((n, dim)).astype(np.float32) * np.sqrt(rank / dim)
+    return _normalize(vectors)
+
+
+def _report(vectors, ids, queries, settings, k: int = 4):
+    import tempfile
+
+    print(f"{'dtype':>8} {'dim':>5} {'B/vector':>9} {'file MB':>8} {'open ms':>8} "
+          f"{'query ms':>9} {'recall@' + str(k):>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype, dim in settings:
+            index = QuantizedIndex.build(vectors, ids, dtype, dim)
+            path = os.path.join(tmp, "index.vidx")
+            index.save(path)
+            start = time.perf_counter()
+            index = QuantizedIndex.load(path)
+            open_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            for q in queries[:50]:
+                index.search(q, k)
+            query_ms = (time.perf_counter() - start) / min(len(queries), 50) * 1000
+
+            recall = recall_at_k(vectors, index, queries, k)
+            print(f"{dtype:>8} {index.stored_dim:>5} {index.bytes_per_vector:>9} "
+                  f"{os.path.getsize(path) / 2**20:>8.1f} {open_ms:>8.2f} {query_ms:>9.2f} {recall:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory / recall report for quantized embedding indexes.")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="use N synthetic vectors instead of the store")
+    parser.add_argument("--dim", type=int, default=768, help="synthetic embedding size")
+    parser.add_argument("--queries", help="text file with one real question per line (embedded once)")
+    parser.add_argument("--reduced", type=int, nargs="+", default=[384, 256], help="reduced dimensions to try")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = _synthetic_corpus(args.synthetic, args.dim)
+        ids = [str(i) for i in range(len(vectors))]
+    else:
+        from backend.ai.numpy_store import NumpyVectorStore
+        from backend.ai.vector_store import NUMPY_STORE_DIR
+        from backend.ai.llm_client import get_embedding_model
+
+        store = NumpyVectorStore(get_embedding_model(), persist_directory=NUMPY_STORE_DIR)
+        if not len(store):
+            raise SystemExit("❌ No NumPy vector store yet: run with VECTOR_BACKEND=numpy "
+                             "python -m backend.ai.rebuild_vectorstore first, or use --synthetic N.")
+        vectors, ids = np.asarray(store.full_vectors()), store.ids
+
+    if args.queries:
+        from backend.ai.llm_client import get_embedding_model
+        with open(args.queries, encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+        queries = _normalize(get_embedding_model().embed_documents(questions))
+        print(f"📝 {len(queries)} real questions")
+    else:
+        queries = perturbed_queries(vectors)
+        print(f"📝 {len(queries)} perturbed chunk embeddings as queries")
+
+    full_dim = vectors.shape[1]
+    settings = [("float32", None), ("float16", None), ("int8", None)]
+    settings += [(dtype, d) for d in args.reduced if d < full_dim for dtype in ("float16", "int8")]
+    print(f"📦 {len(vectors)} vectors, {full_dim}-d\n")
+    _report(vectors, ids, queries, settings)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,40 @@
 # backend/ai/rebuild_vectorstore.py
+#
+# Re-index docs/ into the persisted vector store.
+# By default only added/changed chunks are embedded; pass --full to start over.
 
-from backend.ai.vector_store import build_vectorstore, VECTOR_DIR
-import shutil
-import os
+import argparse
+import time
 
-if __name__ == "__main__":
-    print("🔥 Rebuilding Vectorstore...")
+from backend.ai.vector_store import sync_vectorstore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-index docs/ into the vector store.")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="drop the collection and re-embed every chunk",
+    )
+    args = parser.parse_args()
+
+    print("🔥 Rebuilding Vectorstore..." if args.full else "🔄 Syncing Vectorstore...")
 
-    # Delete old vectorstore dir
-    if os.path.exists(VECTOR_DIR):
-        shutil.rmtree(VECTOR_DIR)
-        print("🗑 Deleted old vectorstore folder.")
+    start = time.perf_counter()
+    report = sync_vectorstore(full=args.full)
+    elapsed = time.perf_counter() - start
 
-    # Rebuild
-    vs = build_vectorstore()
-    print("✅ New vectorstore built successfully.")
\ No newline at end of file
+    total = report["embedded"] + report["skipped"]
+    if report["rebuilt"]:
+        print("🗑 Dropped old collection.")
+    if report["changed_files"]:
+        print("📝 Changed files: " + ", ".join(report["changed_files"]))
+    print(
+        f"✅ Embedded {report['embedded']} / {total} chunks, "
+        f"skipped {report['skipped']}, deleted {report['deleted']} "
+        f"({elapsed:.2f}s)."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# backend/ai/test_onnx_embeddings.py
+#
+# Parity check: ONNX (float32 and int8) embeddings against the torch
+# sentence-transformers output for the docs/ chunks and a few mentor
+# questions. Needs torch, sentence-transformers and onnxruntime.
+#
+#   python -m backend.ai.test_onnx_embeddings
+
+import sys
+
+import numpy as np
+
+from backend.ai.llm_client import LOCAL_EMBED_MODEL, LocalSentenceTransformerEmbeddings
+from backend.ai.onnx_embeddings import OnnxSentenceEmbeddings
+from backend.ai.vector_store import load_split_documents
+
+# lowest per-text cosine similarity to torch that still passes
+MIN_COSINE = {"float32": 0.9999, "int8": 0.98}
+QUESTIONS = [
+    "How many classes do I need to reach 75% attendance?",
+    "Which subjects am I weak in?",
+    "How do I prepare for DBMS exams?",
+    "Explain deadlocks in operating systems",
+]
+K = 4
+
+
+def _unit(m):
+    m = np.asarray(m, dtype=np.float32)
+    return m / np.clip(np.linalg.norm(m, axis=1, keepdims=True), 1e-12, None)
+
+
+def main():
+    chunks = [doc.page_content for doc in load_split_documents()]
+    texts = chunks + QUESTIONS
+    print(f"Model: {LOCAL_EMBED_MODEL} · {len(chunks)} chunks + {len(QUESTIONS)} questions")
+
+    reference = _unit(LocalSentenceTransformerEmbeddings(LOCAL_EMBED_MODEL).embed_documents_array(texts))
+    ref_top = np.argsort(-(reference[len(chunks):] @ reference[:len(chunks)].T), axis=1)[:, :K]
+
+    failed = False
+    for label, quantized in (("float32", False), ("int8", True)):
+        vectors = _unit(OnnxSentenceEmbeddings(LOCAL_EMBED_MODEL, quantized=quantized).embed_documents_array(texts))
+        cosine = (vectors * reference).sum(axis=1)
+        top = np.argsort(-(vectors[len(chunks):] @ vectors[:len(chunks)].T), axis=1)[:, :K]
+        overlap = np.mean([len(set(a) & set(b)) / K for a, b in zip(top, ref_top)])
+        ok = cosine.min() >= MIN_COSINE[label]
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {label:<8} cosine min {cosine.min():.5f} mean {cosine.mean():.5f} "
+              f"· top-{K} overlap with torch {overlap:.2f}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# backend/ai/vector_benchmark.py
+#
+# Query latency, cold start and memory of the vector store backends.
+#
+#   python -m backend.ai.vector_benchmark
+#   python -m backend.ai.vector_benchmark --sizes 1000 10000 --dim 384
+#
+# For each corpus size a synthetic set of normalized embeddings is written
+# once per backend (NumPy .npy, and Chroma if it is installed). Each backend
+# is then opened in a fresh Python process that reports how long opening
+# took, its resident memory before and after, and per-query latency of a
+# top-4 search by vector (so no embedding model is involved).
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+K = 4
+
+
+def _rss_mb() -> float:
+    """Current resident set size (Linux /proc), else the peak from getrusage."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _chroma_available() -> bool:
+    try:
+        import chromadb  # noqa: F401
+        from langchain_community.vectorstores import Chroma  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _corpus(n: int, dim: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    texts = [f"chunk {i}" for i in range(n)]
+    metadatas = [{"source": f"doc{i % 50}.md", "chunk_id": f"c{i}"} for i in range(n)]
+    ids = [f"c{i}" for i in range(n)]
+    return vectors, texts, metadatas, ids
+
+
+def _build(backend: str, directory: str, n: int, dim: int):
+    from langchain_core.embeddings import FakeEmbeddings
+
+    vectors, texts, metadatas, ids = _corpus(n, dim)
+    embeddings = FakeEmbeddings(size=dim)
+    if backend == "numpy":
+        from backend.ai.numpy_store import NumpyVectorStore
+        store = NumpyVectorStore(embeddings, persist_directory=directory)
+        store.add_vectors(vectors, texts, metadatas, ids)
+        return
+
+    from langchain_community.vectorstores import Chroma
+    store = Chroma(
+        collection_name="bench",
+        embedding_function=embeddings,
+        persist_directory=directory,
+        collection_metadata={"hnsw:space": "cosine"},
+    )
+    batch = 5000  # below Chroma's max batch size
+    for i in range(0, n, batch):
+        store._collection.add(
+            ids=ids[i:i + batch],
+            embeddings=vectors[i:i + batch].tolist(),
+            documents=texts[i:i + batch],
+            metadatas=metadatas[i:i + batch],
+        )
+
+
+def _worker(backend: str, directory: str, dim: int, queries: int) -> dict:
+    """Runs in a fresh process: open the store, then time searches."""
+    from langchain_core.embeddings import FakeEmbeddings
+
+    embeddings = FakeEmbeddings(size=dim)
+    # import first so import cost isn't counted as opening the store
+    if backend == "numpy":
+        from backend.ai.numpy_store import NumpyVectorStore
+    else:
+        from langchain_community.vectorstores import Chroma
+    rss_before = _rss_mb()
+
+    start = time.perf_counter()
+    if backend == "numpy":
+        store = NumpyVectorStore(embeddings, persist_directory=directory)
+    else:
+        store = Chroma(collection_name="bench", embedding_function=embeddings, persist_directory=directory)
+    store.similarity_search_by_vector([0.0] * dim, k=K)  # first query loads lazily-built structures
+    open_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(11)
+    query_vectors = rng.standard_normal((queries, dim), dtype=np.float32)
+    latencies = []
+    for q in query_vectors:
+        q = q.tolist()
+        start = time.perf_counter()
+        store.similarity_search_by_vector(q, k=K)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "open_ms": open_ms,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "rss_mb": _rss_mb(),
+        "store_rss_mb": _rss_mb() - rss_before,
+    }
+
+
+def _run_worker(backend: str, directory: str, dim: int, queries: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "backend.ai.vector_benchmark", "--worker", backend, directory,
+         "--dim", str(dim), "--queries", str(queries)],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NumPy vs Chroma vector store backends.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=768, help="embedding size (all-mpnet-base-v2: 768)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_worker(args.worker[0], args.worker[1], args.dim, args.queries)))
+        return
+
+    backends = ["numpy"] + (["chroma"] if _chroma_available() else [])
+    if len(backends) == 1:
+        print("⚠️ chromadb is not installed: only the NumPy backend is measured.\n")
+
+    print(f"{'chunks':>8} {'backend':>8} {'build s':>8} {'open ms':>8} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'RSS MB':>8} {'+store MB':>10}")
+    for n in args.sizes:
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as directory:
+                start = time.perf_counter()
+                _build(backend, directory, n, args.dim)
+                build_s = time.perf_counter() - start
+                r = _run_worker(backend, directory, args.dim, args.queries)
+            print(f"{n:>8} {backend:>8} {build_s:>8.1f} {r['open_ms']:>8.1f} {r['p50_ms']:>8.3f} "
+                  f"{r['p95_ms']:>8.3f} {r['rss_mb']:>8.1f} {r['store_rss_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
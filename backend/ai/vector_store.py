@@ -1,8 +1,11 @@
+import hashlib
+import json
 import os
-from langchain_community.vectorstores import Chroma
-from langchain_community.document_loaders import TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from backend.ai.llm_client import get_embedding_model
+import threading
+
+# Chroma, the loaders and the splitter are imported inside the functions that
+# need them, so importing this module (e.g. for VECTOR_DIR) stays cheap.
+from backend.ai.llm_client import get_embedding_model, get_embedding_model_id
 
 # ----- Correct project paths -----
 # vector_store.py is in backend/ai
@@ -11,42 +14,273 @@ from backend.ai.llm_client import get_embedding_model
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
 DOCS_DIR = os.path.join(BASE_DIR, "docs")
-VECTOR_DIR = os.path.join(BASE_DIR, "vector_store")  
+VECTOR_DIR = os.path.join(BASE_DIR, "vector_store")
 os.makedirs(VECTOR_DIR, exist_ok=True)
 
+# Manifest written next to the persisted collection; records what it was built from.
+MANIFEST_PATH = os.path.join(VECTOR_DIR, "manifest.json")
+COLLECTION_NAME = "college_docs"
 
-def build_vectorstore():
+# "chroma" (default) or "numpy" (in-process matrix, see numpy_store.py)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+NUMPY_STORE_DIR = os.path.join(VECTOR_DIR, "numpy")
+# numpy backend only: search a float16 / int8 copy of the embeddings,
+# optionally reduced to VECTOR_REDUCED_DIM dimensions (see quantized_index.py)
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none").lower()
+VECTOR_REDUCED_DIM = int(os.getenv("VECTOR_REDUCED_DIM", "0"))
+
+DOC_FILES = [
+    "attendance_rules.md",
+    "study_tips.md",
+    "events.md",
+    "library_resources.md",
+]
+
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 100
+
+# One handle per process, shared by every Streamlit session.
+_vectorstore = None
+_vectorstore_lock = threading.Lock()
+# bumped after every sync in this process; indexes derived from the same
+# chunks (hybrid_retriever's BM25) rebuild when it changes
+_sync_generation = 0
+
+
+def sync_generation() -> int:
+    return _sync_generation
+
+
+def compute_docs_fingerprint() -> str:
     """
-    Load markdown docs from docs/, split into chunks,
-    create embeddings using Ollama, and store them in an in-memory Chroma collection.
+    Hash of everything the collection depends on: the backend, the docs/
+    files, the splitter settings and the embedding model.
     """
-    loaders = [
-    TextLoader(os.path.join(DOCS_DIR, "attendance_rules.md"), encoding="utf-8"),
-    TextLoader(os.path.join(DOCS_DIR, "study_tips.md"), encoding="utf-8"),
-    TextLoader(os.path.join(DOCS_DIR, "events.md"), encoding="utf-8"),
-    TextLoader(os.path.join(DOCS_DIR, "library_resources.md"), encoding="utf-8")
-    ]
+    h = hashlib.sha256()
+    h.update(VECTOR_BACKEND.encode("utf-8"))
+    h.update(get_embedding_model_id().encode("utf-8"))
+    h.update(f"{CHUNK_SIZE}:{CHUNK_OVERLAP}".encode("utf-8"))
+    for name in DOC_FILES:
+        h.update(name.encode("utf-8"))
+        with open(os.path.join(DOCS_DIR, name), "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
 
-    docs = []
-    for loader in loaders:
-        docs.extend(loader.load())
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-    split_docs = splitter.split_documents(docs)
+def _read_manifest() -> dict:
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    # Use provided embeddings with explicit model (you already pulled this)
-    embeddings = get_embedding_model()
 
-    # In-memory Chroma – no persist_directory, no dimension conflicts
-    vectorstore = Chroma.from_documents(
-        split_docs,
-        embedding=embeddings,
+def _write_manifest(manifest: dict):
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _file_sha256(name: str) -> str:
+    with open(os.path.join(DOCS_DIR, name), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _splitter():
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+    )
+
+
+def _split_file(name: str, splitter=None):
+    """
+    Split one docs/ file into chunks and give each chunk a content-based ID.
+
+    IDs only depend on the file name and the chunk text, so a chunk keeps its
+    ID when an edit elsewhere in the file shifts it around.
+    """
+    from langchain_community.document_loaders import TextLoader
+
+    splitter = splitter or _splitter()
+    loader = TextLoader(os.path.join(DOCS_DIR, name), encoding="utf-8")
+    chunks = splitter.split_documents(loader.load())
+
+    ids = []
+    seen = {}
+    for chunk in chunks:
+        digest = hashlib.sha256(
+            f"{name}\n{chunk.page_content}".encode("utf-8")
+        ).hexdigest()[:32]
+        # identical chunks in the same file still need distinct IDs
+        n = seen.get(digest, 0)
+        seen[digest] = n + 1
+        chunk_id = f"{digest}-{n}" if n else digest
+        chunk.metadata["chunk_id"] = chunk_id
+        ids.append(chunk_id)
+    return ids, chunks
+
+
+def load_split_documents():
+    """Load markdown docs from docs/ and split them into chunks."""
+    splitter = _splitter()
+    split_docs = []
+    for name in DOC_FILES:
+        _ids, chunks = _split_file(name, splitter)
+        split_docs.extend(chunks)
+    return split_docs
+
+
+def _open_collection(embeddings):
+    if VECTOR_BACKEND == "numpy":
+        from backend.ai.numpy_store import NumpyVectorStore
+        return NumpyVectorStore(
+            embeddings,
+            persist_directory=NUMPY_STORE_DIR,
+            quantization=VECTOR_QUANTIZATION,
+            reduced_dim=VECTOR_REDUCED_DIM,
+        )
+
+    from langchain_community.vectorstores import Chroma
+    return Chroma(
+        collection_name=COLLECTION_NAME,
+        embedding_function=embeddings,
         persist_directory=VECTOR_DIR,
     )
-    return vectorstore
 
 
-def get_vectorstore():
-    # For our small demo, rebuilding each time is fine.
-    # If you want, we can later cache this with functools.lru_cache or Streamlit cache.
-    return build_vectorstore()
+def sync_vectorstore(vectorstore=None, full: bool = False) -> dict:
+    """
+    Bring the persisted collection in line with docs/.
+
+    Only chunks that were added or changed since the last sync are embedded;
+    chunks that no longer exist are deleted. If the embedding model or
+    splitter settings changed (or full=True) the collection is rebuilt.
+
+    Returns a report dict with the counts "embedded", "skipped" and "deleted",
+    the "changed_files", whether the collection was "rebuilt", and the
+    resulting "vectorstore".
+    """
+    embeddings = get_embedding_model()
+    if vectorstore is None:
+        vectorstore = _open_collection(embeddings)
+
+    manifest = _read_manifest()
+    splitter_settings = {"chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
+    rebuild = (
+        full
+        or "files" not in manifest
+        or manifest.get("backend", "chroma") != VECTOR_BACKEND
+        or manifest.get("embedding_model") != get_embedding_model_id()
+        or manifest.get("splitter") != splitter_settings
+    )
+
+    if rebuild:
+        vectorstore.delete_collection()
+        vectorstore = _open_collection(embeddings)
+        old_files = {}
+    else:
+        old_files = manifest["files"]
+
+    report = {
+        "embedded": 0,
+        "skipped": 0,
+        "deleted": 0,
+        "changed_files": [],
+        "rebuilt": rebuild,
+    }
+    new_files = {}
+    stale_ids = []
+    splitter = _splitter()
+    # the NumPy store rewrites its files on every write: batch them into one save
+    deferred = {"persist": False} if VECTOR_BACKEND == "numpy" else {}
+
+    for name in DOC_FILES:
+        file_hash = _file_sha256(name)
+        old_entry = old_files.get(name)
+        if old_entry and old_entry["sha256"] == file_hash:
+            new_files[name] = old_entry
+            report["skipped"] += len(old_entry["chunk_ids"])
+            continue
+
+        ids, chunks = _split_file(name, splitter)
+        old_ids = set(old_entry["chunk_ids"]) if old_entry else set()
+
+        to_add = [(i, c) for i, c in zip(ids, chunks) if i not in old_ids]
+        if to_add:
+            vectorstore.add_documents(
+                [c for _i, c in to_add], ids=[i for i, _c in to_add], **deferred
+            )
+        stale_ids.extend(old_ids - set(ids))
+
+        report["embedded"] += len(to_add)
+        report["skipped"] += len(ids) - len(to_add)
+        report["changed_files"].append(name)
+        new_files[name] = {"sha256": file_hash, "chunk_ids": ids}
+
+    # files dropped from DOC_FILES
+    for name, entry in old_files.items():
+        if name not in new_files:
+            stale_ids.extend(entry["chunk_ids"])
+            report["changed_files"].append(name)
+
+    if stale_ids:
+        vectorstore.delete(ids=stale_ids, **deferred)
+    report["deleted"] = len(stale_ids)
+    if deferred and (rebuild or report["changed_files"]):
+        vectorstore.persist()
+
+    _write_manifest({
+        "fingerprint": compute_docs_fingerprint(),
+        "backend": VECTOR_BACKEND,
+        "embedding_model": get_embedding_model_id(),
+        "splitter": splitter_settings,
+        "files": new_files,
+    })
+    global _sync_generation
+    _sync_generation += 1
+    report["vectorstore"] = vectorstore
+    return report
+
+
+def build_vectorstore():
+    """
+    Load markdown docs from docs/, split into chunks, embed them and store
+    them in the persisted collection (Chroma or NumPy) under VECTOR_DIR.
+
+    Any previous contents of the collection are dropped first, so rebuilding
+    never leaves duplicate chunks behind.
+    """
+    return sync_vectorstore(full=True)["vectorstore"]
+
+
+def load_or_build_vectorstore():
+    """
+    Open the persisted collection if its manifest matches the current docs/
+    and embedding model; otherwise re-index the chunks that changed.
+    """
+    manifest = _read_manifest()
+    if manifest.get("fingerprint") == compute_docs_fingerprint():
+        return _open_collection(get_embedding_model())
+    return sync_vectorstore()["vectorstore"]
+
+
+def get_vectorstore(refresh: bool = False):
+    """
+    Process-wide vector store handle.
+
+    The first call loads (or builds) the collection; later calls reuse it.
+    Pass refresh=True to re-check docs/ and rebuild if it changed.
+    """
+    global _vectorstore
+
+    if _vectorstore is not None and not refresh:
+        return _vectorstore
+
+    with _vectorstore_lock:
+        if _vectorstore is None or refresh:
+            _vectorstore = load_or_build_vectorstore()
+        return _vectorstore
@@ -0,0 +1 @@
+# Derived student metrics: per-student snapshots and cohort-wide analytics
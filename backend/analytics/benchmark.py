@@ -0,0 +1,141 @@
+# backend/analytics/benchmark.py
+#
+# Per-record vs vectorized cohort analytics on synthetic data.
+#
+#   python -m backend.analytics.benchmark
+#   python -m backend.analytics.benchmark --sizes 1000 10000 100000
+#
+# For each cohort size it times compute_student_analytics() called once per
+# student against compute_cohort_analytics() over the whole cohort, and
+# checks that both produce exactly the same numbers.
+
+import argparse
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from backend.analytics.cohort import compute_cohort_analytics
+from backend.analytics.snapshot import compute_student_analytics
+
+COURSES = [
+    ("DBMS", "Database Management Systems", 40),
+    ("OS", "Operating Systems", 35),
+    ("DSA", "Data Structures & Algorithms", 38),
+]
+EXAMS = ["Mid-1", "Mid-2"]
+SEMESTERS = [4, 5, 6, 7]
+
+AttendanceRow = namedtuple("AttendanceRow", "student_id course_code course_name attended total_classes threshold")
+MarkRow = namedtuple("MarkRow", "student_id course_code course_name exam_type score max_score")
+ResultRow = namedtuple("ResultRow", "student_id semester sgpa cgpa")
+
+
+def make_cohort(n_students: int, seed: int = 7):
+    """Synthetic attendance / marks / results frames shaped like the seed data."""
+    rng = np.random.default_rng(seed)
+    ids = np.array([str(i) for i in range(1, n_students + 1)], dtype=object)
+
+    n_courses = len(COURSES)
+    att_ids = np.repeat(ids, n_courses)
+    totals = np.tile([c[2] for c in COURSES], n_students)
+    attendance = pd.DataFrame({
+        "student_id": att_ids,
+        "course_code": np.tile([c[0] for c in COURSES], n_students),
+        "course_name": np.tile([c[1] for c in COURSES], n_students),
+        "attended": (totals * rng.uniform(0.4, 1.0, len(totals))).astype(np.int64),
+        "total_classes": totals,
+        "threshold": 75,
+    })
+
+    per_student = n_courses * len(EXAMS)
+    marks = pd.DataFrame({
+        "student_id": np.repeat(ids, per_student),
+        "course_code": np.tile(np.repeat([c[0] for c in COURSES], len(EXAMS)), n_students),
+        "course_name": np.tile(np.repeat([c[1] for c in COURSES], len(EXAMS)), n_students),
+        "exam_type": np.tile(EXAMS, n_courses * n_students),
+        "score": rng.integers(5, 26, n_students * per_student),
+        "max_score": 25,
+    })
+
+    results = pd.DataFrame({
+        "student_id": np.repeat(ids, len(SEMESTERS)),
+        "semester": np.tile(SEMESTERS, n_students),
+        "sgpa": np.round(rng.uniform(6.0, 9.5, n_students * len(SEMESTERS)), 1),
+        "cgpa": np.round(rng.uniform(6.0, 9.5, n_students * len(SEMESTERS)), 1),
+    })
+    return attendance, marks, results
+
+
+def _rows_by_student(frame: pd.DataFrame, row_type):
+    grouped = {}
+    for row in frame.itertuples(index=False):
+        grouped.setdefault(row.student_id, []).append(row_type(*row))
+    return grouped
+
+
+def run_per_record(attendance, marks, results):
+    """Existing path: one compute_student_analytics() call per student."""
+    att = _rows_by_student(attendance, AttendanceRow)
+    mks = _rows_by_student(marks, MarkRow)
+    res = _rows_by_student(results, ResultRow)
+
+    start = time.perf_counter()
+    out = {
+        sid: compute_student_analytics(att.get(sid, []), mks.get(sid, []), res.get(sid, []))
+        for sid in att
+    }
+    return out, time.perf_counter() - start
+
+
+def run_vectorized(attendance, marks, results):
+    start = time.perf_counter()
+    out = compute_cohort_analytics(frames=(attendance, marks, results))
+    return out, time.perf_counter() - start
+
+
+def check_same(per_record: dict, cohort: dict):
+    """Raise AssertionError unless both paths agree exactly."""
+    courses, attendance = {}, {}
+    for r in cohort["course_averages"].itertuples(index=False):
+        courses.setdefault(r.student_id, []).append([r.course_code, r.course_name, r.avg])
+    for r in cohort["attendance"].itertuples(index=False):
+        attendance.setdefault(r.student_id, []).append((r.pct, r.needed))
+    students = {r.Index: r for r in cohort["students"].itertuples()}
+
+    for sid, expected in per_record.items():
+        row = students[sid]
+        assert row.total_subjects == expected["total_subjects"], sid
+        assert row.avg_attendance == expected["avg_attendance"], sid
+        assert row.latest_cgpa == expected["latest_cgpa"], sid
+        assert row.weak_course_codes == expected["weak_course_codes"], sid
+        assert courses.get(sid, []) == expected["course_averages"], sid
+        want_att = [(a["pct"], a["needed"]) for a in expected["attendance_summary"]]
+        assert attendance.get(sid, []) == want_att, sid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-record vs vectorized cohort analytics.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="cohort sizes (number of students)")
+    parser.add_argument("--no-check", action="store_true", help="skip the exact-equality check")
+    args = parser.parse_args()
+
+    print(f"{'students':>10} {'per-record s':>13} {'vectorized s':>13} {'speedup':>9}")
+    for n in args.sizes:
+        frames = make_cohort(n)
+        per_record, t_loop = run_per_record(*frames)
+        cohort, t_vec = run_vectorized(*frames)
+        if not args.no_check:
+            check_same(per_record, cohort)
+        speedup = t_loop / t_vec if t_vec > 0 else math.inf
+        print(f"{n:>10} {t_loop:>13.3f} {t_vec:>13.3f} {speedup:>8.1f}x")
+
+    if not args.no_check:
+        print("\n✅ Vectorized results match the per-record functions exactly.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# backend/analytics/cohort.py
+#
+# Vectorized analytics for the whole cohort.
+#
+# Same numbers as the per-record functions (compute_attendance_insights,
+# compute_course_averages, compute_student_analytics), but computed over
+# NumPy columns for every student at once. Sums are accumulated with
+# np.bincount, which adds values one by one in row order, so averages match
+# the Python `sum(list) / len(list)` results bit for bit as long as rows come
+# in the same (id) order.
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.models import Attendance, Course, Mark, Result
+from backend.analytics.snapshot import STRONG_THRESHOLD, WEAK_THRESHOLD
+
+
+def load_cohort_frames(session: Session):
+    """Attendance, marks and results of every student as DataFrames, in id order."""
+    conn = session.connection()
+    attendance = pd.read_sql(
+        select(
+            Attendance.student_id, Attendance.course_code, Course.name.label("course_name"),
+            Attendance.attended, Attendance.total_classes, Attendance.threshold,
+        ).join(Course, Course.id == Attendance.course_id).order_by(Attendance.id),
+        conn,
+    )
+    marks = pd.read_sql(
+        select(
+            Mark.student_id, Mark.course_code, Course.name.label("course_name"),
+            Mark.exam_type, Mark.score, Mark.max_score,
+        ).join(Course, Course.id == Mark.course_id).order_by(Mark.id),
+        conn,
+    )
+    results = pd.read_sql(
+        select(Result.student_id, Result.semester, Result.sgpa, Result.cgpa)
+        .order_by(Result.id),
+        conn,
+    )
+    return attendance, marks, results
+
+
+def attendance_insights(attendance: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds "pct" and "needed" columns: vectorized compute_attendance_insights.
+    """
+    attended = attendance["attended"].to_numpy(dtype=np.float64)
+    total = attendance["total_classes"].to_numpy(dtype=np.float64)
+    t = attendance["threshold"].to_numpy(dtype=np.float64) / 100
+
+    valid = total > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(valid, (attended / total) * 100, 0.0)
+        # smallest x with (attended + x) / (total + x) >= t
+        needed = np.ceil(np.maximum(0, ((t * total) - attended) / (1 - t)))
+    needed = np.where(valid & (t < 1), needed, 0).astype(np.int64)
+
+    out = attendance.copy()
+    out["pct"] = pct
+    out["needed"] = needed
+    return out
+
+
+def _first_appearance_groups(keys: np.ndarray):
+    """
+    Integer group id per row, numbered in order of first appearance (like
+    dict insertion order in the per-record code), plus each group's first row.
+    """
+    _uniq, first_rows, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first_rows, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.ravel()], first_rows[order]
+
+
+def course_averages(marks: pd.DataFrame, student_codes: np.ndarray = None) -> pd.DataFrame:
+    """
+    One row per (student_id, course_code) with the average mark % and its
+    band (strong / okay / weak), sorted weakest first within each student:
+    vectorized compute_course_averages.
+
+    `student_codes` (integer code per row) can be passed when the caller has
+    already factorized student ids.
+    """
+    columns = ["student_id", "course_code", "course_name", "avg", "band"]
+    if marks.empty:
+        return pd.DataFrame(columns=columns)
+
+    if student_codes is None:
+        student_codes, _ = pd.factorize(marks["student_id"])
+    course_codes, course_uniques = pd.factorize(marks["course_code"])
+    course_uniques = np.asarray(course_uniques, dtype=object)
+
+    score = marks["score"].to_numpy(dtype=np.float64)
+    max_score = marks["max_score"].to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        perc = np.where(max_score > 0, (score / max_score) * 100, 0.0)
+
+    keys = student_codes.astype(np.int64) * len(course_uniques) + course_codes
+    group, first_rows = _first_appearance_groups(keys)
+    avg = np.bincount(group, weights=perc) / np.bincount(group)
+
+    # student first, then weakest first; lexsort is stable, so equal averages
+    # keep first-appearance order
+    order = np.lexsort((avg, student_codes[first_rows]))
+    rows = first_rows[order]
+    avg = avg[order]
+
+    # take the few rows needed before converting string columns
+    out = pd.DataFrame({
+        "student_id": marks["student_id"].iloc[rows].to_numpy(),
+        "course_code": course_uniques[course_codes[rows]],
+        "course_name": marks["course_name"].iloc[rows].to_numpy(),
+        "avg": avg,
+        "band": np.select(
+            [avg >= STRONG_THRESHOLD, avg >= WEAK_THRESHOLD], ["strong", "okay"], "weak"
+        ),
+    })
+    out.attrs["student_codes"] = student_codes[rows]
+    return out
+
+
+def _last_per_student(codes: np.ndarray, semesters: np.ndarray, values: np.ndarray, n: int):
+    """Value of the highest semester per student code (NaN when none)."""
+    out = np.full(n, np.nan)
+    if len(codes):
+        order = np.lexsort((semesters, codes))
+        sorted_codes = codes[order]
+        is_last = np.r_[sorted_codes[1:] != sorted_codes[:-1], True]
+        out[sorted_codes[is_last]] = values[order][is_last]
+    return out
+
+
+def _student_summary(student_ids, att_codes, attendance, course_avgs, res_codes, results) -> pd.DataFrame:
+    n = len(student_ids)
+    out = pd.DataFrame(index=pd.Index(student_ids, name="student_id"))
+
+    # distinct courses per student via a student x course presence matrix
+    course_codes, course_uniques = pd.factorize(attendance["course_code"])
+    present = np.zeros((n, max(len(course_uniques), 1)), dtype=bool)
+    present[att_codes, course_codes] = True
+    out["total_subjects"] = present.sum(axis=1)
+
+    valid = attendance["total_classes"].to_numpy() > 0
+    sums = np.bincount(att_codes[valid], weights=attendance["pct"].to_numpy()[valid], minlength=n)
+    counts = np.bincount(att_codes[valid], minlength=n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["avg_attendance"] = np.where(counts > 0, sums / counts, np.nan)
+
+    # latest CGPA: last non-zero CGPA by semester, else the last CGPA
+    semesters = results["semester"].to_numpy()
+    cgpa = results["cgpa"].to_numpy(dtype=np.float64)
+    non_zero = cgpa > 0
+    last_any = _last_per_student(res_codes, semesters, cgpa, n)
+    last_non_zero = _last_per_student(res_codes[non_zero], semesters[non_zero], cgpa[non_zero], n)
+    out["latest_cgpa"] = np.where(np.isnan(last_non_zero), last_any, last_non_zero)
+
+    # course_avgs is sorted by student, so each student's weak codes are one
+    # contiguous run; concatenate the runs in C instead of a per-group join
+    weak_codes = np.full(n, "", dtype=object)
+    weak = (course_avgs["avg"] < WEAK_THRESHOLD).to_numpy()
+    if weak.any():
+        weak_sids = course_avgs.attrs["student_codes"][weak]
+        starts = np.flatnonzero(np.r_[True, weak_sids[1:] != weak_sids[:-1]])
+        weak_course = course_avgs["course_code"].to_numpy(dtype=object)[weak]
+        joined = np.add.reduceat(weak_course + ",", starts)
+        weak_codes[weak_sids[starts]] = [j[:-1] for j in joined]
+    out["weak_course_codes"] = weak_codes
+    return out
+
+
+def compute_cohort_analytics(session: Session = None, frames=None) -> dict:
+    """
+    Cohort-wide analytics from the database (or from preloaded frames).
+
+    Returns {"attendance": per-row insights, "course_averages": per student
+    and course, "students": per-student summary indexed by student_id}.
+    """
+    attendance, marks, results = frames if frames is not None else load_cohort_frames(session)
+
+    # factorize student ids once per frame, then map every frame onto one
+    # shared set of integer codes; everything below works on those codes
+    per_frame = [pd.factorize(f["student_id"]) for f in (attendance, marks, results)]
+    student_ids = pd.Index(
+        np.concatenate([np.asarray(u, dtype=object) for _c, u in per_frame])
+    ).unique()
+    att_codes, mark_codes, res_codes = [
+        student_ids.get_indexer(np.asarray(u, dtype=object))[c] if len(c) else c
+        for c, u in per_frame
+    ]
+
+    attendance = attendance_insights(attendance)
+    course_avgs = course_averages(marks, mark_codes)
+    if "student_codes" not in course_avgs.attrs:
+        course_avgs.attrs["student_codes"] = np.empty(0, dtype=np.int64)
+    return {
+        "attendance": attendance,
+        "course_averages": course_avgs,
+        "students": _student_summary(student_ids, att_codes, attendance, course_avgs, res_codes, results),
+    }
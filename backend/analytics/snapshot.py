@@ -0,0 +1,186 @@
+# backend/analytics/snapshot.py
+#
+# Materialized per-student analytics (the student_analytics table).
+#
+# Pages and mentor prompts used to recompute attendance %, classes needed,
+# per-course averages, weak subjects and latest CGPA from raw rows on every
+# Streamlit rerun. Here they are computed once per change: a flush hook on
+# SessionLocal notices which students' attendance / marks / results were
+# written and refreshes just those snapshots in the same transaction.
+#
+# Writers that bypass the ORM unit of work (Core bulk inserts/updates) must
+# call refresh_student_analytics() themselves.
+
+import itertools
+from datetime import datetime
+
+from sqlalchemy import event, inspect, select, update, insert, bindparam
+from sqlalchemy.orm import Session
+
+from backend.database import SessionLocal
+from backend.models import Attendance, Course, Mark, Result, StudentAnalytics
+from backend.ai.attendance_utils import compute_attendance_insights
+
+WEAK_THRESHOLD = 60
+STRONG_THRESHOLD = 75
+
+_TRACKED = (Attendance, Mark, Result)
+
+
+def summarize_attendance(attendance) -> list:
+    """Per-course attendance entries with current % and classes needed."""
+    summary = []
+    for a in attendance:
+        pct, needed = compute_attendance_insights(a)
+        summary.append({
+            "course_code": a.course_code,
+            "course_name": a.course_name,
+            "attended": a.attended,
+            "total_classes": a.total_classes,
+            "threshold": a.threshold,
+            "pct": pct,
+            "needed": needed,
+        })
+    return summary
+
+
+def compute_course_averages(marks) -> list:
+    """[(course_code, course_name, avg %), ...] sorted weakest first."""
+    course_scores = {}
+    course_names = {}
+    for m in marks:
+        perc = (m.score / m.max_score) * 100 if m.max_score > 0 else 0
+        if m.course_code not in course_scores:
+            course_scores[m.course_code] = []
+            course_names[m.course_code] = m.course_name
+        course_scores[m.course_code].append(perc)
+
+    averaged = []
+    for code, score_list in course_scores.items():
+        avg = sum(score_list) / len(score_list)
+        averaged.append((code, course_names[code], avg))
+
+    averaged.sort(key=lambda x: x[2])
+    return averaged
+
+
+def compute_student_analytics(attendance, marks, results) -> dict:
+    """
+    Snapshot column values for one student.
+    `results` must be ordered by semester.
+    """
+    attendance_summary = summarize_attendance(attendance)
+
+    pcts = [
+        (a.attended / a.total_classes) * 100
+        for a in attendance
+        if a.total_classes > 0
+    ]
+    avg_attendance = sum(pcts) / len(pcts) if pcts else None
+
+    latest_cgpa = None
+    if results:
+        non_zero = [r.cgpa for r in results if r.cgpa > 0]
+        latest_cgpa = non_zero[-1] if non_zero else results[-1].cgpa
+
+    averaged = compute_course_averages(marks)
+    weak_codes = [code for code, _name, avg in averaged if avg < WEAK_THRESHOLD]
+
+    return {
+        "total_subjects": len({a.course_code for a in attendance}),
+        "avg_attendance": avg_attendance,
+        "latest_cgpa": latest_cgpa,
+        "attendance_summary": attendance_summary,
+        "course_averages": [list(row) for row in averaged],
+        "weak_course_codes": ",".join(weak_codes),
+    }
+
+
+def _group_by_student(rows):
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row.student_id, []).append(row)
+    return grouped
+
+
+def refresh_student_analytics(session: Session, student_ids):
+    """
+    Recompute and store the snapshots of the given students.
+    Runs inside the caller's transaction; does not commit.
+    """
+    ids = sorted({sid for sid in student_ids if sid is not None})
+    conn = session.connection()
+    table = StudentAnalytics.__table__
+
+    # keep IN lists well below SQLite's bound-parameter limit
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+
+        attendance = _group_by_student(conn.execute(
+            select(
+                Attendance.student_id, Attendance.course_code, Course.name.label("course_name"),
+                Attendance.attended, Attendance.total_classes, Attendance.threshold,
+            ).join(Course, Course.id == Attendance.course_id)
+            .where(Attendance.student_id.in_(chunk)).order_by(Attendance.id)
+        ))
+        marks = _group_by_student(conn.execute(
+            select(
+                Mark.student_id, Mark.course_code, Course.name.label("course_name"),
+                Mark.score, Mark.max_score,
+            ).join(Course, Course.id == Mark.course_id)
+            .where(Mark.student_id.in_(chunk)).order_by(Mark.id)
+        ))
+        results = _group_by_student(conn.execute(
+            select(Result.student_id, Result.cgpa)
+            .where(Result.student_id.in_(chunk))
+            .order_by(Result.student_id, Result.semester)
+        ))
+        existing = set(conn.execute(
+            select(table.c.student_id).where(table.c.student_id.in_(chunk))
+        ).scalars())
+
+        now = datetime.now()
+        updates, inserts = [], []
+        for sid in chunk:
+            values = compute_student_analytics(
+                attendance.get(sid, []), marks.get(sid, []), results.get(sid, [])
+            )
+            values["updated_at"] = now
+            if sid in existing:
+                values["b_student_id"] = sid
+                updates.append(values)
+            else:
+                values["student_id"] = sid
+                inserts.append(values)
+
+        # update in place so row ids (and loaded ORM objects) stay valid
+        if updates:
+            conn.execute(
+                update(table).where(table.c.student_id == bindparam("b_student_id")),
+                updates,
+            )
+        if inserts:
+            conn.execute(insert(table), inserts)
+
+    refreshed = set(ids)
+    for obj in list(session.identity_map.values()):
+        # read the loaded value directly; touching an expired attribute would reload it
+        if isinstance(obj, StudentAnalytics) and inspect(obj).dict.get("student_id") in refreshed:
+            session.expire(obj)
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _collect_changed_students(session, flush_context, instances):
+    changed = session.info.setdefault("analytics_changed_students", set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, _TRACKED):
+            changed.add(obj.student_id)
+            # a row moved to another student changes the old one too
+            changed.update(inspect(obj).attrs.student_id.history.deleted or ())
+
+
+@event.listens_for(SessionLocal, "after_flush_postexec")
+def _refresh_changed_students(session, flush_context):
+    changed = session.info.pop("analytics_changed_students", None)
+    if changed:
+        refresh_student_analytics(session, changed)
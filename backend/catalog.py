@@ -0,0 +1,50 @@
+# backend/catalog.py
+#
+# Version counter for the library / events catalog.
+#
+# The UI keeps a cached copy of the catalog keyed by catalog_version().
+# Every commit through SessionLocal that wrote LibraryResource or Event rows
+# bumps the version, so the next rerun reloads it. Writers that bypass the
+# ORM (or run in another process) can call bump_catalog_version(); other
+# processes pick changes up when their cache TTL expires.
+
+import itertools
+import threading
+
+from sqlalchemy import event
+
+from backend.database import SessionLocal
+from backend.models import Event, LibraryResource
+
+_version = 0
+_version_lock = threading.Lock()
+
+
+def catalog_version() -> int:
+    return _version
+
+
+def bump_catalog_version() -> int:
+    global _version
+    with _version_lock:
+        _version += 1
+        return _version
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _note_catalog_writes(session, flush_context, instances):
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (LibraryResource, Event)):
+            session.info["catalog_changed"] = True
+            return
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _bump_after_commit(session):
+    if session.info.pop("catalog_changed", False):
+        bump_catalog_version()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("catalog_changed", None)
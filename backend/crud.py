@@ -1,37 +1,91 @@
-from sqlalchemy.orm import Session
-
-from .database import Base, engine
-from .models import Student, Attendance, Mark, Result, LibraryResource, Event
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import Integer, Select, case, exists, func, literal, select, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.sql.functions import FunctionElement
+
+from .database import SessionLocal, engine
+from .migrations import SCHEMA_VERSION, upgrade
+from .models import (
+    Course,
+    SchemaVersion,
+    Tag,
+    Topic,
+    Student,
+    Attendance,
+    AttendanceEvent,
+    Mark,
+    Result,
+    LibraryResource,
+    Event,
+    StudentAnalytics,
+    event_tags,
+    library_resource_tags,
+)
+# importing the snapshot module also installs its refresh-on-flush hooks
+from .analytics.snapshot import refresh_student_analytics
+# ... and the catalog module its version-bump-on-commit hooks
+from . import catalog  # noqa: F401
 
 
 def init_db():
-    """Create tables if they don't exist."""
-    Base.metadata.create_all(bind=engine)
+    """Create the schema for a new database, or migrate an existing one to the latest version."""
+    upgrade(engine)
+
+
+SEED_VERSION = 1
+
+
+def mark_seeded(conn):
+    """
+    Record that the database holds real data (e.g. after python -m
+    backend.ingest), so ensure_seed_data never adds demo rows to it.
+    """
+    table = SchemaVersion.__table__
+    conn.execute(
+        update(table)
+        .where(table.c.id == 1, table.c.seed_version < SEED_VERSION)
+        .values(seed_version=SEED_VERSION)
+    )
 
 
 def ensure_seed_data(session: Session):
     """
-    Seed demo data once.
-    We only insert data into a table if it's empty.
+    Seed demo data once per database.
+    The schema_version row records that it ran, so every later call is a
+    single primary-key lookup. A database that already has students (loaded
+    some other way) is only stamped, never seeded.
     """
+    meta = session.get(SchemaVersion, 1)
+    if meta is not None and meta.seed_version >= SEED_VERSION:
+        return
+    if session.scalar(select(Student.id).limit(1)) is not None:
+        if meta is None:
+            meta = SchemaVersion(id=1, version=SCHEMA_VERSION)
+            session.add(meta)
+        meta.seed_version = SEED_VERSION
+        session.commit()
+        return
 
     # ---------- Students ----------
-    if session.query(Student).count() == 0:
-        students = [
-            Student(student_id="1", name="Suhas",  branch="ECE", semester=7, section="A"),
-            Student(student_id="2", name="Ananya", branch="CSE", semester=7, section="A"),
-            Student(student_id="3", name="Rahul",  branch="EEE", semester=7, section="B"),
-            Student(student_id="4", name="Priya",  branch="ME",  semester=7, section="C"),
-            Student(student_id="5", name="Aditya", branch="ECE", semester=7, section="B"),
-        ]
-        session.add_all(students)
+    students = [
+        Student(student_id="1", name="Suhas",  branch="ECE", semester=7, section="A"),
+        Student(student_id="2", name="Ananya", branch="CSE", semester=7, section="A"),
+        Student(student_id="3", name="Rahul",  branch="EEE", semester=7, section="B"),
+        Student(student_id="4", name="Priya",  branch="ME",  semester=7, section="C"),
+        Student(student_id="5", name="Aditya", branch="ECE", semester=7, section="B"),
+    ]
+    session.add_all(students)
 
     # Helper to add attendance
     def att(stu_id, code, name, total, attended, threshold=75):
         return Attendance(
             student_id=stu_id,
+            course=get_or_create_course(session, code, name),
             course_code=code,
-            course_name=name,
             total_classes=total,
             attended=attended,
             threshold=threshold,
@@ -41,202 +95,282 @@ def ensure_seed_data(session: Session):
     def mark(stu_id, code, name, exam_type, score, max_score, topics):
         return Mark(
             student_id=stu_id,
+            course=get_or_create_course(session, code, name),
             course_code=code,
-            course_name=name,
             exam_type=exam_type,
             score=score,
             max_score=max_score,
-            topic_tags=",".join(topics),
+            topic_list=get_or_create_topics(session, topics),
         )
 
     # ---------- Attendance ----------
-    if session.query(Attendance).count() == 0:
-        attendance_records = [
-            # 1: Suhas – low DBMS attendance, good OS, average DSA
-            att("1", "DBMS", "Database Management Systems", 40, 26),
-            att("1", "OS",   "Operating Systems",            35, 30),
-            att("1", "DSA",  "Data Structures & Algorithms", 38, 32),
-
-            # 2: Ananya – very good attendance
-            att("2", "DBMS", "Database Management Systems", 40, 36),
-            att("2", "OS",   "Operating Systems",            35, 34),
-            att("2", "DSA",  "Data Structures & Algorithms", 38, 37),
-
-            # 3: Rahul – low OS attendance
-            att("3", "DBMS", "Database Management Systems", 40, 33),
-            att("3", "OS",   "Operating Systems",            35, 20),
-            att("3", "DSA",  "Data Structures & Algorithms", 38, 30),
-
-            # 4: Priya – low DSA attendance
-            att("4", "DBMS", "Database Management Systems", 40, 35),
-            att("4", "OS",   "Operating Systems",            35, 32),
-            att("4", "DSA",  "Data Structures & Algorithms", 38, 22),
-
-            # 5: Aditya – struggling overall
-            att("5", "DBMS", "Database Management Systems", 40, 24),
-            att("5", "OS",   "Operating Systems",            35, 23),
-            att("5", "DSA",  "Data Structures & Algorithms", 38, 21),
-        ]
-        session.add_all(attendance_records)
+    attendance_records = [
+        # 1: Suhas – low DBMS attendance, good OS, average DSA
+        att("1", "DBMS", "Database Management Systems", 40, 26),
+        att("1", "OS",   "Operating Systems",            35, 30),
+        att("1", "DSA",  "Data Structures & Algorithms", 38, 32),
+
+        # 2: Ananya – very good attendance
+        att("2", "DBMS", "Database Management Systems", 40, 36),
+        att("2", "OS",   "Operating Systems",            35, 34),
+        att("2", "DSA",  "Data Structures & Algorithms", 38, 37),
+
+        # 3: Rahul – low OS attendance
+        att("3", "DBMS", "Database Management Systems", 40, 33),
+        att("3", "OS",   "Operating Systems",            35, 20),
+        att("3", "DSA",  "Data Structures & Algorithms", 38, 30),
+
+        # 4: Priya – low DSA attendance
+        att("4", "DBMS", "Database Management Systems", 40, 35),
+        att("4", "OS",   "Operating Systems",            35, 32),
+        att("4", "DSA",  "Data Structures & Algorithms", 38, 22),
+
+        # 5: Aditya – struggling overall
+        att("5", "DBMS", "Database Management Systems", 40, 24),
+        att("5", "OS",   "Operating Systems",            35, 23),
+        att("5", "DSA",  "Data Structures & Algorithms", 38, 21),
+    ]
+    session.add_all(attendance_records)
 
     # ---------- Marks ----------
-    if session.query(Mark).count() == 0:
-        marks_records = [
-            # 1: Suhas
-            mark("1", "DBMS", "Database Management Systems", "Mid-1", 12, 25, ["ER model", "Relational algebra"]),
-            mark("1", "DBMS", "Database Management Systems", "Mid-2",  9, 25, ["Normalization", "Indexing"]),
-            mark("1", "OS",   "Operating Systems",            "Mid-1", 18, 25, ["CPU scheduling", "Threads"]),
-            mark("1", "DSA",  "Data Structures & Algorithms", "Mid-1", 20, 25, ["Arrays", "Linked Lists"]),
-
-            # 2: Ananya – topper-type
-            mark("2", "DBMS", "Database Management Systems", "Mid-1", 22, 25, ["ER model", "SQL basics"]),
-            mark("2", "OS",   "Operating Systems",            "Mid-1", 23, 25, ["CPU scheduling", "Processes"]),
-            mark("2", "DSA",  "Data Structures & Algorithms", "Mid-1", 24, 25, ["Arrays", "Recursion"]),
-
-            # 3: Rahul – weak OS
-            mark("3", "DBMS", "Database Management Systems", "Mid-1", 19, 25, ["ER model", "SQL basics"]),
-            mark("3", "OS",   "Operating Systems",            "Mid-1", 10, 25, ["CPU scheduling", "Deadlocks"]),
-            mark("3", "DSA",  "Data Structures & Algorithms", "Mid-1", 17, 25, ["Stacks", "Queues"]),
-
-            # 4: Priya – weak DSA
-            mark("4", "DBMS", "Database Management Systems", "Mid-1", 20, 25, ["Normalization", "SQL queries"]),
-            mark("4", "OS",   "Operating Systems",            "Mid-1", 19, 25, ["Processes", "Threads"]),
-            mark("4", "DSA",  "Data Structures & Algorithms", "Mid-1", 11, 25, ["Trees", "Recursion"]),
-
-            # 5: Aditya – struggling in all
-            mark("5", "DBMS", "Database Management Systems", "Mid-1", 11, 25, ["SQL basics", "Joins"]),
-            mark("5", "OS",   "Operating Systems",            "Mid-1",  9, 25, ["CPU scheduling", "Processes"]),
-            mark("5", "DSA",  "Data Structures & Algorithms", "Mid-1", 10, 25, ["Arrays", "Linked Lists"]),
-        ]
-        session.add_all(marks_records)
+    marks_records = [
+        # 1: Suhas
+        mark("1", "DBMS", "Database Management Systems", "Mid-1", 12, 25, ["ER model", "Relational algebra"]),
+        mark("1", "DBMS", "Database Management Systems", "Mid-2",  9, 25, ["Normalization", "Indexing"]),
+        mark("1", "OS",   "Operating Systems",            "Mid-1", 18, 25, ["CPU scheduling", "Threads"]),
+        mark("1", "DSA",  "Data Structures & Algorithms", "Mid-1", 20, 25, ["Arrays", "Linked Lists"]),
+
+        # 2: Ananya – topper-type
+        mark("2", "DBMS", "Database Management Systems", "Mid-1", 22, 25, ["ER model", "SQL basics"]),
+        mark("2", "OS",   "Operating Systems",            "Mid-1", 23, 25, ["CPU scheduling", "Processes"]),
+        mark("2", "DSA",  "Data Structures & Algorithms", "Mid-1", 24, 25, ["Arrays", "Recursion"]),
+
+        # 3: Rahul – weak OS
+        mark("3", "DBMS", "Database Management Systems", "Mid-1", 19, 25, ["ER model", "SQL basics"]),
+        mark("3", "OS",   "Operating Systems",            "Mid-1", 10, 25, ["CPU scheduling", "Deadlocks"]),
+        mark("3", "DSA",  "Data Structures & Algorithms", "Mid-1", 17, 25, ["Stacks", "Queues"]),
+
+        # 4: Priya – weak DSA
+        mark("4", "DBMS", "Database Management Systems", "Mid-1", 20, 25, ["Normalization", "SQL queries"]),
+        mark("4", "OS",   "Operating Systems",            "Mid-1", 19, 25, ["Processes", "Threads"]),
+        mark("4", "DSA",  "Data Structures & Algorithms", "Mid-1", 11, 25, ["Trees", "Recursion"]),
+
+        # 5: Aditya – struggling in all
+        mark("5", "DBMS", "Database Management Systems", "Mid-1", 11, 25, ["SQL basics", "Joins"]),
+        mark("5", "OS",   "Operating Systems",            "Mid-1",  9, 25, ["CPU scheduling", "Processes"]),
+        mark("5", "DSA",  "Data Structures & Algorithms", "Mid-1", 10, 25, ["Arrays", "Linked Lists"]),
+    ]
+    session.add_all(marks_records)
 
     # ---------- GPA / Results ----------
-    if session.query(Result).count() == 0:
-        results = [
-            # student_id, semester, sgpa, cgpa
-            Result(student_id="1", semester=4, sgpa=7.5, cgpa=7.5),
-            Result(student_id="1", semester=5, sgpa=7.8, cgpa=7.6),
-            Result(student_id="1", semester=6, sgpa=8.0, cgpa=7.8),
-            Result(student_id="1", semester=7, sgpa=0.0, cgpa=7.8),
-
-            Result(student_id="2", semester=4, sgpa=8.8, cgpa=8.8),
-            Result(student_id="2", semester=5, sgpa=9.0, cgpa=8.9),
-            Result(student_id="2", semester=6, sgpa=9.2, cgpa=9.0),
-            Result(student_id="2", semester=7, sgpa=0.0, cgpa=9.0),
-
-            Result(student_id="3", semester=4, sgpa=7.0, cgpa=7.0),
-            Result(student_id="3", semester=5, sgpa=7.2, cgpa=7.1),
-            Result(student_id="3", semester=6, sgpa=7.4, cgpa=7.2),
-            Result(student_id="3", semester=7, sgpa=0.0, cgpa=7.2),
-
-            Result(student_id="4", semester=4, sgpa=7.6, cgpa=7.6),
-            Result(student_id="4", semester=5, sgpa=7.3, cgpa=7.5),
-            Result(student_id="4", semester=6, sgpa=7.1, cgpa=7.3),
-            Result(student_id="4", semester=7, sgpa=0.0, cgpa=7.3),
-
-            Result(student_id="5", semester=4, sgpa=6.5, cgpa=6.5),
-            Result(student_id="5", semester=5, sgpa=6.8, cgpa=6.6),
-            Result(student_id="5", semester=6, sgpa=6.9, cgpa=6.7),
-            Result(student_id="5", semester=7, sgpa=0.0, cgpa=6.7),
-        ]
-        session.add_all(results)
+    results = [
+        # student_id, semester, sgpa, cgpa
+        Result(student_id="1", semester=4, sgpa=7.5, cgpa=7.5),
+        Result(student_id="1", semester=5, sgpa=7.8, cgpa=7.6),
+        Result(student_id="1", semester=6, sgpa=8.0, cgpa=7.8),
+        Result(student_id="1", semester=7, sgpa=0.0, cgpa=7.8),
+
+        Result(student_id="2", semester=4, sgpa=8.8, cgpa=8.8),
+        Result(student_id="2", semester=5, sgpa=9.0, cgpa=8.9),
+        Result(student_id="2", semester=6, sgpa=9.2, cgpa=9.0),
+        Result(student_id="2", semester=7, sgpa=0.0, cgpa=9.0),
+
+        Result(student_id="3", semester=4, sgpa=7.0, cgpa=7.0),
+        Result(student_id="3", semester=5, sgpa=7.2, cgpa=7.1),
+        Result(student_id="3", semester=6, sgpa=7.4, cgpa=7.2),
+        Result(student_id="3", semester=7, sgpa=0.0, cgpa=7.2),
+
+        Result(student_id="4", semester=4, sgpa=7.6, cgpa=7.6),
+        Result(student_id="4", semester=5, sgpa=7.3, cgpa=7.5),
+        Result(student_id="4", semester=6, sgpa=7.1, cgpa=7.3),
+        Result(student_id="4", semester=7, sgpa=0.0, cgpa=7.3),
+
+        Result(student_id="5", semester=4, sgpa=6.5, cgpa=6.5),
+        Result(student_id="5", semester=5, sgpa=6.8, cgpa=6.6),
+        Result(student_id="5", semester=6, sgpa=6.9, cgpa=6.7),
+        Result(student_id="5", semester=7, sgpa=0.0, cgpa=6.7),
+    ]
+    session.add_all(results)
 
     # ---------- Library Resources ----------
-    if session.query(LibraryResource).count() == 0:
-        resources = [
-            LibraryResource(
-                title="DBMS Lecture Notes PDF",
-                type="PDF",
-                url="https://example.com/dbms-notes.pdf",
-                course_code="DBMS",
-                tags="dbms,notes,pdf,normalization,sql",
-                description="Concise DBMS notes covering ER diagrams, normalization, SQL queries and joins.",
-            ),
-            LibraryResource(
-                title="DBMS YouTube Playlist",
-                type="YouTube",
-                url="https://youtube.com/playlist?list=DBMS_PLAYLIST",
-                course_code="DBMS",
-                tags="dbms,youtube,sql,joins,indexing",
-                description="Video playlist focusing on SQL basics, joins, indexing, and query optimization.",
-            ),
-            LibraryResource(
-                title="OS Unit-2 Notes",
-                type="PDF",
-                url="https://example.com/os-unit2.pdf",
-                course_code="OS",
-                tags="os,notes,cpu scheduling,threads",
-                description="Operating Systems notes for CPU scheduling, processes and threads.",
-            ),
-            LibraryResource(
-                title="OS Concepts Video Series",
-                type="YouTube",
-                url="https://youtube.com/playlist?list=OS_PLAYLIST",
-                course_code="OS",
-                tags="os,youtube,deadlocks,synchronization",
-                description="Video series explaining deadlocks, synchronization, and process management.",
-            ),
-            LibraryResource(
-                title="DSA Cheat Sheet PDF",
-                type="PDF",
-                url="https://example.com/dsa-cheatsheet.pdf",
-                course_code="DSA",
-                tags="dsa,cheatsheet,arrays,linked lists,trees",
-                description="Quick revision cheat sheet for core data structures topics.",
-            ),
-            LibraryResource(
-                title="DSA Coding Playlist",
-                type="YouTube",
-                url="https://youtube.com/playlist?list=DSA_PLAYLIST",
-                course_code="DSA",
-                tags="dsa,youtube,coding,practice",
-                description="Coding-focused playlist implementing data structures and solving problems.",
-            ),
-        ]
-        session.add_all(resources)
+    resources = [
+        LibraryResource(
+            title="DBMS Lecture Notes PDF",
+            type="PDF",
+            url="https://example.com/dbms-notes.pdf",
+            course_code="DBMS",
+            tag_list=get_or_create_tags(session, "dbms,notes,pdf,normalization,sql".split(",")),
+            description="Concise DBMS notes covering ER diagrams, normalization, SQL queries and joins.",
+        ),
+        LibraryResource(
+            title="DBMS YouTube Playlist",
+            type="YouTube",
+            url="https://youtube.com/playlist?list=DBMS_PLAYLIST",
+            course_code="DBMS",
+            tag_list=get_or_create_tags(session, "dbms,youtube,sql,joins,indexing".split(",")),
+            description="Video playlist focusing on SQL basics, joins, indexing, and query optimization.",
+        ),
+        LibraryResource(
+            title="OS Unit-2 Notes",
+            type="PDF",
+            url="https://example.com/os-unit2.pdf",
+            course_code="OS",
+            tag_list=get_or_create_tags(session, "os,notes,cpu scheduling,threads".split(",")),
+            description="Operating Systems notes for CPU scheduling, processes and threads.",
+        ),
+        LibraryResource(
+            title="OS Concepts Video Series",
+            type="YouTube",
+            url="https://youtube.com/playlist?list=OS_PLAYLIST",
+            course_code="OS",
+            tag_list=get_or_create_tags(session, "os,youtube,deadlocks,synchronization".split(",")),
+            description="Video series explaining deadlocks, synchronization, and process management.",
+        ),
+        LibraryResource(
+            title="DSA Cheat Sheet PDF",
+            type="PDF",
+            url="https://example.com/dsa-cheatsheet.pdf",
+            course_code="DSA",
+            tag_list=get_or_create_tags(session, "dsa,cheatsheet,arrays,linked lists,trees".split(",")),
+            description="Quick revision cheat sheet for core data structures topics.",
+        ),
+        LibraryResource(
+            title="DSA Coding Playlist",
+            type="YouTube",
+            url="https://youtube.com/playlist?list=DSA_PLAYLIST",
+            course_code="DSA",
+            tag_list=get_or_create_tags(session, "dsa,youtube,coding,practice".split(",")),
+            description="Coding-focused playlist implementing data structures and solving problems.",
+        ),
+    ]
+    session.add_all(resources)
 
     # ---------- Events ----------
-    if session.query(Event).count() == 0:
-        events = [
-            Event(
-                title="DBMS Crash Course Workshop",
-                date="2025-01-15",
-                category="Workshop",
-                location="Lab-1",
-                description="Hands-on sessions on SQL, joins, indexing, and query optimization.",
-                recommended_for="low DBMS, improve SQL",
-                tags="dbms,sql,workshop",
-            ),
-            Event(
-                title="Operating Systems Lab Bootcamp",
-                date="2025-01-20",
-                category="Bootcamp",
-                location="Lab-2",
-                description="Practical CPU scheduling and synchronization problems.",
-                recommended_for="low OS, weak in CPU scheduling or deadlocks",
-                tags="os,bootcamp,scheduling",
-            ),
-            Event(
-                title="Coding Club DSA Series",
-                date="Every Saturday",
-                category="Club",
-                location="CSE Block",
-                description="Weekly sessions on arrays, linked lists, stacks, queues, and trees.",
-                recommended_for="improve DSA fundamentals",
-                tags="dsa,coding,club",
-            ),
-        ]
-        session.add_all(events)
-
+    events = [
+        Event(
+            title="DBMS Crash Course Workshop",
+            date="2025-01-15",
+            category="Workshop",
+            location="Lab-1",
+            description="Hands-on sessions on SQL, joins, indexing, and query optimization.",
+            recommended_for="low DBMS, improve SQL",
+            tag_list=get_or_create_tags(session, "dbms,sql,workshop".split(",")),
+        ),
+        Event(
+            title="Operating Systems Lab Bootcamp",
+            date="2025-01-20",
+            category="Bootcamp",
+            location="Lab-2",
+            description="Practical CPU scheduling and synchronization problems.",
+            recommended_for="low OS, weak in CPU scheduling or deadlocks",
+            tag_list=get_or_create_tags(session, "os,bootcamp,scheduling".split(",")),
+        ),
+        Event(
+            title="Coding Club DSA Series",
+            date="Every Saturday",
+            category="Club",
+            location="CSE Block",
+            description="Weekly sessions on arrays, linked lists, stacks, queues, and trees.",
+            recommended_for="improve DSA fundamentals",
+            tag_list=get_or_create_tags(session, "dsa,coding,club".split(",")),
+        ),
+    ]
+    session.add_all(events)
+
+    if meta is None:
+        meta = SchemaVersion(id=1, version=SCHEMA_VERSION)
+        session.add(meta)
+    meta.seed_version = SEED_VERSION
     session.commit()
 
 
+# ---------- Courses, tags and topics ----------
+
+def get_or_create_course(session: Session, code: str, name: str) -> Course:
+    for obj in session.new:
+        if isinstance(obj, Course) and obj.code == code:
+            return obj
+    course = session.scalars(select(Course).where(Course.code == code)).first()
+    if course is None:
+        course = Course(code=code, name=name)
+        session.add(course)
+    return course
+
+
+def _get_or_create_named(session: Session, model, names):
+    names = [n.strip() for n in names if n and n.strip()]
+    # objects added but not flushed yet (autoflush is off)
+    known = {obj.name: obj for obj in session.new if isinstance(obj, model)}
+    if names:
+        for obj in session.scalars(select(model).where(model.name.in_(set(names)))):
+            known.setdefault(obj.name, obj)
+
+    result = []
+    for name in names:
+        obj = known.get(name)
+        if obj is None:
+            obj = known[name] = model(name=name)
+            session.add(obj)
+        if obj not in result:
+            result.append(obj)
+    return result
+
+
+def get_or_create_tags(session: Session, names) -> List[Tag]:
+    return _get_or_create_named(session, Tag, names)
+
+
+def get_or_create_topics(session: Session, names) -> List[Topic]:
+    return _get_or_create_named(session, Topic, names)
+
+
+def get_library_resources_by_tags(session: Session, tag_names):
+    """Resources carrying any of the tags, most matching tags first (index lookups on the join table)."""
+    matches = (
+        select(library_resource_tags.c.resource_id, func.count().label("hits"))
+        .join(Tag, Tag.id == library_resource_tags.c.tag_id)
+        .where(Tag.name.in_(list(tag_names)))
+        .group_by(library_resource_tags.c.resource_id)
+        .subquery()
+    )
+    return session.scalars(
+        select(LibraryResource)
+        .join(matches, matches.c.resource_id == LibraryResource.id)
+        .order_by(matches.c.hits.desc(), LibraryResource.id)
+    ).all()
+
+
+def get_events_by_tags(session: Session, tag_names):
+    """Events carrying any of the tags, most matching tags first."""
+    matches = (
+        select(event_tags.c.event_id, func.count().label("hits"))
+        .join(Tag, Tag.id == event_tags.c.tag_id)
+        .where(Tag.name.in_(list(tag_names)))
+        .group_by(event_tags.c.event_id)
+        .subquery()
+    )
+    return session.scalars(
+        select(Event)
+        .join(matches, matches.c.event_id == Event.id)
+        .order_by(matches.c.hits.desc(), Event.id)
+    ).all()
+
+
 # ---------- Query helper functions ----------
 
 def get_all_students(session: Session):
     return session.query(Student).order_by(Student.name).all()
 
 
+def iter_all_students(session: Session, batch_size: int = 500):
+    """Stream every student ordered by student_id, fetching `batch_size` rows at a time."""
+    return (
+        session.query(Student)
+        .order_by(Student.student_id)
+        .yield_per(batch_size)
+    )
+
+
 def get_student_by_student_id(session: Session, student_id: str):
     return session.query(Student).filter(Student.student_id == student_id).first()
 
@@ -249,6 +383,20 @@ def get_marks_for_student(session: Session, student_id: str):
     return session.query(Mark).filter(Mark.student_id == student_id).all()
 
 
+def get_marks_for_students(session: Session, student_ids):
+    """Mark rows for many students in one query, grouped as {student_id: [rows]}."""
+    grouped = {sid: [] for sid in student_ids}
+    rows = (
+        session.query(Mark)
+        .filter(Mark.student_id.in_(list(student_ids)))
+        .order_by(Mark.id)
+        .all()
+    )
+    for row in rows:
+        grouped[row.student_id].append(row)
+    return grouped
+
+
 def get_results_for_student(session: Session, student_id: str):
     return (
         session.query(Result)
@@ -258,6 +406,133 @@ def get_results_for_student(session: Session, student_id: str):
     )
 
 
+def _create_student_analytics(student_id: str) -> StudentAnalytics:
+    """
+    Build a missing snapshot through the write engine and return it detached.
+    Callers usually hold a ReadSessionLocal session, which may be read-only
+    or point at a replica that hasn't seen the new row yet.
+    """
+    with SessionLocal() as write_session:
+        refresh_student_analytics(write_session, [student_id])
+        write_session.commit()
+        analytics = write_session.scalars(
+            select(StudentAnalytics).where(StudentAnalytics.student_id == student_id)
+        ).one()
+        write_session.expunge(analytics)
+    return analytics
+
+
+def get_student_analytics(session: Session, student_id: str):
+    """
+    Precomputed analytics row of one student.
+    Built on first access (through the write engine, never through `session`)
+    for students whose snapshot doesn't exist yet.
+    """
+    analytics = (
+        session.query(StudentAnalytics)
+        .filter(StudentAnalytics.student_id == student_id)
+        .first()
+    )
+    if analytics is None:
+        analytics = _create_student_analytics(student_id)
+    return analytics
+
+
+def backfill_student_analytics(session: Session) -> int:
+    """Build missing snapshots (databases created before the table existed); returns how many."""
+    missing = session.scalars(
+        select(Student.student_id)
+        .outerjoin(StudentAnalytics, StudentAnalytics.student_id == Student.student_id)
+        .where(StudentAnalytics.id.is_(None))
+    ).all()
+    if missing:
+        refresh_student_analytics(session, missing)
+        session.commit()
+    return len(missing)
+
+
+def get_analytics_for_students(session: Session, student_ids):
+    """
+    Analytics rows for many students in one query, as {student_id: row}.
+    Read-only: students without a snapshot are left out (run
+    backfill_student_analytics first to build them).
+    """
+    ids = list(student_ids)
+    return {
+        a.student_id: a
+        for a in session.query(StudentAnalytics).filter(StudentAnalytics.student_id.in_(ids))
+    }
+
+
+# ---------- Student bundle ----------
+
+@dataclass
+class StudentBundle:
+    """
+    Everything the student pages and the mentor need about one student,
+    loaded together by load_student_bundle().
+
+    Attendance comes from the analytics snapshot (per-course entries with
+    % and classes needed); results are ordered by semester.
+    """
+    student: Student
+    analytics: StudentAnalytics
+    marks: List[Mark] = field(default_factory=list)
+    results: List[Result] = field(default_factory=list)
+
+    @property
+    def student_id(self) -> str:
+        return self.student.student_id
+
+    @property
+    def attendance(self) -> list:
+        return self.analytics.attendance_summary or []
+
+
+def load_student_bundle(
+    session: Session,
+    student_id: str,
+    marks: bool = True,
+    results: bool = True,
+) -> Optional[StudentBundle]:
+    """
+    Student + analytics snapshot (+ results) in one statement, marks in a
+    second one. Pages that don't need marks or results can skip them; the
+    skipped lists stay empty. Returns None for an unknown student_id.
+    """
+    entities = [Student, StudentAnalytics] + ([Result] if results else [])
+    stmt = (
+        select(*entities)
+        .outerjoin(StudentAnalytics, StudentAnalytics.student_id == Student.student_id)
+        .where(Student.student_id == student_id)
+    )
+    if results:
+        stmt = (
+            stmt.outerjoin(Result, Result.student_id == Student.student_id)
+            .order_by(Result.semester)
+        )
+    rows = session.execute(stmt).all()
+    if not rows:
+        return None
+
+    student, analytics = rows[0][0], rows[0][1]
+    bundle = StudentBundle(student=student, analytics=analytics)
+    if results:
+        bundle.results = [row[2] for row in rows if row[2] is not None]
+    if analytics is None:
+        # no snapshot yet (database older than the table): built via the write engine
+        bundle.analytics = _create_student_analytics(student_id)
+
+    if marks:
+        bundle.marks = list(session.scalars(
+            select(Mark)
+            .options(joinedload(Mark.topic_list))
+            .where(Mark.student_id == student_id)
+            .order_by(Mark.id)
+        ).unique())
+    return bundle
+
+
 def get_all_library_resources(session: Session):
     return session.query(LibraryResource).all()
 
@@ -273,3 +548,356 @@ def get_results_for_student(session, student_id: str):
         .order_by(Result.semester)
         .all()
     )
+
+
+# ---------- Attendance log ----------
+# Every class session is an AttendanceEvent row; the Attendance counters are
+# adjusted by the same transaction with `total = total + x` style statements,
+# so pages and compute_attendance_insights keep reading two integers.
+# These functions run in the caller's transaction; commit to persist.
+
+_BUMP_COLUMNS = ["student_id", "course_id", "course_code", "total_classes", "attended", "threshold"]
+
+
+def _course_id(session: Session, course_code: str) -> int:
+    course_id = session.scalar(select(Course.id).where(Course.code == course_code))
+    if course_id is None:
+        raise ValueError(f"Unknown course: {course_code}")
+    return course_id
+
+
+def _bump_attendance(session: Session, source):
+    """
+    Add total_classes / attended deltas to the counters, creating missing
+    (student, course) rows. `source` is a list of dicts or a SELECT, both
+    with _BUMP_COLUMNS; new rows get the deltas as their counters.
+    """
+    table = Attendance.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        if isinstance(source, Select):
+            stmt = stmt.from_select(_BUMP_COLUMNS, source)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["student_id", "course_code"],
+            set_={
+                "total_classes": table.c.total_classes + stmt.excluded.total_classes,
+                "attended": table.c.attended + stmt.excluded.attended,
+            },
+        )
+        session.execute(stmt, None if isinstance(source, Select) else source)
+        return
+
+    rows = session.execute(source).mappings().all() if isinstance(source, Select) else source
+    for row in rows:
+        updated = session.execute(
+            update(table)
+            .where(table.c.student_id == row["student_id"], table.c.course_code == row["course_code"])
+            .values(
+                total_classes=table.c.total_classes + row["total_classes"],
+                attended=table.c.attended + row["attended"],
+            )
+        )
+        if updated.rowcount == 0:
+            session.execute(table.insert().values(**row))
+
+
+def _after_attendance_write(session: Session, student_ids):
+    # Core statements skip the flush hooks: refresh snapshots here and drop
+    # stale counters from loaded Attendance objects
+    student_ids = set(student_ids)
+    refresh_student_analytics(session, student_ids)
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Attendance) and obj.student_id in student_ids:
+            session.expire(obj)
+
+
+def record_attendance(
+    session: Session,
+    student_id: str,
+    course_code: str,
+    class_date: date,
+    present: bool,
+    period: int = 1,
+    threshold: int = 75,
+) -> bool:
+    """
+    Log one student's attendance for a class session and update the
+    counters. Recording the same session again corrects the earlier entry.
+    Returns False if nothing changed.
+    """
+    course_id = _course_id(session, course_code)
+    events = AttendanceEvent.__table__
+    key = (
+        events.c.course_code == course_code,
+        events.c.class_date == class_date,
+        events.c.period == period,
+        events.c.student_id == student_id,
+    )
+    previous = session.execute(select(events.c.id, events.c.present).where(*key)).first()
+
+    if previous is None:
+        session.execute(events.insert().values(
+            student_id=student_id, course_id=course_id, course_code=course_code,
+            class_date=class_date, period=period, present=present, recorded_at=datetime.now(),
+        ))
+        total_delta, attended_delta = 1, int(present)
+    elif bool(previous.present) != bool(present):
+        session.execute(events.update().where(events.c.id == previous.id)
+                        .values(present=present, recorded_at=datetime.now()))
+        total_delta, attended_delta = 0, (1 if present else -1)
+    else:
+        return False
+
+    _bump_attendance(session, [{
+        "student_id": student_id, "course_id": course_id, "course_code": course_code,
+        "total_classes": total_delta, "attended": attended_delta, "threshold": threshold,
+    }])
+    _after_attendance_write(session, [student_id])
+    return True
+
+
+def mark_section_attendance(
+    session: Session,
+    course_code: str,
+    class_date: date,
+    branch: str,
+    section: str,
+    absent_ids=(),
+    period: int = 1,
+    threshold: int = 75,
+) -> int:
+    """
+    Log a whole class section for one session: everyone present except
+    `absent_ids`. The events are one INSERT .. SELECT over the section and
+    the counters one upsert over the same rows, whatever the section size.
+    Students already logged for this session are left alone (use
+    record_attendance to correct them). Returns the number of events added.
+    """
+    course_id = _course_id(session, course_code)
+    events = AttendanceEvent.__table__
+    absent_ids = list(absent_ids)
+    present = case((Student.student_id.in_(absent_ids), 0), else_=1) if absent_ids else literal(1)
+
+    section_students = (
+        Student.branch == branch,
+        Student.section == section,
+        ~exists().where(
+            events.c.course_code == course_code,
+            events.c.class_date == class_date,
+            events.c.period == period,
+            events.c.student_id == Student.student_id,
+        ),
+    )
+
+    # counters first: the NOT EXISTS above still sees only the unlogged students
+    _bump_attendance(session, select(
+        Student.student_id, literal(course_id), literal(course_code),
+        literal(1), present, literal(threshold),
+    ).where(*section_students))
+
+    added = session.execute(events.insert().from_select(
+        ["student_id", "course_id", "course_code", "class_date", "period", "present", "recorded_at"],
+        select(
+            Student.student_id, literal(course_id), literal(course_code),
+            literal(class_date), literal(period), present == 1, literal(datetime.now()),
+        ).where(*section_students),
+    )).rowcount
+
+    if added:
+        _after_attendance_write(session, session.scalars(
+            select(Student.student_id).where(Student.branch == branch, Student.section == section)
+        ))
+    return added
+
+
+def get_attendance_events(session: Session, student_id: str, course_code: str = None):
+    """A student's logged class sessions, newest first."""
+    stmt = select(AttendanceEvent).where(AttendanceEvent.student_id == student_id)
+    if course_code is not None:
+        stmt = stmt.where(AttendanceEvent.course_code == course_code)
+    return session.scalars(
+        stmt.order_by(AttendanceEvent.class_date.desc(), AttendanceEvent.period.desc())
+    ).all()
+
+
+# ---------- Admin / cohort aggregates ----------
+# Everything below is computed by the database (GROUP BY + window functions);
+# only the aggregated rows come back to Python.
+
+COHORT_GROUPINGS = {
+    "branch": (Student.branch,),
+    "section": (Student.section,),
+    "branch_section": (Student.branch, Student.section),
+}
+
+
+class _floor(FunctionElement):
+    """FLOOR() for non-negative values; SQLite builds may lack math functions."""
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(_floor)
+def _compile_floor(element, compiler, **kw):
+    return "FLOOR(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(_floor, "sqlite")
+def _compile_floor_sqlite(element, compiler, **kw):
+    # CAST truncates toward zero, which is floor for values >= 0
+    return "CAST(%s AS INTEGER)" % compiler.process(element.clauses, **kw)
+
+
+def _attendance_pct():
+    return Attendance.attended * 100.0 / Attendance.total_classes
+
+
+def get_cohort_overview(session: Session):
+    """Headline numbers: students, average attendance, students below threshold."""
+    below = Attendance.attended * 100.0 < Attendance.threshold * Attendance.total_classes
+    row = session.execute(
+        select(
+            func.count(func.distinct(Attendance.student_id)).label("students"),
+            func.avg(_attendance_pct()).label("avg_attendance"),
+            func.count(func.distinct(case((below, Attendance.student_id)))).label("students_below"),
+            func.sum(case((below, 1), else_=0)).label("courses_below"),
+        ).where(Attendance.total_classes > 0)
+    ).one()
+    return row._asdict()
+
+
+def get_attendance_aggregates(session: Session, group_by: str = "branch", by_course: bool = False):
+    """
+    Average attendance % and how many students / course rows are below their
+    threshold, per branch, section or branch+section (optionally per course).
+    """
+    keys = list(COHORT_GROUPINGS[group_by])
+    if by_course:
+        keys.append(Attendance.course_code)
+
+    below = Attendance.attended * 100.0 < Attendance.threshold * Attendance.total_classes
+    stmt = (
+        select(
+            *keys,
+            func.count(func.distinct(Attendance.student_id)).label("students"),
+            func.avg(_attendance_pct()).label("avg_attendance"),
+            func.min(_attendance_pct()).label("min_attendance"),
+            func.count(func.distinct(case((below, Attendance.student_id)))).label("students_below"),
+            func.sum(case((below, 1), else_=0)).label("courses_below"),
+        )
+        .join(Student, Student.student_id == Attendance.student_id)
+        .where(Attendance.total_classes > 0)
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+    return [row._asdict() for row in session.execute(stmt)]
+
+
+def _mark_pct():
+    return Mark.score * 100.0 / Mark.max_score
+
+
+def get_mark_distribution(session: Session, bucket_size: int = 10, course_code: str = None, exam_type: str = None):
+    """
+    Histogram of mark % per course_code / exam_type, in `bucket_size` wide
+    buckets (bucket = lower bound; 100% falls into the last bucket).
+    """
+    bucket = _floor(_mark_pct() / bucket_size) * bucket_size
+    bucket = case((bucket >= 100, 100 - bucket_size), else_=bucket).label("bucket")
+    stmt = (
+        select(Mark.course_code, Mark.exam_type, bucket, func.count().label("count"))
+        .where(Mark.max_score > 0)
+        .group_by(Mark.course_code, Mark.exam_type, bucket)
+        .order_by(Mark.course_code, Mark.exam_type, bucket)
+    )
+    if course_code:
+        stmt = stmt.where(Mark.course_code == course_code)
+    if exam_type:
+        stmt = stmt.where(Mark.exam_type == exam_type)
+    return [row._asdict() for row in session.execute(stmt)]
+
+
+def get_mark_percentiles(session: Session, percentiles=(0.25, 0.5, 0.75, 0.9)):
+    """
+    Count, mean, min/max and nearest-rank percentiles of mark % per
+    course_code / exam_type, using ROW_NUMBER() / COUNT() window functions.
+    """
+    partition = (Mark.course_code, Mark.exam_type)
+    ranked = (
+        select(
+            Mark.course_code,
+            Mark.exam_type,
+            _mark_pct().label("pct"),
+            func.row_number().over(partition_by=partition, order_by=_mark_pct()).label("rn"),
+            func.count().over(partition_by=partition).label("n"),
+        )
+        .where(Mark.max_score > 0)
+        .subquery()
+    )
+    # nearest rank: the smallest value whose rank reaches p * n
+    pct_columns = [
+        func.min(case((ranked.c.rn >= p * ranked.c.n, ranked.c.pct))).label(f"p{int(p * 100)}")
+        for p in percentiles
+    ]
+    stmt = (
+        select(
+            ranked.c.course_code,
+            ranked.c.exam_type,
+            func.count().label("count"),
+            func.avg(ranked.c.pct).label("mean"),
+            func.min(ranked.c.pct).label("min"),
+            func.max(ranked.c.pct).label("max"),
+            *pct_columns,
+        )
+        .group_by(ranked.c.course_code, ranked.c.exam_type)
+        .order_by(ranked.c.course_code, ranked.c.exam_type)
+    )
+    return [row._asdict() for row in session.execute(stmt)]
+
+
+def get_cgpa_distribution(session: Session, bucket_size: float = 0.5, group_by: str = None):
+    """
+    Distribution of each student's latest non-zero CGPA, picked with
+    ROW_NUMBER() over their results, in `bucket_size` wide buckets.
+    Optionally split by branch / section.
+    """
+    latest = (
+        select(
+            Result.student_id,
+            Result.cgpa,
+            func.row_number().over(
+                partition_by=Result.student_id, order_by=Result.semester.desc()
+            ).label("rn"),
+        )
+        .where(Result.cgpa > 0)
+        .subquery()
+    )
+    bucket = (_floor(latest.c.cgpa / bucket_size) * bucket_size).label("bucket")
+    keys = list(COHORT_GROUPINGS[group_by]) if group_by else []
+
+    stmt = select(*keys, bucket, func.count().label("students"), func.avg(latest.c.cgpa).label("avg_cgpa"))
+    if keys:
+        stmt = stmt.join(Student, Student.student_id == latest.c.student_id)
+    else:
+        stmt = stmt.select_from(latest)
+    stmt = (
+        stmt.where(latest.c.rn == 1)
+        .group_by(*keys, bucket)
+        .order_by(*keys, bucket)
+    )
+    return [row._asdict() for row in session.execute(stmt)]
+
+
+def get_course_exam_pairs(session: Session):
+    """Distinct (course_code, exam_type) pairs, for admin filters."""
+    stmt = (
+        select(Mark.course_code, Mark.exam_type)
+        .distinct()
+        .order_by(Mark.course_code, Mark.exam_type)
+    )
+    return [tuple(row) for row in session.execute(stmt)]
@@ -1,17 +1,104 @@
-from sqlalchemy import create_engine
+import os
+import os.path as osp
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# Using SQLite local file
-DATABASE_URL = "sqlite:///./student_dashboard.db"
+BASE_DIR = osp.abspath(osp.join(osp.dirname(__file__), ".."))
+load_dotenv(osp.join(BASE_DIR, ".env"))
 
-# Engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},  # required for SQLite + Streamlit
+# SQLite file in the project root by default (independent of the working
+# directory); any SQLAlchemy URL works, e.g. postgresql+psycopg2://...
+DATABASE_URL = os.getenv(
+    "DATABASE_URL", "sqlite:///" + osp.join(BASE_DIR, "student_dashboard.db")
 )
+# Optional separate URL (e.g. a replica) for the dashboard read path
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+# Open the dashboard read engine read-only (no writes possible through it)
+DB_READ_ONLY = os.getenv("DB_READ_ONLY", "0").lower() in ("1", "true", "yes")
+DB_ECHO = os.getenv("DB_ECHO", "0").lower() in ("1", "true", "yes")
+
+# connection pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# SQLite pragmas, applied to every new connection
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+def _sqlite_pragmas(read_only: bool):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers run while one writer commits
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        # negative cache_size is in KiB
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        # SQLite leaves foreign keys unenforced unless asked
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    return on_connect
+
+
+def _postgres_read_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY")
+    cursor.close()
+    dbapi_connection.commit()
+
+
+def make_engine(url: str, read_only: bool = False):
+    """Engine for `url` with pool settings and, for SQLite, connect-time pragmas."""
+    backend = make_url(url).get_backend_name()
+    kwargs = {"echo": DB_ECHO, "pool_pre_ping": True}
+
+    if backend == "sqlite":
+        # required for SQLite + Streamlit (sessions move between threads)
+        kwargs["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+        in_memory = make_url(url).database in (None, "", ":memory:")
+        if not in_memory:
+            kwargs.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                          pool_timeout=DB_POOL_TIMEOUT)
+    else:
+        kwargs.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                      pool_timeout=DB_POOL_TIMEOUT, pool_recycle=DB_POOL_RECYCLE)
+
+    new_engine = create_engine(url, **kwargs)
+    if backend == "sqlite":
+        event.listen(new_engine, "connect", _sqlite_pragmas(read_only))
+    elif read_only and backend == "postgresql":
+        event.listen(new_engine, "connect", _postgres_read_only)
+    return new_engine
+
+
+# Engine
+engine = make_engine(DATABASE_URL)
+
+# Dashboard read path: a separate engine only when configured, otherwise the
+# main engine
+if DATABASE_READ_URL or DB_READ_ONLY:
+    read_engine = make_engine(DATABASE_READ_URL or DATABASE_URL, read_only=True)
+else:
+    read_engine = engine
 
-# Session factory
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Base class for models
 Base = declarative_base()
@@ -0,0 +1,106 @@
+# backend/import_report.py
+#
+# Import-time report for the app's cold start.
+# Runs `python -X importtime` in a fresh interpreter, prints the slowest
+# modules (self + cumulative time) and fails if a budget is exceeded or if a
+# heavy module that should load lazily was pulled in.
+#
+#   python -m backend.import_report
+#   python -m backend.import_report --target frontend.components.layout --budget-ms 1500
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Only the AI Mentor page should pay for these.
+DEFAULT_FORBIDDEN = [
+    "torch",
+    "sentence_transformers",
+    "chromadb",
+    "langchain_community",
+    "langchain_groq",
+    "langchain_ollama",
+    "langchain_google_genai",
+    "backend.ai.mentor",
+    "backend.ai.vector_store",
+]
+
+
+def measure_imports(target: str):
+    """
+    Import `target` in a child interpreter with -X importtime.
+
+    Returns (rows, max_rss_kb) where rows are (module, self_us, cumulative_us)
+    in import order.
+    """
+    before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    max_rss_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    # ru_maxrss is a high-water mark over all children; only trust it if it moved
+    return rows, max_rss_kb if max_rss_kb > before else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of the app's modules.")
+    parser.add_argument("--target", default="frontend.components.layout",
+                        help="module to import (default: frontend.components.layout)")
+    parser.add_argument("--top", type=int, default=25,
+                        help="number of modules to list, by cumulative time")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail if the total import time exceeds this")
+    parser.add_argument("--max-rss-mb", type=float, default=None,
+                        help="fail if the importing process' peak RSS exceeds this")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN,
+                        help="modules that must not be imported")
+    args = parser.parse_args()
+
+    rows, max_rss_kb = measure_imports(args.target)
+    total_us = sum(self_us for _name, self_us, _cum in rows)
+
+    print(f"Import report for `{args.target}`: {len(rows)} modules, {total_us / 1000:.1f} ms total")
+    if max_rss_kb is not None:
+        print(f"Peak RSS: {max_rss_kb / 1024:.1f} MB")
+    print()
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    failures = []
+    imported = {name for name, _s, _c in rows}
+    leaked = [m for m in args.forbid if m in imported]
+    if leaked:
+        failures.append("heavy modules imported eagerly: " + ", ".join(leaked))
+    if args.budget_ms is not None and total_us / 1000 > args.budget_ms:
+        failures.append(f"import time {total_us / 1000:.1f} ms > budget {args.budget_ms:.1f} ms")
+    if args.max_rss_mb is not None and max_rss_kb is not None and max_rss_kb / 1024 > args.max_rss_mb:
+        failures.append(f"peak RSS {max_rss_kb / 1024:.1f} MB > budget {args.max_rss_mb:.1f} MB")
+
+    if failures:
+        print()
+        for f in failures:
+            print(f"❌ {f}")
+        sys.exit(1)
+
+    print("\n✅ Import budget OK.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+# backend/ingest.py
+#
+# Bulk ingestion of registrar exports (CSV or Parquet).
+#
+#   python -m backend.ingest students  students.csv
+#   python -m backend.ingest attendance term_attendance.csv
+#   python -m backend.ingest marks      marks.parquet --chunk-size 20000
+#   python -m backend.ingest results    results.csv --commit-every 5
+#
+# Files are streamed in chunks, each row is validated, and valid rows are
+# upserted with one executemany INSERT .. ON CONFLICT DO UPDATE per chunk
+# (keyed on the table's unique index), so re-importing a corrected export
+# updates rows instead of duplicating them. Every --commit-every chunks form
+# one transaction, which also refreshes the analytics snapshots of the
+# students it touched. Memory stays bounded by the chunk size, whatever the
+# file size. Rejected rows go to <file>.rejects.csv with the reason.
+#
+# Expected columns (header names; optional ones in brackets):
+#   students:   student_id, name, branch, semester, section
+#   attendance: student_id, course_code, [course_name], total_classes, attended, [threshold]
+#   marks:      student_id, course_code, [course_name], exam_type, score, max_score, [topics]
+#   results:    student_id, semester, sgpa, cgpa
+# course_name is only needed for courses not in the database yet; topics
+# are separated by "," or ";".
+
+import argparse
+import csv
+import math
+import os
+import time
+from typing import Iterator, Optional
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from backend.crud import mark_seeded
+from backend.database import engine as default_engine
+from backend.models import Course, Mark, Result, Student, Attendance, Topic, mark_topics
+from backend.analytics.snapshot import refresh_student_analytics
+
+
+# ---------- Row validation ----------
+
+def _text(raw: dict, name: str) -> str:
+    value = raw.get(name)
+    value = "" if value is None else str(value).strip()
+    if not value:
+        raise ValueError(f"missing {name}")
+    return value
+
+
+def _optional_text(raw: dict, name: str) -> Optional[str]:
+    value = raw.get(name)
+    value = "" if value is None else str(value).strip()
+    return value or None
+
+
+def _int(raw: dict, name: str, low=None, high=None, default=None) -> int:
+    value = raw.get(name)
+    if (value is None or str(value).strip() == "") and default is not None:
+        return default
+    try:
+        number = float(str(value).strip())
+    except (ValueError, OverflowError):
+        raise ValueError(f"{name} is not a number: {value!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"{name} is not a finite number: {value!r}")
+    if number != int(number):
+        raise ValueError(f"{name} is not a whole number: {value!r}")
+    number = int(number)
+    if (low is not None and number < low) or (high is not None and number > high):
+        raise ValueError(f"{name} out of range: {number}")
+    return number
+
+
+def _float(raw: dict, name: str, low=None, high=None) -> float:
+    try:
+        number = float(str(raw.get(name)).strip())
+    except (ValueError, OverflowError):
+        raise ValueError(f"{name} is not a number: {raw.get(name)!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"{name} is not a finite number: {raw.get(name)!r}")
+    if (low is not None and number < low) or (high is not None and number > high):
+        raise ValueError(f"{name} out of range: {number}")
+    return number
+
+
+def _student_row(raw):
+    return {
+        "student_id": _text(raw, "student_id"),
+        "name": _text(raw, "name"),
+        "branch": _text(raw, "branch"),
+        "semester": _int(raw, "semester", 1, 12),
+        "section": _text(raw, "section"),
+    }
+
+
+def _attendance_row(raw):
+    row = {
+        "student_id": _text(raw, "student_id"),
+        "course_code": _text(raw, "course_code"),
+        "course_name": _optional_text(raw, "course_name"),
+        "total_classes": _int(raw, "total_classes", 0),
+        "attended": _int(raw, "attended", 0),
+        "threshold": _int(raw, "threshold", 1, 100, default=75),
+    }
+    if row["attended"] > row["total_classes"]:
+        raise ValueError("attended is greater than total_classes")
+    return row
+
+
+def _mark_row(raw):
+    row = {
+        "student_id": _text(raw, "student_id"),
+        "course_code": _text(raw, "course_code"),
+        "course_name": _optional_text(raw, "course_name"),
+        "exam_type": _text(raw, "exam_type"),
+        "score": _int(raw, "score", 0),
+        "max_score": _int(raw, "max_score", 1),
+        "topics": (_optional_text(raw, "topics") or "").replace(";", ","),
+    }
+    if row["score"] > row["max_score"]:
+        raise ValueError("score is greater than max_score")
+    return row
+
+
+def _result_row(raw):
+    return {
+        "student_id": _text(raw, "student_id"),
+        "semester": _int(raw, "semester", 1, 12),
+        "sgpa": _float(raw, "sgpa", 0, 10),
+        "cgpa": _float(raw, "cgpa", 0, 10),
+    }
+
+
+# kind -> (table, unique key, required columns, row validator)
+KINDS = {
+    "students": (
+        Student.__table__, ("student_id",),
+        ("student_id", "name", "branch", "semester", "section"), _student_row,
+    ),
+    "attendance": (
+        Attendance.__table__, ("student_id", "course_code"),
+        ("student_id", "course_code", "total_classes", "attended"), _attendance_row,
+    ),
+    "marks": (
+        Mark.__table__, ("student_id", "course_code", "exam_type"),
+        ("student_id", "course_code", "exam_type", "score", "max_score"), _mark_row,
+    ),
+    "results": (
+        Result.__table__, ("student_id", "semester"),
+        ("student_id", "semester", "sgpa", "cgpa"), _result_row,
+    ),
+}
+
+
+# ---------- Readers ----------
+
+def _detect_format(path: str) -> str:
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def read_chunks(path: str, chunk_size: int, fmt: Optional[str] = None) -> Iterator[tuple]:
+    """
+    Yield (columns, [(line_number, raw_row_dict), ...]) chunks.
+    CSV line numbers count the header as line 1.
+    """
+    fmt = fmt or _detect_format(path)
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("❌ Reading Parquet needs pyarrow: pip install pyarrow")
+        parquet = pq.ParquetFile(path)
+        columns = parquet.schema_arrow.names
+        line = 0
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            rows = batch.to_pylist()
+            yield columns, list(enumerate(rows, start=line + 1))
+            line += len(rows)
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        columns = [c.strip() for c in (reader.fieldnames or [])]
+        reader.fieldnames = columns
+        chunk = []
+        for line, raw in enumerate(reader, start=2):
+            chunk.append((line, raw))
+            if len(chunk) >= chunk_size:
+                yield columns, chunk
+                chunk = []
+        if chunk:
+            yield columns, chunk
+
+
+# ---------- Writers ----------
+
+def _upsert(conn: Connection, table, rows: list, key: tuple):
+    """executemany INSERT .. ON CONFLICT (key) DO UPDATE of rows."""
+    dialect = conn.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        updates = {c: stmt.excluded[c] for c in rows[0] if c not in key}
+        stmt = stmt.on_conflict_do_update(index_elements=list(key), set_=updates)
+        conn.execute(stmt, rows)
+        return
+
+    # other databases: replace the rows with the same keys
+    key_cols = [table.c[k] for k in key]
+    conn.execute(delete(table).where(tuple_(*key_cols).in_([tuple(r[k] for k in key) for r in rows])))
+    conn.execute(insert(table), rows)
+
+
+class _Lookups:
+    """Known student ids and course ids, filled as chunks need them."""
+
+    def __init__(self):
+        self.students = set()
+        self.courses = {}
+
+    def missing_students(self, conn: Connection, ids: set) -> set:
+        unknown = ids - self.students
+        if unknown:
+            self.students.update(conn.execute(
+                select(Student.student_id).where(Student.student_id.in_(unknown))
+            ).scalars())
+        return ids - self.students
+
+    def course_ids(self, conn: Connection, rows: list) -> dict:
+        """code -> id; creates courses that come with a course_name."""
+        names = {}
+        for row in rows:
+            if row["course_code"] not in self.courses and row["course_code"] not in names:
+                names[row["course_code"]] = row["course_name"]
+        if names:
+            self.courses.update(conn.execute(
+                select(Course.code, Course.id).where(Course.code.in_(names))
+            ).all())
+            new = [
+                {"code": code, "name": name}
+                for code, name in names.items()
+                if code not in self.courses and name
+            ]
+            if new:
+                conn.execute(insert(Course.__table__), new)
+                self.courses.update(conn.execute(
+                    select(Course.code, Course.id).where(Course.code.in_([c["code"] for c in new]))
+                ).all())
+        return self.courses
+
+
+def _link_topics(conn: Connection, rows: list):
+    """Replace the topic links of the upserted mark rows."""
+    keys = [(r["student_id"], r["course_code"], r["exam_type"]) for r in rows]
+    mark_ids = {
+        (sid, code, exam): mark_id
+        for mark_id, sid, code, exam in conn.execute(
+            select(Mark.id, Mark.student_id, Mark.course_code, Mark.exam_type)
+            .where(tuple_(Mark.student_id, Mark.course_code, Mark.exam_type).in_(keys))
+        )
+    }
+    conn.execute(delete(mark_topics).where(mark_topics.c.mark_id.in_(list(mark_ids.values()))))
+
+    wanted = {}
+    for r in rows:
+        names = []
+        for name in r["topics"].split(","):
+            name = name.strip()
+            if name and name not in names:
+                names.append(name)
+        wanted[mark_ids[(r["student_id"], r["course_code"], r["exam_type"])]] = names
+
+    all_names = {n for names in wanted.values() for n in names}
+    if not all_names:
+        return
+    topic_ids = dict(conn.execute(
+        select(Topic.name, Topic.id).where(Topic.name.in_(all_names))
+    ).all())
+    new = [{"name": n} for n in all_names if n not in topic_ids]
+    if new:
+        conn.execute(insert(Topic.__table__), new)
+        topic_ids.update(conn.execute(
+            select(Topic.name, Topic.id).where(Topic.name.in_([n["name"] for n in new]))
+        ).all())
+
+    links = [
+        {"mark_id": mark_id, "topic_id": topic_ids[name]}
+        for mark_id, names in wanted.items()
+        for name in names
+    ]
+    if links:
+        conn.execute(insert(mark_topics), links)
+
+
+def _write_chunk(conn: Connection, kind: str, rows: list, lookups: _Lookups, reject):
+    """Upsert one validated chunk; returns the rows written."""
+    table, key, _required, _validate = KINDS[kind]
+
+    # last row wins for keys repeated inside the chunk (one statement can't
+    # update the same row twice on PostgreSQL)
+    rows = list({tuple(r[k] for k in key): r for r in rows}.values())
+
+    if kind != "students":
+        unknown = lookups.missing_students(conn, {r["student_id"] for r in rows})
+        if unknown:
+            for r in rows:
+                if r["student_id"] in unknown:
+                    reject(r["_line"], r, f"unknown student_id {r['student_id']}")
+            rows = [r for r in rows if r["student_id"] not in unknown]
+
+    if kind in ("attendance", "marks"):
+        courses = lookups.course_ids(conn, rows)
+        for r in rows:
+            if r["course_code"] not in courses:
+                reject(r["_line"], r, f"unknown course_code {r['course_code']} (add course_name)")
+        rows = [r for r in rows if r["course_code"] in courses]
+        for r in rows:
+            r["course_id"] = courses[r["course_code"]]
+
+    if not rows:
+        return []
+
+    columns = [c.name for c in table.columns if c.name != "id"]
+    _upsert(conn, table, [{c: r[c] for c in columns if c in r} for r in rows], key)
+    if kind == "marks":
+        _link_topics(conn, rows)
+    if kind == "students":
+        lookups.students.update(r["student_id"] for r in rows)
+    return rows
+
+
+def ingest_file(
+    kind: str,
+    path: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = 5000,
+    commit_every: int = 10,
+    engine=None,
+    rejects_path: Optional[str] = None,
+    progress=print,
+) -> dict:
+    """
+    Stream `path` into the `kind` table.
+
+    Returns {"read", "written", "rejected", "seconds", "rows_per_second",
+    "students_refreshed"}.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"unknown kind {kind!r}; expected one of {', '.join(KINDS)}")
+    engine = engine or default_engine
+    _table, _key, required, validate = KINDS[kind]
+    rejects_path = rejects_path or path + ".rejects.csv"
+
+    stats = {"read": 0, "written": 0, "rejected": 0, "students_refreshed": 0}
+    lookups = _Lookups()
+    start = time.perf_counter()
+    rejects_file = None
+    rejects_writer = None
+
+    def reject(line, raw, reason):
+        nonlocal rejects_file, rejects_writer
+        if rejects_writer is None:
+            rejects_file = open(rejects_path, "w", newline="", encoding="utf-8")
+            rejects_writer = csv.writer(rejects_file)
+            rejects_writer.writerow(["line", "error", "row"])
+        row = {k: v for k, v in raw.items() if k != "_line"}
+        rejects_writer.writerow([line, reason, row])
+        stats["rejected"] += 1
+
+    def rate():
+        elapsed = time.perf_counter() - start
+        return elapsed, (stats["read"] / elapsed if elapsed > 0 else 0.0)
+
+    chunks = read_chunks(path, chunk_size, fmt)
+    try:
+        finished = False
+        while not finished:
+            # one transaction per `commit_every` chunks
+            with engine.begin() as conn:
+                touched = set()
+                read_before = stats["read"]
+                for _ in range(commit_every):
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        finished = True
+                        break
+                    columns, raw_rows = chunk
+                    missing = [c for c in required if c not in columns]
+                    if missing:
+                        raise SystemExit(f"❌ {path} is missing column(s): {', '.join(missing)}")
+
+                    valid = []
+                    for line, raw in raw_rows:
+                        try:
+                            row = validate(raw)
+                        except ValueError as exc:
+                            reject(line, raw, str(exc))
+                            continue
+                        row["_line"] = line
+                        valid.append(row)
+                    stats["read"] += len(raw_rows)
+
+                    written = _write_chunk(conn, kind, valid, lookups, reject)
+                    stats["written"] += len(written)
+                    touched.update(r["student_id"] for r in written)
+
+                if touched:
+                    # bulk writes bypass the ORM flush hooks: refresh here, same transaction
+                    session = Session(bind=conn)
+                    try:
+                        refresh_student_analytics(session, touched)
+                    finally:
+                        session.close()
+                    stats["students_refreshed"] += len(touched)
+            if stats["read"] > read_before:
+                progress(
+                    f"⏳ {stats['read']:,} rows read, {stats['written']:,} written, "
+                    f"{stats['rejected']:,} rejected · {rate()[1]:,.0f} rows/s"
+                )
+    finally:
+        if rejects_file is not None:
+            rejects_file.close()
+
+    if stats["written"]:
+        # real data now: the app must not seed demo rows on top of it
+        with engine.begin() as conn:
+            mark_seeded(conn)
+
+    stats["seconds"], stats["rows_per_second"] = rate()
+    return stats
+
+
+def main():
+    from backend.crud import init_db
+
+    parser = argparse.ArgumentParser(description="Bulk-load registrar exports (CSV or Parquet).")
+    parser.add_argument("kind", choices=sorted(KINDS), help="table to load")
+    parser.add_argument("path", help="CSV or Parquet file")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None,
+                        help="file format (default: from the extension)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per executemany batch")
+    parser.add_argument("--commit-every", type=int, default=10, help="chunks per transaction")
+    parser.add_argument("--rejects", default=None, help="where to write rejected rows (default: <path>.rejects.csv)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        raise SystemExit(f"❌ File not found: {args.path}")
+
+    init_db()
+    print(f"📥 Loading {args.kind} from {args.path}...")
+    stats = ingest_file(
+        args.kind,
+        args.path,
+        fmt=args.format,
+        chunk_size=args.chunk_size,
+        commit_every=args.commit_every,
+        rejects_path=args.rejects,
+    )
+    print(
+        f"✅ Done in {stats['seconds']:.1f}s: {stats['written']:,} rows written, "
+        f"{stats['rejected']:,} rejected ({stats['rows_per_second']:,.0f} rows/s); "
+        f"analytics refreshed for {stats['students_refreshed']:,} students."
+    )
+    if stats["rejected"]:
+        print(f"⚠️ Rejected rows: {args.rejects or args.path + '.rejects.csv'}")
+
+
+if __name__ == "__main__":
+    main()
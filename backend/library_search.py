@@ -0,0 +1,287 @@
+# backend/library_search.py
+#
+# Ranked full-text search over the digital library.
+#
+#   python -m backend.library_search "dbms joins"          # search the database
+#   python -m backend.library_search --rebuild              # re-index from scratch
+#   python -m backend.library_search --benchmark 100000     # FTS5 vs substring scan
+#
+# On SQLite the library_fts FTS5 table mirrors title, course code, tag names
+# and description of every resource (rowid = library_resources.id). Triggers
+# on library_resources, library_resource_tags and tags keep it in sync inside
+# the writing transaction, so ORM writes, Core writes and other processes all
+# stay consistent without application hooks. Queries match every word (the
+# last one as a prefix, for search-as-you-type), rank with bm25 (title >
+# course code > tags > description) and paginate in SQL.
+#
+# Databases without FTS5 (PostgreSQL, SQLite builds without it) fall back to
+# LIKE matching with a weighted score, still ranked and paginated in SQL.
+
+import argparse
+import re
+import time
+from typing import List, Tuple
+
+from sqlalchemy import and_, case, exists, func, or_, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from backend.models import LibraryResource, Tag, library_resource_tags
+
+FTS_TABLE = "library_fts"
+# bm25 column weights, in FTS_TABLE column order
+_WEIGHTS = (10.0, 5.0, 4.0, 1.0)
+_MAX_WORDS = 8
+
+_TAGS_OF = (
+    "(SELECT group_concat(t.name, ' ') FROM library_resource_tags lt "
+    "JOIN tags t ON t.id = lt.tag_id WHERE lt.resource_id = {id})"
+)
+
+_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, course_code, tags, description, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+
+    "CREATE TRIGGER IF NOT EXISTS library_fts_ai AFTER INSERT ON library_resources BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, title, course_code, tags, description) VALUES "
+    f"(new.id, new.title, new.course_code, {_TAGS_OF.format(id='new.id')}, new.description); END",
+
+    "CREATE TRIGGER IF NOT EXISTS library_fts_au AFTER UPDATE ON library_resources BEGIN "
+    f"UPDATE {FTS_TABLE} SET title = new.title, course_code = new.course_code, "
+    "description = new.description WHERE rowid = old.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS library_fts_ad AFTER DELETE ON library_resources BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS library_fts_tag_ai AFTER INSERT ON library_resource_tags BEGIN "
+    f"UPDATE {FTS_TABLE} SET tags = {_TAGS_OF.format(id='new.resource_id')} "
+    "WHERE rowid = new.resource_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS library_fts_tag_ad AFTER DELETE ON library_resource_tags BEGIN "
+    f"UPDATE {FTS_TABLE} SET tags = {_TAGS_OF.format(id='old.resource_id')} "
+    "WHERE rowid = old.resource_id; END",
+
+    "CREATE TRIGGER IF NOT EXISTS library_fts_tag_au AFTER UPDATE OF name ON tags BEGIN "
+    f"UPDATE {FTS_TABLE} SET tags = {_TAGS_OF.format(id=FTS_TABLE + '.rowid')} "
+    "WHERE rowid IN (SELECT resource_id FROM library_resource_tags WHERE tag_id = new.id); END",
+]
+
+
+def fts_available(conn: Connection) -> bool:
+    """True if this is SQLite compiled with FTS5."""
+    if conn.dialect.name != "sqlite":
+        return False
+    return bool(conn.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+
+
+def _has_index(conn: Connection) -> bool:
+    if conn.dialect.name != "sqlite":
+        return False
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first() is not None
+
+
+def rebuild_index(conn: Connection):
+    """Refill FTS_TABLE from the library tables."""
+    conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    conn.execute(text(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, course_code, tags, description) "
+        f"SELECT r.id, r.title, r.course_code, {_TAGS_OF.format(id='r.id')}, r.description "
+        "FROM library_resources r"
+    ))
+    conn.execute(text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"))
+
+
+def install(conn: Connection) -> bool:
+    """
+    Create the FTS table and its triggers (idempotent) and index existing
+    resources. Returns False where FTS5 isn't available; search then uses
+    the LIKE fallback.
+    """
+    if not fts_available(conn):
+        return False
+    created = not _has_index(conn)
+    for ddl in _DDL:
+        conn.execute(text(ddl))
+    if created:
+        rebuild_index(conn)
+    return True
+
+
+def _words(query: str) -> List[str]:
+    return re.findall(r"\w+", (query or "").lower())[:_MAX_WORDS]
+
+
+def _fts_search(session: Session, words, limit, offset) -> Tuple[list, int]:
+    # search-as-you-type: earlier words are whole terms, the last one a
+    # prefix (implicit AND); quoting keeps user input from being read as
+    # FTS syntax
+    match = " ".join(f'"{w}"' for w in words[:-1]) + f' "{words[-1]}"*'
+    total = session.execute(
+        text(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"),
+        {"match": match},
+    ).scalar()
+    # every match is ranked; ties go to the newest resource
+    ids = session.execute(
+        text(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+            f" ORDER BY bm25({FTS_TABLE}, {', '.join(map(str, _WEIGHTS))}), rowid DESC"
+            " LIMIT :limit OFFSET :offset"
+        ),
+        {"match": match, "limit": limit, "offset": offset},
+    ).scalars().all()
+    return ids, total
+
+
+def _like_search(session: Session, words, limit, offset) -> Tuple[list, int]:
+    r = LibraryResource
+    conditions, score = [], []
+    for word in words:
+        pattern = f"%{word}%"
+        tag_hit = exists().where(
+            library_resource_tags.c.resource_id == r.id,
+            library_resource_tags.c.tag_id == Tag.id,
+            func.lower(Tag.name).like(pattern),
+        )
+        fields = [
+            (func.lower(r.title).like(pattern), _WEIGHTS[0]),
+            (func.lower(func.coalesce(r.course_code, "")).like(pattern), _WEIGHTS[1]),
+            (tag_hit, _WEIGHTS[2]),
+            (func.lower(func.coalesce(r.description, "")).like(pattern), _WEIGHTS[3]),
+        ]
+        conditions.append(or_(*(hit for hit, _w in fields)))
+        score.extend(case((hit, weight), else_=0.0) for hit, weight in fields)
+
+    where = and_(*conditions)
+    total = session.scalar(select(func.count()).select_from(r).where(where))
+    ids = session.scalars(
+        select(r.id).where(where)
+        .order_by(sum(score[1:], score[0]).desc(), r.id)
+        .limit(limit).offset(offset)
+    ).all()
+    return ids, total
+
+
+def search_library(session: Session, query: str, limit: int = 10, offset: int = 0) -> Tuple[list, int]:
+    """
+    Resources matching every word of `query` (the last one as a prefix), best first.
+    Returns (one page of LibraryResource objects, total number of matches).
+    """
+    words = _words(query)
+    if not words:
+        return [], 0
+    if _has_index(session.connection()):
+        ids, total = _fts_search(session, words, limit, offset)
+    else:
+        ids, total = _like_search(session, words, limit, offset)
+    if not ids:
+        return [], total
+    by_id = {
+        res.id: res
+        for res in session.scalars(select(LibraryResource).where(LibraryResource.id.in_(ids)))
+    }
+    return [by_id[i] for i in ids if i in by_id], total
+
+
+# ---------- CLI / benchmark ----------
+
+def _benchmark(n: int, queries, repeat: int = 20):
+    """Time FTS5 search against the old per-rerun substring scan over n synthetic resources."""
+    import os
+    import random
+    import tempfile
+
+    from sqlalchemy import insert
+    from sqlalchemy.orm import sessionmaker
+
+    from backend.database import Base, make_engine
+
+    words = ("sql joins indexing normalization deadlock scheduling threads paging trees graphs "
+             "hashing sorting recursion transactions locking memory virtual kernel heaps queues").split()
+    codes = ["DBMS", "OS", "DSA", "CN", "ML"]
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_engine = make_engine("sqlite:///" + os.path.join(tmp, "library_bench.db"))
+        with bench_engine.begin() as conn:
+            Base.metadata.create_all(conn, tables=[
+                LibraryResource.__table__, Tag.__table__, library_resource_tags,
+            ])
+            install(conn)
+            conn.execute(insert(Tag.__table__), [{"name": w} for w in words])
+            rows, links = [], []
+            for i in range(1, n + 1):
+                picked = rng.sample(words, 6)
+                rows.append({
+                    "id": i,
+                    "title": f"{rng.choice(codes)} {picked[0]} {picked[1]} notes {i}",
+                    "type": "PDF",
+                    "url": f"https://example.com/{i}",
+                    "course_code": rng.choice(codes),
+                    "description": " ".join(rng.sample(words, 10)),
+                })
+                links += [{"resource_id": i, "tag_id": words.index(w) + 1} for w in picked[2:4]]
+            conn.execute(insert(LibraryResource.__table__), rows)
+            conn.execute(insert(library_resource_tags), links)
+
+        session = sessionmaker(bind=bench_engine)()
+        plain = [
+            (r.title, r.course_code, r.tags, r.description)
+            for r in session.scalars(select(LibraryResource))
+        ]
+        print(f"{'query':<22} {'matches':>8} {'FTS5 ms':>9} {'scan ms':>9}")
+        for q in queries:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                _page, total = search_library(session, q)
+            fts_ms = (time.perf_counter() - start) / repeat * 1000
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                needle = q.lower()
+                [p for p in plain if any(needle in (f or "").lower() for f in p)]
+            scan_ms = (time.perf_counter() - start) / repeat * 1000
+            print(f"{q:<22} {total:>8} {fts_ms:>9.2f} {scan_ms:>9.2f}")
+        session.close()
+        bench_engine.dispose()
+
+
+def main():
+    from backend.database import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Search the digital library or rebuild its index.")
+    parser.add_argument("query", nargs="?", default="", help="search text")
+    parser.add_argument("--rebuild", action="store_true", help="re-index every resource")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="benchmark on N synthetic resources")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        _benchmark(args.benchmark, ["sql", "dbms join", "dead", "kernel memory paging", "os thr"])
+        return
+
+    if args.rebuild:
+        with engine.begin() as conn:
+            if not install(conn):
+                print("⚠️ FTS5 is not available on this database; search uses LIKE matching.")
+                return
+            rebuild_index(conn)
+        print("✅ Library search index rebuilt.")
+        return
+
+    session = SessionLocal()
+    try:
+        start = time.perf_counter()
+        page, total = search_library(session, args.query)
+        ms = (time.perf_counter() - start) * 1000
+        print(f"🔎 {total} match(es) in {ms:.1f} ms")
+        for r in page:
+            print(f"- [{r.course_code or 'N/A'}] {r.title} ({r.type}) · {r.tags}")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+# backend/migrations.py
+#
+# Schema migrations for existing databases.
+#
+#   python -m backend.migrations            # upgrade to the latest version
+#   python -m backend.migrations --status   # print current / latest version
+#
+# A new database is created straight from the models and stamped with
+# SCHEMA_VERSION. An existing one is read from the schema_version row
+# (databases from before this module have no row: version 0) and every newer
+# migration is applied in order. Migrations only use portable SQL plus
+# table rebuilds, so they run on SQLite and PostgreSQL alike.
+
+import argparse
+from datetime import datetime
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Connection
+
+from backend import library_search
+from backend.database import Base, engine as default_engine
+from backend.models import (
+    Attendance,
+    AttendanceEvent,
+    Course,
+    Event,
+    LibraryResource,
+    Mark,
+    Result,
+    SchemaVersion,
+    StudentAnalytics,
+    Tag,
+    Topic,
+    event_tags,
+    library_resource_tags,
+    mark_topics,
+)
+
+SCHEMA_VERSION = 4
+
+
+def _split_names(value) -> list:
+    seen = []
+    for name in (value or "").split(","):
+        name = name.strip()
+        if name and name not in seen:
+            seen.append(name)
+    return seen
+
+
+def _rebuild(conn: Connection, table, columns: str, select_sql: str, before_drop=None):
+    """
+    Recreate `table` from its current model definition and copy the rows
+    over with `INSERT INTO table (columns) select_sql`, where select_sql
+    reads from "_old_<table>". SQLite can't add foreign keys or drop
+    columns in place, so this is the portable way to reshape a table.
+    """
+    name = table.name
+    old = f"_old_{name}"
+    postgres = conn.dialect.name == "postgresql"
+
+    # index names are schema-wide: free them for the new table
+    for index in inspect(conn).get_indexes(name):
+        conn.execute(text(f'DROP INDEX "{index["name"]}"'))
+    conn.execute(text(f'ALTER TABLE "{name}" RENAME TO "{old}"'))
+    if postgres:
+        conn.execute(text(f'ALTER INDEX IF EXISTS "{name}_pkey" RENAME TO "{old}_pkey"'))
+        conn.execute(text(f'ALTER SEQUENCE IF EXISTS "{name}_id_seq" RENAME TO "{old}_id_seq"'))
+
+    table.create(conn)
+    conn.execute(text(f'INSERT INTO "{name}" ({columns}) {select_sql}'))
+    if before_drop is not None:
+        before_drop(conn, old)
+    conn.execute(text(f'DROP TABLE "{old}"'))
+
+    if postgres:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+            f'COALESCE((SELECT MAX(id) FROM "{name}"), 0) + 1, false)'
+        ))
+
+
+def _link_names(conn: Connection, rows, name_table, link_table, owner_col: str, name_col: str):
+    """
+    Create link_table and insert (owner_id, name_id) rows for the
+    comma-separated names. Runs after the owner table was rebuilt, so the
+    new foreign key points at the new table.
+    """
+    link_table.create(conn)
+    ids = dict(conn.execute(select(name_table.c.name, name_table.c.id)).all())
+    links = []
+    for owner_id, value in rows:
+        for name in _split_names(value):
+            if name not in ids:
+                ids[name] = conn.execute(
+                    name_table.insert().values(name=name).returning(name_table.c.id)
+                ).scalar_one()
+            links.append({owner_col: owner_id, name_col: ids[name]})
+    if links:
+        conn.execute(link_table.insert(), links)
+
+
+class MigrationError(RuntimeError):
+    """A migration found rows it can't convert; nothing was changed."""
+
+    def __init__(self, version: int, problems: list):
+        self.version = version
+        self.problems = problems
+        super().__init__(
+            f"migration {version} stopped, fix these rows and run it again:\n"
+            + "\n".join(f"- {p}" for p in problems)
+        )
+
+
+_ORPHAN = (
+    "student_id IS NULL OR student_id NOT IN "
+    "(SELECT student_id FROM students WHERE student_id IS NOT NULL)"
+)
+# (table, columns that become a unique key in migration 1)
+_UNIQUE_KEYS_1 = (
+    ("attendance", "student_id, course_code"),
+    ("marks", "student_id, course_code, exam_type"),
+    ("results", "student_id, semester"),
+)
+
+
+def _conflicts_1(conn: Connection, tables) -> list:
+    """Human-readable descriptions of rows the migration-1 constraints would reject."""
+    problems = []
+    for name, key in _UNIQUE_KEYS_1:
+        if name not in tables:
+            continue
+        orphans = conn.execute(text(f"SELECT id, student_id FROM {name} WHERE {_ORPHAN} ORDER BY id")).all()
+        if orphans:
+            sample = ", ".join(f"id {i} (student {sid!r})" for i, sid in orphans[:5])
+            problems.append(f"{name}: {len(orphans)} row(s) for unknown students: {sample}")
+        duplicates = conn.execute(text(
+            f"SELECT {key}, COUNT(*) AS n FROM {name} GROUP BY {key} HAVING COUNT(*) > 1 ORDER BY {key}"
+        )).all()
+        if duplicates:
+            sample = "; ".join(
+                f"({', '.join(repr(v) for v in row[:-1])}) x{row[-1]}" for row in duplicates[:5]
+            )
+            problems.append(f"{name}: {len(duplicates)} duplicate ({key}) key(s): {sample}")
+    return problems
+
+
+def _migrate_1(conn: Connection):
+    """
+    Normalize the original schema:
+    - courses table; attendance / marks get an integer course_id and lose course_name
+    - foreign keys from attendance / marks / results / student_analytics to students
+    - unique composite indexes (student_id, course_code[, exam_type]) and
+      (student_id, semester)
+    - topics / tags join tables instead of comma-separated strings
+    Rows the new constraints would reject (unknown students, duplicate
+    keys) are never deleted: the migration stops with a report of them
+    instead, so they can be fixed by hand and the upgrade re-run.
+    """
+    tables = set(inspect(conn).get_table_names())
+    problems = _conflicts_1(conn, tables)
+    if problems:
+        raise MigrationError(1, problems)
+
+    Base.metadata.create_all(conn, tables=[
+        Course.__table__, Tag.__table__, Topic.__table__, SchemaVersion.__table__,
+    ])
+
+    conn.execute(text(
+        "INSERT INTO courses (code, name) "
+        "SELECT course_code, MIN(course_name) FROM ("
+        " SELECT course_code, course_name FROM attendance"
+        " UNION ALL SELECT course_code, course_name FROM marks"
+        ") AS c GROUP BY course_code"
+    ))
+
+    if "student_analytics" in tables:
+        # derived snapshots, recomputed on demand: stale ones can go
+        conn.execute(text(f"DELETE FROM student_analytics WHERE {_ORPHAN}"))
+
+    _rebuild(
+        conn, Attendance.__table__,
+        "id, student_id, course_id, course_code, total_classes, attended, threshold",
+        "SELECT o.id, o.student_id, c.id, o.course_code, o.total_classes, o.attended, o.threshold "
+        "FROM _old_attendance o JOIN courses c ON c.code = o.course_code",
+    )
+
+    _rebuild(
+        conn, Mark.__table__,
+        "id, student_id, course_id, course_code, exam_type, score, max_score",
+        "SELECT o.id, o.student_id, c.id, o.course_code, o.exam_type, o.score, o.max_score "
+        "FROM _old_marks o JOIN courses c ON c.code = o.course_code",
+        before_drop=lambda c, old: _link_names(
+            c, c.execute(text(f"SELECT id, topic_tags FROM {old}")).all(),
+            Topic.__table__, mark_topics, "mark_id", "topic_id",
+        ),
+    )
+
+    _rebuild(
+        conn, Result.__table__,
+        "id, student_id, semester, sgpa, cgpa",
+        "SELECT id, student_id, semester, sgpa, cgpa FROM _old_results",
+    )
+
+    if "student_analytics" in tables:
+        columns = (
+            "id, student_id, total_subjects, avg_attendance, latest_cgpa, "
+            "attendance_summary, course_averages, weak_course_codes, updated_at"
+        )
+        _rebuild(conn, StudentAnalytics.__table__, columns, f"SELECT {columns} FROM _old_student_analytics")
+
+    _rebuild(
+        conn, LibraryResource.__table__,
+        "id, title, type, url, course_code, description",
+        "SELECT id, title, type, url, course_code, description FROM _old_library_resources",
+        before_drop=lambda c, old: _link_names(
+            c, c.execute(text(f"SELECT id, tags FROM {old}")).all(),
+            Tag.__table__, library_resource_tags, "resource_id", "tag_id",
+        ),
+    )
+
+    _rebuild(
+        conn, Event.__table__,
+        "id, title, date, category, location, description, recommended_for",
+        "SELECT id, title, date, category, location, description, recommended_for FROM _old_events",
+        before_drop=lambda c, old: _link_names(
+            c, c.execute(text(f"SELECT id, tags FROM {old}")).all(),
+            Tag.__table__, event_tags, "event_id", "tag_id",
+        ),
+    )
+
+
+def _migrate_2(conn: Connection):
+    """Per-class attendance log; existing counters stay as they are."""
+    AttendanceEvent.__table__.create(conn, checkfirst=True)
+
+
+def _migrate_3(conn: Connection):
+    """Full-text index of the library (SQLite with FTS5 only; a no-op elsewhere)."""
+    library_search.install(conn)
+
+
+def _migrate_4(conn: Connection):
+    """
+    mark_topics gets an autoincrement id so topics are listed in the order
+    they were given; existing links are numbered in their stored order.
+    """
+    order = "rowid" if conn.dialect.name == "sqlite" else "mark_id, topic_id"
+    _rebuild(
+        conn, mark_topics,
+        "mark_id, topic_id",
+        f"SELECT mark_id, topic_id FROM _old_mark_topics ORDER BY {order}",
+    )
+
+
+# (version, description, function); append new migrations at the end
+MIGRATIONS = [
+    (1, "courses, foreign keys, composite indexes, tag/topic join tables", _migrate_1),
+    (2, "attendance_events log", _migrate_2),
+    (3, "library full-text search index", _migrate_3),
+    (4, "ordered mark topics", _migrate_4),
+]
+
+
+def current_version(conn: Connection):
+    """Schema version of the database, 0 for a pre-migrations database, None if empty."""
+    tables = set(inspect(conn).get_table_names())
+    if "schema_version" in tables:
+        version = conn.execute(select(SchemaVersion.version).where(SchemaVersion.id == 1)).scalar()
+        if version is not None:
+            return version
+    return 0 if "students" in tables else None
+
+
+def _stamp(conn: Connection, version: int, seed_version=None):
+    table = SchemaVersion.__table__
+    values = {"version": version, "updated_at": datetime.now()}
+    if seed_version is not None:
+        values["seed_version"] = seed_version
+    if conn.execute(select(table.c.id).where(table.c.id == 1)).first() is None:
+        values.setdefault("seed_version", 0)
+        conn.execute(table.insert().values(id=1, **values))
+    else:
+        conn.execute(table.update().where(table.c.id == 1).values(**values))
+
+
+def upgrade(engine=None, progress=None) -> list:
+    """
+    Create or migrate the schema to SCHEMA_VERSION.
+    Returns the (version, description) pairs that were applied.
+    """
+    engine = engine or default_engine
+    applied = []
+    with engine.begin() as conn:
+        version = current_version(conn)
+        if version is None:
+            Base.metadata.create_all(conn)
+            library_search.install(conn)
+            _stamp(conn, SCHEMA_VERSION, seed_version=0)
+            return applied
+
+        for target, description, migrate in MIGRATIONS:
+            if target <= version:
+                continue
+            if progress:
+                progress(f"Applying migration {target}: {description}")
+            if conn.dialect.name == "sqlite":
+                # table rebuilds: no FK checks mid-way, and renaming a table
+                # must not rewrite other tables' references to it
+                conn.execute(text("PRAGMA foreign_keys=OFF"))
+                conn.execute(text("PRAGMA legacy_alter_table=ON"))
+            migrate(conn)
+            # a database that already had students was seeded (or loaded) before
+            seeded = 1 if version == 0 and conn.execute(text("SELECT 1 FROM students LIMIT 1")).first() else None
+            _stamp(conn, target, seed_version=seeded)
+            applied.append((target, description))
+            version = target
+
+        # tables added to the models without data changes
+        Base.metadata.create_all(conn)
+
+    if applied and engine.dialect.name == "sqlite":
+        # the migration connection had its pragmas changed; open fresh ones
+        engine.dispose()
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or upgrade the dashboard database schema.")
+    parser.add_argument("--status", action="store_true", help="only print the schema version")
+    args = parser.parse_args()
+
+    if args.status:
+        with default_engine.connect() as conn:
+            version = current_version(conn)
+        print(f"📦 Schema version: {version if version is not None else 'empty database'} "
+              f"(latest {SCHEMA_VERSION})")
+        return
+
+    try:
+        applied = upgrade(progress=lambda msg: print(f"⏳ {msg}"))
+    except MigrationError as exc:
+        raise SystemExit(f"❌ {exc}")
+    if applied:
+        print(f"✅ Migrated to schema version {applied[-1][0]}.")
+    else:
+        print(f"✅ Schema is up to date (version {SCHEMA_VERSION}).")
+
+
+if __name__ == "__main__":
+    main()
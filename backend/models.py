@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Boolean, Column, Date, Integer, String, Float, JSON, DateTime, ForeignKey, Index, Table
+from sqlalchemy.orm import relationship
+
 from .database import Base
 
 
@@ -14,39 +16,158 @@ class Student(Base):
     section = Column(String, nullable=False)
 
 
+class Course(Base):
+    __tablename__ = "courses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String, unique=True, index=True, nullable=False)  # DBMS, OS, DSA
+    name = Column(String, nullable=False)
+
+
+class Tag(Base):
+    """Library / event tag, e.g. "sql", "workshop"."""
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+
+
+class Topic(Base):
+    """Syllabus topic covered by an exam, e.g. "Normalization"."""
+    __tablename__ = "topics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+
+
+# Join tables; the second column is indexed for "everything with tag X" lookups
+mark_topics = Table(
+    "mark_topics",
+    Base.metadata,
+    # increases with every link, so topics keep the order they were given in
+    Column("id", Integer, primary_key=True),
+    Column("mark_id", Integer, ForeignKey("marks.id", ondelete="CASCADE"), nullable=False),
+    Column("topic_id", Integer, ForeignKey("topics.id", ondelete="CASCADE"), nullable=False, index=True),
+    Index("ux_mark_topics_mark_topic", "mark_id", "topic_id", unique=True),
+)
+
+library_resource_tags = Table(
+    "library_resource_tags",
+    Base.metadata,
+    Column("resource_id", Integer, ForeignKey("library_resources.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+event_tags = Table(
+    "event_tags",
+    Base.metadata,
+    Column("event_id", Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+
+def _joined_names(items) -> str:
+    return ",".join(item.name for item in items)
+
+
 class Attendance(Base):
     __tablename__ = "attendance"
 
     id = Column(Integer, primary_key=True, index=True)
-    # foreign key-ish, but we’ll keep it simple: just store student_id as string
-    student_id = Column(String, index=True, nullable=False)
+    student_id = Column(String, ForeignKey("students.student_id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
+    # copy of courses.code: the natural key every query and the UI filter on
     course_code = Column(String, nullable=False)
-    course_name = Column(String, nullable=False)
     total_classes = Column(Integer, nullable=False)
     attended = Column(Integer, nullable=False)
     threshold = Column(Integer, nullable=False)  # in percentage
 
+    student = relationship(Student)
+    course = relationship(Course, lazy="joined", innerjoin=True)
+
+    # one row per student and course; also serves per-student lookups
+    __table_args__ = (
+        Index("ux_attendance_student_course", "student_id", "course_code", unique=True),
+    )
+
+    @property
+    def course_name(self) -> str:
+        return self.course.name
+
+
+class AttendanceEvent(Base):
+    """
+    One student at one class session. The Attendance counters are updated
+    in the same transaction as every event (crud.record_attendance,
+    crud.mark_section_attendance), so reads never aggregate this table.
+    """
+    __tablename__ = "attendance_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(String, ForeignKey("students.student_id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    course_code = Column(String, nullable=False)  # copy of courses.code
+    class_date = Column(Date, nullable=False)
+    period = Column(Integer, nullable=False, default=1)  # n-th class of the course that day
+    present = Column(Boolean, nullable=False)
+    recorded_at = Column(DateTime, nullable=False)
+
+    student = relationship(Student)
+    course = relationship(Course)
+
+    __table_args__ = (
+        # one event per student and class session; course first for "who was in this class"
+        Index("ux_attendance_events_session", "course_code", "class_date", "period", "student_id", unique=True),
+        Index("ix_attendance_events_student", "student_id", "course_code", "class_date"),
+    )
+
 
 class Mark(Base):
     __tablename__ = "marks"
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(String, index=True, nullable=False)
-    course_code = Column(String, nullable=False)
-    course_name = Column(String, nullable=False)
+    student_id = Column(String, ForeignKey("students.student_id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
+    course_code = Column(String, nullable=False)  # copy of courses.code
     exam_type = Column(String, nullable=False)  # Mid-1, Mid-2, Assignment, etc.
     score = Column(Integer, nullable=False)
     max_score = Column(Integer, nullable=False)
-    topic_tags = Column(String, nullable=True)  # comma-separated topics
+
+    student = relationship(Student)
+    course = relationship(Course, lazy="joined", innerjoin=True)
+    topic_list = relationship(Topic, secondary=mark_topics, lazy="selectin", order_by=mark_topics.c.id)
+
+    __table_args__ = (
+        Index("ux_marks_student_course_exam", "student_id", "course_code", "exam_type", unique=True),
+        # admin aggregates partition marks by course and exam
+        Index("ix_marks_course_exam", "course_code", "exam_type"),
+    )
+
+    @property
+    def course_name(self) -> str:
+        return self.course.name
+
+    @property
+    def topic_tags(self) -> str:
+        """Comma-separated topic names, for display and prompts."""
+        return _joined_names(self.topic_list)
+
+
 class Result(Base):
     __tablename__ = "results"
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(String, index=True, nullable=False)
+    student_id = Column(String, ForeignKey("students.student_id"), nullable=False)
     semester = Column(Integer, nullable=False)
     sgpa = Column(Float, nullable=False)
     cgpa = Column(Float, nullable=False)
 
+    student = relationship(Student)
+
+    __table_args__ = (
+        Index("ux_results_student_semester", "student_id", "semester", unique=True),
+    )
+
 
 class LibraryResource(Base):
     __tablename__ = "library_resources"
@@ -55,10 +176,15 @@ class LibraryResource(Base):
     title = Column(String, nullable=False)
     type = Column(String, nullable=False)  # PDF, YouTube, Notes, etc.
     url = Column(String, nullable=False)
-    course_code = Column(String, nullable=True)  # DBMS, OS, DSA
-    tags = Column(String, nullable=True)        # comma-separated
+    course_code = Column(String, nullable=True, index=True)  # DBMS, OS, DSA
     description = Column(String, nullable=True)
 
+    tag_list = relationship(Tag, secondary=library_resource_tags, lazy="selectin", order_by=Tag.name)
+
+    @property
+    def tags(self) -> str:
+        return _joined_names(self.tag_list)
+
 
 class Event(Base):
     __tablename__ = "events"
@@ -70,4 +196,45 @@ class Event(Base):
     location = Column(String, nullable=True)
     description = Column(String, nullable=True)
     recommended_for = Column(String, nullable=True)  # e.g. "low DBMS", "AI/ML"
-    tags = Column(String, nullable=True)             # comma-separated
+
+    tag_list = relationship(Tag, secondary=event_tags, lazy="selectin", order_by=Tag.name)
+
+    @property
+    def tags(self) -> str:
+        return _joined_names(self.tag_list)
+
+
+class StudentAnalytics(Base):
+    """
+    Precomputed per-student numbers shown on every page and used in prompts.
+    Kept up to date by backend.analytics.snapshot whenever the student's
+    attendance, marks or results change.
+    """
+    __tablename__ = "student_analytics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(String, ForeignKey("students.student_id"), unique=True, index=True, nullable=False)
+    total_subjects = Column(Integer, nullable=False, default=0)
+    avg_attendance = Column(Float, nullable=True)   # mean attendance % over courses
+    latest_cgpa = Column(Float, nullable=True)
+    # [{course_code, course_name, attended, total_classes, threshold, pct, needed}, ...]
+    attendance_summary = Column(JSON, nullable=False, default=list)
+    # [[course_code, course_name, avg_pct], ...] sorted weakest first
+    course_averages = Column(JSON, nullable=False, default=list)
+    weak_course_codes = Column(String, nullable=True)  # comma-separated, avg < 60%
+    updated_at = Column(DateTime, nullable=False)
+
+    student = relationship(Student)
+
+
+class SchemaVersion(Base):
+    """
+    Single row (id=1): schema version applied by backend.migrations and
+    the demo seed version applied by ensure_seed_data.
+    """
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    seed_version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
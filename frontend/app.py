@@ -1,5 +1,7 @@
 import sys
 import os
+import logging
+import time
 
 # Make project root importable so we can import backend + frontend packages
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -7,17 +9,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import streamlit as st
 from streamlit_option_menu import option_menu  # sidebar nav
 
-from backend.database import SessionLocal
+from backend.database import ReadSessionLocal
 from backend.crud import (
-    init_db,
-    ensure_seed_data,
     get_student_by_student_id,
-    get_attendance_for_student,
-    get_marks_for_student,
-    get_results_for_student,
-    get_all_library_resources,
-    get_all_events,
+    load_student_bundle,
 )
+from frontend.cache import get_catalog, get_engine
 
 from frontend.components.layout import (
     show_profile_page,
@@ -26,12 +23,56 @@ from frontend.components.layout import (
     show_marks_page,
     show_insights_page,
     show_mentor_page,
+    show_admin_page,
 )
 
+logger = logging.getLogger(__name__)
+
+# the cohort dashboard exists only when both are set; there is no default account
+ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "")
+ADMIN_ENABLED = bool(ADMIN_USERNAME and ADMIN_PASSWORD)
+
+
+# What each page reads. "student" = student + analytics snapshot (which
+# also holds the attendance summary); "catalog" = library resources + events.
+PAGE_DATA = {
+    "Profile":    {"student"},
+    "Dashboard":  {"student", "marks"},
+    "Attendance": {"student"},
+    "Marks":      {"student", "marks"},
+    "Insights":   {"student", "results", "catalog"},
+    "AI Mentor":  set(),
+}
 
 
 def get_db_session():
-    return SessionLocal()
+    # pages only read; writes (schema, seed, snapshots) happen in get_engine()
+    return ReadSessionLocal()
+
+
+def _load_page_data(db, student_id, needs):
+    data = {}
+    if "student" in needs:
+        data["bundle"] = load_student_bundle(
+            db,
+            student_id,
+            marks="marks" in needs,
+            results="results" in needs,
+        )
+    if "catalog" in needs:
+        data["catalog"] = get_catalog()
+    return data
+
+
+def _record_load_time(page, seconds):
+    """Keep per-page data-load timings for this browser session and log them."""
+    timings = st.session_state.setdefault("page_load_timings", {})
+    entry = timings.setdefault(page, {"runs": 0, "total_ms": 0.0, "last_ms": 0.0})
+    entry["runs"] += 1
+    entry["last_ms"] = seconds * 1000
+    entry["total_ms"] += entry["last_ms"]
+    logger.info("page %s: data loaded in %.1f ms", page, entry["last_ms"])
 
 
 def main():
@@ -45,20 +86,28 @@ def main():
     if "logged_in" not in st.session_state:
         st.session_state.logged_in = False
         st.session_state.student_id = None
+        st.session_state.is_admin = False
 
+    # schema + seed run once per process, not on every rerun
+    get_engine()
     db = get_db_session()
-    init_db()
-    ensure_seed_data(db)
 
     # ---- Login Page ----
     if not st.session_state.logged_in:
         st.title("🎓 Student Login")
         st.write("Demo login: use your `student_id` as both username and password.")
+        if ADMIN_ENABLED:
+            st.write("Admins sign in with the admin account for the cohort dashboard.")
 
         student_id_input = st.text_input("Student ID", key="login_student_id")
         password_input = st.text_input("Password", type="password", key="login_password")
 
         if st.button("Login"):
+            if ADMIN_ENABLED and student_id_input == ADMIN_USERNAME and password_input == ADMIN_PASSWORD:
+                st.session_state.logged_in = True
+                st.session_state.is_admin = True
+                st.rerun()
+
             student = get_student_by_student_id(db, student_id_input)
             if student and password_input == student_id_input:
                 st.session_state.logged_in = True
@@ -71,20 +120,21 @@ def main():
         db.close()
         return
 
-    # ---- Logged-in student context ----
-    logged_in_student_id = st.session_state.student_id
-    student = get_student_by_student_id(db, logged_in_student_id)
+    # ---- Admin: cohort dashboard only ----
+    if st.session_state.get("is_admin") and ADMIN_ENABLED:
+        with st.sidebar:
+            st.markdown("**Admin**")
+            if st.button("Logout"):
+                st.session_state.logged_in = False
+                st.session_state.is_admin = False
+                st.rerun()
 
-    if not student:
-        st.error("Logged-in student not found in the database.")
+        st.title("🎓 Cohort Dashboard")
+        show_admin_page(db)
         db.close()
         return
 
-    attendance = get_attendance_for_student(db, logged_in_student_id)
-    marks = get_marks_for_student(db, logged_in_student_id)
-    results = get_results_for_student(db, logged_in_student_id)
-    library_resources = get_all_library_resources(db)
-    events = get_all_events(db)
+    logged_in_student_id = st.session_state.student_id
 
     # ---- Sidebar: navigation + logout (profile moved to its own page) ----
     with st.sidebar:
@@ -128,24 +178,42 @@ def main():
     st.title("🎓 Smart Student Success Dashboard")
     st.caption("GenAI-powered student mentor using SQLite + Ollama + LangChain + RAG")
 
-    # ---- Page router ----
+    # ---- Page router: load only what the selected page needs ----
+    start = time.perf_counter()
+    data = _load_page_data(db, logged_in_student_id, PAGE_DATA[page])
+    _record_load_time(page, time.perf_counter() - start)
+
+    with st.sidebar:
+        with st.expander("Page data load times"):
+            for name, t in st.session_state.page_load_timings.items():
+                st.caption(
+                    f"{name}: last {t['last_ms']:.1f} ms · "
+                    f"avg {t['total_ms'] / t['runs']:.1f} ms ({t['runs']} loads)"
+                )
+
+    if "student" in PAGE_DATA[page] and data["bundle"] is None:
+        st.error("Logged-in student not found in the database.")
+        db.close()
+        return
+
     if page == "Profile":
-        show_profile_page(student, attendance, marks, results)
+        show_profile_page(data["bundle"])
 
     elif page == "Dashboard":
-        show_dashboard(student, attendance, marks)
+        show_dashboard(data["bundle"])
 
     elif page == "Attendance":
-        show_attendance_page(student, attendance)
+        show_attendance_page(data["bundle"])
 
     elif page == "Marks":
-        show_marks_page(student, marks)
+        show_marks_page(data["bundle"])
 
     elif page == "Insights":
-        show_insights_page(student, marks, results, library_resources, events)
+        show_insights_page(data["bundle"], *data["catalog"])
 
     elif page == "AI Mentor":
-        show_mentor_page(db, logged_in_student_id)
+        # the mentor loads the student's data itself, only when a question is asked
+        show_mentor_page(db, logged_in_student_id, data.get("bundle"))
 
     db.close()
 
@@ -0,0 +1,118 @@
+# frontend/cache.py
+#
+# Streamlit caching layer.
+#
+# Streamlit re-executes app.py on every interaction. Process-wide objects
+# (database engine, vector store, chat / embedding clients) live behind
+# st.cache_resource and are created once per server process; the library /
+# events catalog lives behind st.cache_data, keyed by the catalog version
+# (bumped on every commit that writes it) and expired after CATALOG_CACHE_TTL
+# seconds for changes made by other processes.
+
+import os
+from types import SimpleNamespace
+
+import streamlit as st
+
+from backend.catalog import catalog_version
+from backend.crud import (
+    backfill_student_analytics,
+    ensure_seed_data,
+    get_all_events,
+    get_all_library_resources,
+    init_db,
+)
+from backend.database import ReadSessionLocal, SessionLocal, engine
+from backend.library_search import search_library
+
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", "600"))
+
+
+@st.cache_resource(show_spinner=False)
+def get_engine():
+    """
+    Database engine; schema creation, demo seed and missing analytics
+    snapshots run once per process, so page reruns only read.
+    """
+    init_db()
+    session = SessionLocal()
+    try:
+        ensure_seed_data(session)
+        backfill_student_analytics(session)
+    finally:
+        session.close()
+    return engine
+
+
+@st.cache_resource(show_spinner="Loading college documents...")
+def get_vector_store():
+    from backend.ai.vector_store import get_vectorstore
+    return get_vectorstore()
+
+
+@st.cache_resource(show_spinner=False)
+def get_embedding_client():
+    # queries are embedded by the client the vector store was opened with
+    return get_vector_store().embeddings
+
+
+@st.cache_resource(show_spinner="Connecting to the chat model...")
+def get_chat_client():
+    from backend.ai.llm_client import get_chat_llm
+    return get_chat_llm()
+
+
+def warm_ai_resources():
+    """Load the vector store, BM25 index, embedding and chat clients (first call per process only)."""
+    from backend.ai.hybrid_retriever import get_bm25_index
+
+    get_vector_store()
+    get_bm25_index()
+    get_embedding_client()
+    get_chat_client()
+
+
+def _plain_rows(rows):
+    # detached, picklable copies for st.cache_data (tags flattened to a string)
+    return [
+        SimpleNamespace(tags=r.tags, **{c.key: getattr(r, c.key) for c in r.__table__.columns})
+        for r in rows
+    ]
+
+
+@st.cache_data(ttl=CATALOG_CACHE_TTL, show_spinner=False)
+def _load_catalog(version: int):
+    session = ReadSessionLocal()
+    try:
+        return (
+            _plain_rows(get_all_library_resources(session)),
+            _plain_rows(get_all_events(session)),
+        )
+    finally:
+        session.close()
+
+
+def get_catalog():
+    """(library_resources, events), reloaded only when the catalog version changes or the TTL expires."""
+    return _load_catalog(catalog_version())
+
+
+@st.cache_data(ttl=CATALOG_CACHE_TTL, max_entries=256, show_spinner=False)
+def _search_library(query: str, page: int, page_size: int, version: int):
+    session = ReadSessionLocal()
+    try:
+        rows, total = search_library(session, query, limit=page_size, offset=(page - 1) * page_size)
+        return _plain_rows(rows), total
+    finally:
+        session.close()
+
+
+def search_catalog(query: str, page: int = 1, page_size: int = 10):
+    """One page of ranked library search results and the total match count."""
+    return _search_library(query.strip().lower(), page, page_size, catalog_version())
+
+
+def invalidate_catalog():
+    """Drop every cached catalog copy in this process."""
+    _load_catalog.clear()
+    _search_library.clear()
@@ -2,30 +2,33 @@ import streamlit as st
 import pandas as pd
 import textwrap
 
-from backend.ai.attendance_utils import compute_attendance_insights
-from backend.ai.mentor import genai_mentor_answer
+from backend.analytics.snapshot import STRONG_THRESHOLD, WEAK_THRESHOLD
 
 
 # ---------- Attendance rendering ----------
 
-def _render_attendance_block(attendance):
+def _weak_codes(analytics):
+    return [c for c in (analytics.weak_course_codes or "").split(",") if c]
+
+
+def _render_attendance_block(analytics):
     st.subheader("Attendance Overview")
+    attendance = analytics.attendance_summary
     if not attendance:
         st.write("No attendance data.")
         return
 
     for a in attendance:
-        pct, needed = compute_attendance_insights(a)
-        status_emoji = "✅" if pct >= a.threshold else "⚠️"
+        status_emoji = "✅" if a["pct"] >= a["threshold"] else "⚠️"
         st.markdown(
-            f"- {status_emoji} **{a.course_code} - {a.course_name}**: "
-            f"{a.attended}/{a.total_classes} classes "
-            f"({pct:.1f}%), needs ~**{needed}** more classes to reach {a.threshold}%"
+            f"- {status_emoji} **{a['course_code']} - {a['course_name']}**: "
+            f"{a['attended']}/{a['total_classes']} classes "
+            f"({a['pct']:.1f}%), needs ~**{a['needed']}** more classes to reach {a['threshold']}%"
         )
 
     # Attendance chart
-    subjects = [a.course_code for a in attendance]
-    attendance_pcts = [compute_attendance_insights(a)[0] for a in attendance]
+    subjects = [a["course_code"] for a in attendance]
+    attendance_pcts = [a["pct"] for a in attendance]
 
     att_df = pd.DataFrame({
         "Subject": subjects,
@@ -70,37 +73,26 @@ def _render_marks_block(marks):
     st.bar_chart(marks_df, x="Exam", y="Marks %")
 
 
-def _compute_course_averages(marks):
-    course_scores = {}
-    course_names = {}
-    for m in marks:
-        perc = (m.score / m.max_score) * 100 if m.max_score > 0 else 0
-        if m.course_code not in course_scores:
-            course_scores[m.course_code] = []
-            course_names[m.course_code] = m.course_name
-        course_scores[m.course_code].append(perc)
-
-    averaged = []
-    for code, score_list in course_scores.items():
-        avg = sum(score_list) / len(score_list)
-        averaged.append((code, course_names[code], avg))
-
-    averaged.sort(key=lambda x: x[2])
-    return averaged
-
-
-def _render_performance_insights(marks):
+def _render_performance_insights(analytics):
     st.markdown("#### Performance Insights")
 
-    if not marks:
+    averaged = analytics.course_averages
+    if not averaged:
         st.write("No marks available to analyze.")
         return
 
-    averaged = _compute_course_averages(marks)
-
-    strong = [f"{code} ({name}) – {avg:.1f}%" for code, name, avg in averaged if avg >= 75]
-    okay = [f"{code} ({name}) – {avg:.1f}%" for code, name, avg in averaged if 60 <= avg < 75]
-    weak = [f"{code} ({name}) – {avg:.1f}%" for code, name, avg in averaged if avg < 60]
+    strong = [
+        f"{code} ({name}) – {avg:.1f}%"
+        for code, name, avg in averaged if avg >= STRONG_THRESHOLD
+    ]
+    okay = [
+        f"{code} ({name}) – {avg:.1f}%"
+        for code, name, avg in averaged if WEAK_THRESHOLD <= avg < STRONG_THRESHOLD
+    ]
+    weak = [
+        f"{code} ({name}) – {avg:.1f}%"
+        for code, name, avg in averaged if avg < WEAK_THRESHOLD
+    ]
 
     if strong:
         st.markdown("**Strong in:**")
@@ -146,7 +138,10 @@ def _render_gpa_section(results):
 
 # ---------- Library rendering ----------
 
-def _render_library_section(library_resources, marks):
+LIBRARY_PAGE_SIZE = 10
+
+
+def _render_library_section(library_resources, analytics):
     st.subheader("Digital Library")
 
     if not library_resources:
@@ -160,19 +155,29 @@ def _render_library_section(library_resources, marks):
     )
 
     # Basic filter by weak subjects if any
-    averaged = _compute_course_averages(marks) if marks else []
-    weak_codes = [code for code, _name, avg in averaged if avg < 60]
+    weak_codes = _weak_codes(analytics)
 
     resources = library_resources
     if search.strip():
-        q = search.lower()
-        resources = [
-            r for r in resources
-            if q in (r.title or "").lower()
-            or q in (r.course_code or "").lower()
-            or q in (r.tags or "").lower()
-            or q in (r.description or "").lower()
-        ]
+        # ranked, paginated search in the database (full-text index on SQLite)
+        from frontend.cache import search_catalog
+
+        if st.session_state.get("library_last_search") != search:
+            # new query: back to the first page
+            st.session_state["library_last_search"] = search
+            st.session_state["library_page"] = 1
+        page = st.session_state.get("library_page", 1)
+        resources, total = search_catalog(search, page, LIBRARY_PAGE_SIZE)
+        pages = max(1, -(-total // LIBRARY_PAGE_SIZE))
+        if page > pages:
+            # the catalog shrank since the page was picked
+            page = st.session_state["library_page"] = pages
+            resources, total = search_catalog(search, page, LIBRARY_PAGE_SIZE)
+        if pages > 1:
+            st.number_input(
+                f"Page (of {pages}, {total} matches)",
+                min_value=1, max_value=pages, step=1, key="library_page",
+            )
 
     if weak_codes and not search.strip():
         # auto-prioritize resources from weakest subjects
@@ -197,15 +202,14 @@ def _render_library_section(library_resources, marks):
 
 # ---------- Events rendering ----------
 
-def _render_events_section(events, marks):
+def _render_events_section(events, analytics):
     st.subheader("Recommended Events & Workshops")
 
     if not events:
         st.write("No upcoming events found.")
         return
 
-    averaged = _compute_course_averages(marks) if marks else []
-    weak_codes = [code for code, _name, avg in averaged if avg < 60]
+    weak_codes = _weak_codes(analytics)
 
     # Simple relevance scoring: events mentioning weak subjects get priority
     def score_event(ev):
@@ -239,45 +243,50 @@ def _render_events_section(events, marks):
 
 # ---------- Page-level render functions ----------
 
-def show_dashboard(student, attendance, marks):
+def show_dashboard(bundle):
     col1, col2 = st.columns([2, 3])
 
     with col1:
-        _render_attendance_block(attendance)
+        _render_attendance_block(bundle.analytics)
 
     with col2:
-        _render_marks_block(marks)
-        _render_performance_insights(marks)
+        _render_marks_block(bundle.marks)
+        _render_performance_insights(bundle.analytics)
 
 
-def show_attendance_page(student, attendance):
-    _render_attendance_block(attendance)
+def show_attendance_page(bundle):
+    _render_attendance_block(bundle.analytics)
 
 
-def show_marks_page(student, marks):
-    _render_marks_block(marks)
-    _render_performance_insights(marks)
+def show_marks_page(bundle):
+    _render_marks_block(bundle.marks)
+    _render_performance_insights(bundle.analytics)
 
 
-def show_insights_page(student, marks, results, library_resources, events):
+def show_insights_page(bundle, library_resources, events):
     # GPA / SGPA
-    _render_gpa_section(results)
+    _render_gpa_section(bundle.results)
 
     # Performance insights based on marks
-    _render_performance_insights(marks)
+    _render_performance_insights(bundle.analytics)
 
     st.markdown("---")
 
     # Library section
-    _render_library_section(library_resources, marks)
+    _render_library_section(library_resources, bundle.analytics)
 
     st.markdown("---")
 
     # Events section
-    _render_events_section(events, marks)
+    _render_events_section(events, bundle.analytics)
+
 
+def show_mentor_page(db, student_id, bundle=None):
+    # Imported here so LangChain / Chroma / torch only load once the mentor is opened
+    from backend.ai.mentor import genai_mentor_stream
+    from backend.crud import load_student_bundle
+    from frontend.cache import warm_ai_resources
 
-def show_mentor_page(db, student_id):
     st.header("🧠 GenAI Mentor")
 
     default_q = (
@@ -321,49 +330,48 @@ def show_mentor_page(db, student_id):
                 "Keep the plan specific and actionable."
             )
 
-    mentor_answer = None
+    mentor_query = None
 
     if quick_action:
-        with st.spinner("Mentor is analyzing your data + college resources..."):
-            mentor_answer = genai_mentor_answer(db, student_id, quick_action)
+        mentor_query = quick_action
 
     elif st.button("Ask Mentor"):
         if not user_query.strip():
             st.warning("Please enter a question.")
         else:
-            with st.spinner("Mentor is analyzing your data + college resources..."):
-                mentor_answer = genai_mentor_answer(db, student_id, user_query)
+            mentor_query = user_query
 
-    if mentor_answer:
+    if mentor_query:
         st.subheader("Mentor's Response")
-        st.markdown(mentor_answer)
-
+        # vector store + clients are created once per process (st.cache_resource)
+        warm_ai_resources()
+        timings = {}
+        with st.spinner("Mentor is analyzing your data + college resources..."):
+            # one load per question, shared by the answer cache key and the prompt
+            bundle = bundle or load_student_bundle(db, student_id)
+            # answer is rendered chunk by chunk as the LLM streams it
+            st.write_stream(genai_mentor_stream(db, student_id, mentor_query, timings, bundle=bundle))
+        if timings.get("cached"):
+            st.caption("Answer reused: your attendance and marks have not changed since it was generated.")
+        elif "ttft" in timings:
+            st.caption(
+                f"First words after {timings['ttft']:.1f}s · "
+                f"full answer in {timings['total']:.1f}s"
+            )
 
 import streamlit as st
 import pandas as pd
 # ... your other imports stay as-is ...
 
 
-def show_profile_page(student, attendance, marks, results):
+def show_profile_page(bundle):
     st.subheader("Student Profile")
+    student, analytics = bundle.student, bundle.analytics
 
-    # ---- Quick stats for the metrics row ----
-    total_subjects = len({a.course_code for a in attendance}) if attendance else 0
-
-    avg_attendance = None
-    if attendance:
-        pcts = [
-            (a.attended / a.total_classes) * 100
-            for a in attendance
-            if a.total_classes > 0
-        ]
-        if pcts:
-            avg_attendance = sum(pcts) / len(pcts)
-
-    latest_cgpa = None
-    if results:
-        non_zero = [r.cgpa for r in results if r.cgpa > 0]
-        latest_cgpa = non_zero[-1] if non_zero else results[-1].cgpa
+    # ---- Quick stats for the metrics row (precomputed snapshot) ----
+    total_subjects = analytics.total_subjects
+    avg_attendance = analytics.avg_attendance
+    latest_cgpa = analytics.latest_cgpa
 
     # ---- Layout: left (profile) + right (metrics & summary) ----
     col1, col2 = st.columns([2, 3])
@@ -408,3 +416,97 @@ def show_profile_page(student, attendance, marks, results):
             "attendance, marks, GPA trends, recommended digital resources, "
             "upcoming events, and to chat with the AI Mentor."
         )
+
+
+# ---------- Admin cohort dashboard ----------
+
+ADMIN_GROUPINGS = {
+    "Branch": "branch",
+    "Section": "section",
+    "Branch + Section": "branch_section",
+}
+MARK_BUCKET = 10
+
+
+def show_admin_page(db):
+    # aggregates are computed in SQL; only grouped rows reach Streamlit
+    from backend.crud import (
+        get_attendance_aggregates,
+        get_cgpa_distribution,
+        get_cohort_overview,
+        get_course_exam_pairs,
+        get_mark_distribution,
+        get_mark_percentiles,
+    )
+
+    st.subheader("Cohort Overview")
+    overview = get_cohort_overview(db)
+    mcol1, mcol2, mcol3, mcol4 = st.columns(4)
+    with mcol1:
+        st.metric("Students", overview["students"] or 0)
+    with mcol2:
+        avg = overview["avg_attendance"]
+        st.metric("Avg Attendance", f"{avg:.1f}%" if avg is not None else "—")
+    with mcol3:
+        st.metric("Students Below Threshold", overview["students_below"] or 0)
+    with mcol4:
+        st.metric("Courses Below Threshold", overview["courses_below"] or 0)
+
+    group_label = st.selectbox("Group by", list(ADMIN_GROUPINGS), key="admin_group_by")
+    group_by = ADMIN_GROUPINGS[group_label]
+
+    # ---- Attendance ----
+    st.markdown("---")
+    st.subheader("Attendance")
+    by_course = st.checkbox("Split by course", key="admin_by_course")
+    att_df = pd.DataFrame(get_attendance_aggregates(db, group_by, by_course=by_course))
+    if att_df.empty:
+        st.write("No attendance data.")
+    else:
+        keys = [c for c in att_df.columns if c in ("branch", "section", "course_code")]
+        att_df["group"] = att_df[keys].astype(str).agg(" / ".join, axis=1)
+        st.bar_chart(att_df, x="group", y="avg_attendance")
+        st.dataframe(
+            att_df.drop(columns="group").round({"avg_attendance": 1, "min_attendance": 1}),
+            hide_index=True,
+        )
+
+    # ---- Marks ----
+    st.markdown("---")
+    st.subheader("Marks by Course / Exam")
+    pct_df = pd.DataFrame(get_mark_percentiles(db))
+    if pct_df.empty:
+        st.write("No marks data.")
+    else:
+        st.dataframe(pct_df.round(1), hide_index=True, use_container_width=True)
+
+        pairs = get_course_exam_pairs(db)
+        course_code, exam_type = st.selectbox(
+            "Distribution for",
+            pairs,
+            format_func=lambda p: f"{p[0]} {p[1]}",
+            key="admin_mark_pair",
+        )
+        dist_df = pd.DataFrame(get_mark_distribution(
+            db, bucket_size=MARK_BUCKET, course_code=course_code, exam_type=exam_type
+        ))
+        if not dist_df.empty:
+            dist_df["Marks %"] = dist_df["bucket"].map(lambda b: f"{b}-{b + MARK_BUCKET}")
+            st.bar_chart(dist_df, x="Marks %", y="count")
+
+    # ---- CGPA ----
+    st.markdown("---")
+    st.subheader("Latest CGPA Distribution")
+    split_cgpa = st.checkbox(f"Split by {group_label.lower()}", key="admin_split_cgpa")
+    cgpa_df = pd.DataFrame(get_cgpa_distribution(db, group_by=group_by if split_cgpa else None))
+    if cgpa_df.empty:
+        st.write("No CGPA data available yet.")
+    else:
+        cgpa_df["CGPA"] = cgpa_df["bucket"].map(lambda b: f"{b:.1f}")
+        if split_cgpa:
+            keys = [c for c in cgpa_df.columns if c in ("branch", "section")]
+            cgpa_df["group"] = cgpa_df[keys].astype(str).agg(" / ".join, axis=1)
+            chart = cgpa_df.pivot_table(index="CGPA", columns="group", values="students", fill_value=0)
+            st.bar_chart(chart)
+        else:
+            st.bar_chart(cgpa_df, x="CGPA", y="students")